@@ -0,0 +1,117 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : CLI 시작 시간(모듈 import 비용) 회귀 점검
+내용 : main.py --help나 데이터 도구처럼 모델/DB를 쓰지 않는 경로가 torch, transformers, chromadb를 가져오지 않는지 확인합니다.
+모듈마다 새 프로세스에서 `python -X importtime -c "import 모듈"`(명령은 `python -X importtime 스크립트 인자`)을 실행하고
+stderr의 import 시간 기록을 파싱하여, 무거운 의존성이 포함되었거나 전체 import 시간이 기준을 넘으면
+해당 모듈과 가장 오래 걸린 import를 출력하고 종료 코드 1을 반환합니다.
+무거운 의존성 포함 여부는 tests/test_import_time.py에서 pytest로도 자동 점검합니다.
+사용법: python check_import_time.py [--budget-ms 1000]
+"""
+# hr_recommender/check_import_time.py
+
+import argparse
+import os
+import subprocess
+import sys
+
+# 처음 사용할 때만 가져와야 하는 무거운 의존성 (최상위 패키지 이름)
+HEAVY_MODULES = ('chromadb', 'sentence_transformers', 'torch', 'transformers', 'onnxruntime')
+
+# 가져오는 것만으로는 모델/DB를 쓰지 않아야 하는 모듈
+CHECKED_MODULES = (
+    'main',
+    'server',
+    'recommender.data_loader',
+    'recommender.vector_db',
+    'recommender.embedding_utils',
+    'recommender.talent_recommender',
+    'recommender.onnx_backend',
+)
+
+# 실행해도 모델/DB를 쓰지 않아야 하는 명령 (스크립트 경로와 인자)
+CHECKED_COMMANDS = (
+    ('main.py', '--help'),
+)
+
+
+def _run_importtime(args):
+    """
+    새 프로세스에서 `python -X importtime <args>`를 실행하고 import 시간 기록을 파싱합니다.
+    Returns:
+        dict: {'total_ms': 최상위 import 누적 시간 합(ms), 'modules': {모듈 이름: 누적 시간(ms)}}.
+              실행에 실패하면 'error'에 stderr 마지막 줄.
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *args],
+                               cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    imported = {}
+    total_ms = 0.0
+    for line in completed.stderr.splitlines():
+        # 형식: "import time: self [us] | cumulative | imported package" (중첩 import는 이름 앞에 공백이 붙음)
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        if cumulative.strip().isdigit():
+            imported[name.strip()] = int(cumulative) / 1000
+            if not name[1:].startswith(' '):
+                total_ms += int(cumulative) / 1000
+    if completed.returncode != 0:
+        return {'error': (completed.stderr.strip().splitlines() or ['알 수 없는 오류'])[-1]}
+    return {'total_ms': total_ms, 'modules': imported}
+
+def measure_import(module_name):
+    """
+    새 프로세스에서 모듈 하나를 가져오며 -X importtime 기록을 수집합니다.
+    Returns:
+        dict: {'total_ms': float, 'modules': {모듈 이름: 누적 시간(ms)}}. 가져오기에 실패하면 'error'에 stderr 마지막 줄.
+    """
+    result = _run_importtime(['-c', f"import {module_name}"])
+    if 'error' not in result:
+        result['total_ms'] = result['modules'].get(module_name, 0.0)
+    return result
+
+def measure_command(command):
+    """
+    새 프로세스에서 명령 하나(예: ('main.py', '--help'))를 실행하며 -X importtime 기록을 수집합니다.
+    Returns:
+        dict: measure_import와 같은 형식. total_ms는 최상위 import 누적 시간의 합 (인터프리터 시작 import 포함).
+    """
+    return _run_importtime(list(command))
+
+def find_heavy_imports(result):
+    """import 기록에서 HEAVY_MODULES에 속하는 모듈 이름을 정렬하여 반환합니다."""
+    return sorted({name for name in result['modules'] if name.split('.', 1)[0] in HEAVY_MODULES})
+
+def check_import_time(budget_ms=1000.0):
+    """
+    CHECKED_MODULES 각각의 import 시간과 무거운 의존성 포함 여부를 점검합니다.
+    Returns:
+        bool: 모든 모듈이 기준을 만족하면 True.
+    """
+    all_passed = True
+    checks = [(module_name, module_name, measure_import) for module_name in CHECKED_MODULES]
+    checks += [(' '.join(command), command, measure_command) for command in CHECKED_COMMANDS]
+    for label, target, measure in checks:
+        result = measure(target)
+        if 'error' in result:
+            print(f"[실패] {label}: 가져오기 실패 ({result['error']})")
+            all_passed = False
+            continue
+        heavy_imports = find_heavy_imports(result)
+        slowest = sorted(((ms, name) for name, ms in result['modules'].items() if name != target), reverse=True)[:3]
+        passed = not heavy_imports and result['total_ms'] <= budget_ms
+        all_passed = all_passed and passed
+        print(f"[{'통과' if passed else '실패'}] {label}: {result['total_ms']:.0f}ms "
+              f"(가장 오래 걸린 import: {', '.join(f'{name} {ms:.0f}ms' for ms, name in slowest)})")
+        if heavy_imports:
+            print(f"    무거운 의존성이 import 시점에 로드됨: {', '.join(heavy_imports[:5])}"
+                  f"{' 외' if len(heavy_imports) > 5 else ''}")
+    return all_passed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="CLI 모듈 import 시간 점검")
+    parser.add_argument('--budget-ms', type=float, default=1000.0, help="모듈별 최대 import 시간(밀리초, 기본값: 1000)")
+    args = parser.parse_args()
+    sys.exit(0 if check_import_time(args.budget_ms) else 1)
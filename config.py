@@ -10,18 +10,64 @@ ChromaDB 관련 설정 및 기본 추천 결과 수 등의 핵심 설정 변수
 
 # --- 데이터 파일 경로 ---
 # 이제 hr_data.json에 직원과 채용 공고 정보가 모두 포함됩니다.
+# 레코드마다 'doc_type'('employee'/'job')이 있는 JSONL 파일이나, 'employees-0001.jsonl' 형태의 JSONL 샤드 디렉토리도 지정할 수 있습니다.
 INTEGRATED_DATA_FILE = 'data/hr_data.json'
+DATA_LOAD_WORKERS = None # JSONL 샤드 디렉토리를 병렬로 읽을 프로세스 수 (None이면 CPU 코어 수)
+USE_RECORD_CACHE = True # 파싱 결과를 원본 옆 컬럼형 캐시(.hr_data.json.cache)에 저장하고, 원본이 그대로면 재파싱 없이 사용
+STREAMING_INGEST = False # True면 데이터 파일을 전체 로드하지 않고 스트리밍으로 읽어 배치 단위로 임베딩/저장 (대용량 데이터용)
 
 # --- Sentence Transformer 모델 이름 ---
 MODEL_NAME = 'all-MiniLM-L6-v2'
 # 다국어 모델 또는 한국어 특화 모델 사용시 아래 주석 해제 후 MODEL_NAME 변경
 # MODEL_NAME = 'sentence-transformers/distiluse-base-multilingual-cased-v1'
 # MODEL_NAME = 'jhgan/ko-sroberta-multitask'
+MODEL_CACHE_DIR = "./model_cache" # 모델 로컬 저장소. 최초 1회 스냅샷을 저장한 뒤 네트워크 없이 로드 (None이면 매번 hub 경로로 로드)
+MODEL_OFFLINE = False # True면 저장소에 스냅샷이 없을 때도 네트워크를 쓰지 않음 (로컬 경로/로컬 hub 캐시에서만 로드, 외부망 없는 서버용)
+MODEL_SERIALIZED_CACHE = True # True면 초기화된 모델 전체를 직렬화(model.pt)해 두고 다음 실행부터 역직렬화로 빠르게 로드.
+                              # model.pt는 pickle이므로 MODEL_CACHE_DIR은 서비스 계정만 쓸 수 있어야 함 (다른 사용자가 쓸 수 있으면 스냅샷에서 로드)
+MODEL_QUANTIZATION = None # 'dynamic_int8'이면 CPU 추론 시 Linear 계층을 int8 동적 양자화 (먼저 python -m recommender.quantization_check로 정확도 확인).
+                          # 모델 키(이름 + 양자화/백엔드)가 내용 지문에 포함되므로, 설정을 바꾼 뒤 적재하면 저장된 문서도 새 모델로 다시 임베딩
+EMBEDDING_BACKEND = 'torch' # 'onnx'면 모델을 MODEL_CACHE_DIR에 한 번 ONNX로 내보낸 뒤 onnxruntime으로 추론 (내보내기에 onnx 패키지 필요).
+                            # 먼저 python -m recommender.onnx_backend로 원본 모델과의 일치도 확인
+MODEL_WARMUP_BATCH_SIZES = (1, 8) # 모델 로드 직후 워밍업할 배치 크기 (쿼리 1개, 문서 배치). 비우면 워밍업 생략
+MODEL_WARMUP_ROUNDS = 2 # 워밍업 반복 횟수
+TORCH_INTRA_OP_THREADS = None # 연산 하나에 쓰는 torch 스레드 수 (None이면 torch 기본값 = 코어 수). 서버에서 검색 스레드와 코어를 나눌 때 줄임
+TORCH_INTER_OP_THREADS = None # 독립 연산을 병렬로 실행하는 torch 스레드 수 (None이면 torch 기본값). 모델 로드 전에만 변경 가능
 
 # --- ChromaDB 설정 ---
 COLLECTION_NAME = "hr_job_embeddings_collection_v2" # 컬렉션 이름 변경 (데이터 구조 변경 반영)
 CHROMA_DB_PATH = "./chroma_db_store"
-CHROMA_UPSERT_BATCH_SIZE = 5000 # ChromaDB upsert 시 최대 아이템 수
+UPSERT_BATCH_SIZE = 5000 # ChromaDB upsert 시 최대 아이템 수 (클라이언트의 최대 배치 크기를 넘으면 자동으로 줄어듦)
+CHROMA_UPSERT_BATCH_SIZE = UPSERT_BATCH_SIZE # 이전 설정 이름 호환용
+SEARCH_BACKEND = 'chroma' # 추천 검색 백엔드. 'numpy'면 시작 시 컬렉션 전체를 메모리 행렬로 읽어 정확 검색 (ChromaDB는 저장소로 계속 사용)
+EMBED_BATCH_SIZE = 32 # 임베딩 모델 encode 호출 시 배치 크기 (CPU에서 MiniLM은 작은 배치가 유리)
+AUTO_TUNE_BATCH_SIZES = False # True면 시작 시 임베딩 처리량을 측정해 EMBED_BATCH_SIZE를 자동으로 선택
+EMBED_BATCH_SIZE_CANDIDATES = (8, 16, 32, 64, 128) # 자동 조정 시 측정할 임베딩 배치 크기 후보
+LENGTH_BUCKETING = True # True면 토큰 길이가 비슷한 문서끼리 임베딩 배치를 구성하여 패딩 낭비를 줄임 (결과 순서는 유지)
+INGEST_PIPELINE = True # True면 준비/임베딩/저장 단계를 스레드 파이프라인으로 겹쳐서 실행
+INGEST_QUEUE_SIZE = 2 # 파이프라인 단계 사이에 대기할 수 있는 최대 배치 수 (메모리 사용량 상한)
+EMBED_WORKERS = 0 # 2 이상이면 대량 임베딩 시 워커 프로세스(각자 모델 로드)에 문서를 나누어 임베딩 (GPU 없는 다코어 장비용)
+EMBED_POOL_CHUNK_SIZE = 256 # 멀티 프로세스 임베딩 시 워커에 한 번에 넘기는 문서 수
+
+# --- 임베딩 캐시 설정 ---
+# (모델 이름, 임베딩용 텍스트 해시)를 키로 임베딩 벡터를 저장하여 컬렉션 재생성/이름 변경 시 재계산을 피함 (None이면 사용 안 함)
+EMBEDDING_CACHE_PATH = "./embedding_cache/embeddings.sqlite3"
+EMBEDDING_CACHE_MAX_ENTRIES = 500000 # 최대 저장 항목 수 (초과 시 오래 사용되지 않은 항목부터 삭제)
 
 # --- 추천 설정 ---
 DEFAULT_NUM_RESULTS = 5 # 추천 결과 수를 늘려 직원과 공고가 섞여 나올 수 있도록 함
+ADAPTIVE_OVERFETCH = True # True면 기본 후보 풀(결과 수 x5, 최소 20개)을 조회한 뒤 조건 통과 후보가 결과 수보다 모자랄 때만 조회 수를 늘림
+OVERFETCH_GROWTH = 2.0 # 후보가 모자랄 때 다음 조회 수 배율
+OVERFETCH_MAX_RESULTS = 500 # 한 번에 조회할 최대 후보 수
+QUERY_EMBEDDING_CACHE_SIZE = 1024 # 검색 쿼리(프로젝트 설명) 임베딩을 메모리에 보관할 최대 개수 (0이면 사용 안 함)
+QUERY_EMBEDDING_CACHE_TTL = 3600 # 쿼리 임베딩 캐시 항목 유효 시간(초). None이면 만료 없음
+RESULT_CACHE_SIZE = 256 # 추천 결과를 (컬렉션 epoch, 검색 조건) 기준으로 보관할 최대 개수 (0이면 사용 안 함). 적재로 데이터가 바뀌면 자동 무효화
+RESULT_CACHE_TTL = 600 # 추천 결과 캐시 항목 유효 시간(초). 다른 프로세스에서 적재한 변경은 이 시간 안에 반영됨
+
+# --- 추천 서버 설정 ---
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_MAX_CONCURRENCY = 4 # 동시에 처리할 최대 추천 요청 수 (초과 요청은 대기)
+SERVER_MAX_NUM_RESULTS = 100 # 요청 하나가 받을 수 있는 최대 추천 결과 수 (더 큰 k/num_results는 이 값으로 줄임)
+QUERY_BATCH_WAIT_MS = 5 # 동시 요청의 쿼리 임베딩을 한 번에 계산하기 위해 모으는 최대 대기 시간(밀리초)
+QUERY_BATCH_MAX_ITEMS = 32 # 한 번에 임베딩할 최대 쿼리 수 (1이면 요청마다 따로 임베딩)
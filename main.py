@@ -9,15 +9,22 @@
 """
 # hr_recommender/main.py
 
-import chromadb
+import argparse
+import contextlib
+import json
 import os
+import sys
+import time
 
 try:
     import config
-    from recommender.data_loader import load_employees_from_integrated_file, load_job_descriptions_from_integrated_file
+    from recommender.data_loader import load_integrated_data, iter_employees_from_integrated_file, iter_job_descriptions_from_integrated_file
     from recommender.embedding_utils import get_embedding_model
+    from recommender.embedding_cache import open_embedding_cache
+    from recommender.embedding_pool import start_embedding_pool
     from recommender.vector_db import setup_chromadb_collection
-    from recommender.talent_recommender import recommend_talent_from_db
+    from recommender.numpy_index import NumpyCollection
+    from recommender.talent_recommender import recommend_talent_from_db, recommend_talent_batch, get_query_embedding_cache, get_result_cache
 except ImportError as e:
     print(f"모듈 임포트 중 오류 발생: {e}")
     print("PYTHONPATH 환경 변수를 확인하거나, hr_recommender 폴더의 상위 디렉토리에서 "
@@ -25,9 +32,13 @@ except ImportError as e:
     exit()
 
 
-def run_recommender():
-    """메인 실행 함수"""
-    print("HR 인재 및 채용 공고 추천 시스템 시작")
+def prepare_recommender():
+    """
+    데이터 로드, 임베딩 모델 로드, ChromaDB 컬렉션 동기화를 수행합니다.
+    대화형 실행과 일괄(batch) 실행이 공통으로 사용하며, 한 번 준비한 모델과 컬렉션으로 여러 쿼리를 처리할 수 있습니다.
+    Returns:
+        tuple: (검색용 컬렉션, 임베딩 모델). 검색용 컬렉션은 SEARCH_BACKEND에 따라 ChromaDB 컬렉션 또는 NumpyCollection. 실패 시 (None, None).
+    """
 
     if not os.path.exists(config.CHROMA_DB_PATH):
         try:
@@ -35,23 +46,41 @@ def run_recommender():
             print(f"ChromaDB 저장 디렉토리 생성: {config.CHROMA_DB_PATH}")
         except OSError as e:
             print(f"ChromaDB 저장 디렉토리 생성 실패: {e}. 권한을 확인하세요.")
-            return
+            return None, None
         
+    import chromadb # --help, 데이터 도구 등에서는 chromadb를 가져오지 않도록 실제 사용 시점에 가져옴
     client = chromadb.PersistentClient(path=config.CHROMA_DB_PATH)
     print(f"ChromaDB 클라이언트 초기화 완료. 저장 경로: {config.CHROMA_DB_PATH}")
 
     # --- 데이터 로드 ---
-    employee_data = load_employees_from_integrated_file(config.INTEGRATED_DATA_FILE)
-    job_data = load_job_descriptions_from_integrated_file(config.INTEGRATED_DATA_FILE)
+    if config.STREAMING_INGEST:
+        if not os.path.exists(config.INTEGRATED_DATA_FILE):
+            print(f"{config.INTEGRATED_DATA_FILE} 파일을 찾을 수 없습니다. 시스템을 종료합니다.")
+            return None, None
+        # 제너레이터를 넘기면 setup_chromadb_collection이 배치 단위로 읽어 메모리 사용량을 제한합니다.
+        employee_data = iter_employees_from_integrated_file(config.INTEGRATED_DATA_FILE)
+        job_data = iter_job_descriptions_from_integrated_file(config.INTEGRATED_DATA_FILE)
+        failed_sections = None # 스트리밍 입력의 읽기 오류는 setup_chromadb_collection이 DataLoadError로 확인
+    else:
+        integrated_sections, load_stats = load_integrated_data(config.INTEGRATED_DATA_FILE, max_workers=config.DATA_LOAD_WORKERS,
+                                                      use_cache=config.USE_RECORD_CACHE)
+        employee_data = integrated_sections['employees']
+        job_data = integrated_sections['job_descriptions']
+        failed_sections = load_stats['failed_sections']
 
     if not employee_data and not job_data:
         print(f"{config.INTEGRATED_DATA_FILE} 에서 직원 및 채용 공고 데이터를 모두 로드할 수 없습니다. 시스템을 종료합니다.")
-        return
+        return None, None
 
     embedding_model = get_embedding_model(config.MODEL_NAME)
     if not embedding_model:
         print("임베딩 모델을 로드할 수 없습니다. 시스템을 종료합니다.")
-        return
+        return None, None
+
+    # 영속 임베딩 캐시도 양자화 모드까지 포함한 모델 이름(embedding_model.model_name)으로 구분
+    embedding_cache = open_embedding_cache(config.EMBEDDING_CACHE_PATH, embedding_model.model_name, config.EMBEDDING_CACHE_MAX_ENTRIES)
+    # 대량 임베딩은 (설정 시) 멀티 프로세스 풀로, 검색 쿼리 임베딩은 현재 프로세스의 모델로 수행
+    embedding_pool = start_embedding_pool(config.MODEL_NAME, config.EMBED_WORKERS, config.EMBED_POOL_CHUNK_SIZE)
 
     try:
         hr_job_collection = setup_chromadb_collection(
@@ -59,19 +88,43 @@ def run_recommender():
             collection_name=config.COLLECTION_NAME,
             employee_data=employee_data,
             job_data=job_data,
-            embedding_model=embedding_model
+            embedding_model=embedding_pool or embedding_model,
+            embedding_cache=embedding_cache,
+            failed_sections=failed_sections,
+            model_key=embedding_model.model_name # 모델/양자화/백엔드가 바뀌면 내용 지문이 달라져 전체를 다시 임베딩
         )
         if not hr_job_collection:
             print("ChromaDB 컬렉션 준비에 실패했습니다. 시스템을 종료합니다.")
-            return
+            return None, None
 
         print(f"ChromaDB 컬렉션 '{hr_job_collection.name}' 준비 완료. 현재 아이템 수: {hr_job_collection.count()}")
         if hr_job_collection.count() == 0 and (employee_data or job_data):
             print("경고: 데이터 파일에 내용은 있으나, ChromaDB 컬렉션이 비어있거나 새로 생성되었습니다.")
+
+        if config.SEARCH_BACKEND == 'numpy':
+            # 동기화가 끝난 컬렉션을 메모리 인덱스로 읽어 검색에 사용 (적재는 ChromaDB에만 하므로 여기서 한 번만 생성)
+            load_start = time.perf_counter()
+            hr_job_collection = NumpyCollection.from_chroma(hr_job_collection)
+            print(f"NumPy 검색 인덱스 생성 완료: {hr_job_collection.count()}개, 거리 함수 {hr_job_collection.space}, "
+                  f"메모리 {hr_job_collection.memory_bytes() / (1024 * 1024):.1f}MB ({time.perf_counter() - load_start:.2f}초)")
+        elif config.SEARCH_BACKEND != 'chroma':
+            print(f"경고: 알 수 없는 SEARCH_BACKEND '{config.SEARCH_BACKEND}'. ChromaDB로 검색합니다.")
         
     except Exception as e:
         print(f"ChromaDB 설정 중 심각한 오류 발생: {e}")
         print(f"ChromaDB 저장소({config.CHROMA_DB_PATH})에 문제가 있을 수 있습니다. 확인 후 다시 시도해 보세요.")
+        return None, None
+    finally:
+        if embedding_pool is not None:
+            embedding_pool.close()
+
+    return hr_job_collection, embedding_model
+
+def run_recommender():
+    """메인 실행 함수 (대화형)"""
+    print("HR 인재 및 채용 공고 추천 시스템 시작")
+    hr_job_collection, embedding_model = prepare_recommender()
+    if hr_job_collection is None:
         return
 
     # --- 사용자 입력 ---
@@ -86,6 +139,10 @@ def run_recommender():
     required_lang_input = input("필요한 언어가 있나요 (직원 검색 시)? (쉼표로 구분, 없으면 Enter): ").strip()
     required_languages_list = [lang.strip() for lang in required_lang_input.split(',') if lang.strip()] \
         if required_lang_input else None
+
+    required_skill_input = input("필요한 기술이 있나요 (직원: 보유 기술, 채용공고: 필수 기술)? (쉼표로 구분, 없으면 Enter): ").strip()
+    required_skills_list = [skill.strip() for skill in required_skill_input.split(',') if skill.strip()] \
+        if required_skill_input else None
     
     search_type_input = input("검색 대상을 선택하세요 (1: 직원, 2: 채용공고, Enter: 모두): ").strip()
     target_doc_type_param = None
@@ -108,6 +165,7 @@ def run_recommender():
             num_results=config.DEFAULT_NUM_RESULTS,
             department_filter=target_department if target_department else None,
             required_languages=required_languages_list,
+            required_skills=required_skills_list,
             target_doc_type=target_doc_type_param
         )
 
@@ -143,5 +201,151 @@ def run_recommender():
         if hr_job_collection.count() > 0 :
             print("팁: 검색 설명을 더 자세히 작성하거나 필터 조건을 완화해보세요.")
 
+def _parse_text_field(value, field_name):
+    """문자열 필드의 공백을 정리합니다. 비어 있으면 빈 문자열, 문자열이 아니면 ValueError."""
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"'{field_name}'은(는) 문자열이어야 합니다: {value!r}")
+    return value.strip()
+
+def _parse_list_field(value, field_name=None):
+    """쉼표로 구분된 문자열 또는 리스트를 공백을 정리한 리스트로 변환합니다. 비어 있으면 None, 다른 타입이면 ValueError."""
+    if not value:
+        return None
+    if not isinstance(value, (str, list, tuple)):
+        raise ValueError(f"'{field_name}'은(는) 쉼표로 구분된 문자열이나 리스트여야 합니다: {value!r}")
+    items = value.split(',') if isinstance(value, str) else value
+    items = [str(item).strip() for item in items if str(item).strip()]
+    return items or None
+
+def _parse_num_results(value):
+    """추천 결과 수를 정수로 변환합니다. 비어 있으면 config.DEFAULT_NUM_RESULTS, 1보다 작으면 ValueError."""
+    if value is None or value == "":
+        return config.DEFAULT_NUM_RESULTS
+    num_results = int(value)
+    if num_results < 1:
+        raise ValueError(f"추천 결과 수는 1 이상이어야 합니다: {value}")
+    return num_results
+
+def parse_query_spec(spec):
+    """
+    일괄 실행 입력(JSONL) 한 줄의 쿼리 명세를 recommend_talent_batch 쿼리 딕셔너리로 변환합니다.
+    짧은 키(description, department, languages, skills, doc_type, k)와 함수 인자 이름 모두 지원합니다.
+    필드 타입이 맞지 않거나 결과 수가 1보다 작으면 ValueError를 발생시킵니다 (서버는 400 응답).
+    """
+    doc_type = spec.get('target_doc_type', spec.get('doc_type'))
+    doc_type = {'1': 'employee', '2': 'job', 'jd': 'job', 'job_description': 'job'}.get(str(doc_type).lower(), doc_type)
+    return {
+        'project_description': _parse_text_field(spec.get('project_description') or spec.get('description'),
+                                                  'description') or "소프트웨어 개발 프로젝트",
+        'department_filter': _parse_text_field(spec.get('department_filter') or spec.get('department'), 'department') or None,
+        'required_languages': _parse_list_field(spec.get('required_languages', spec.get('languages')), 'languages'),
+        'required_skills': _parse_list_field(spec.get('required_skills', spec.get('skills')), 'skills'),
+        'target_doc_type': doc_type if doc_type in ('employee', 'job') else None,
+        'num_results': _parse_num_results(spec.get('num_results', spec.get('k'))),
+    }
+
+def _format_result_item(item):
+    """추천 결과 하나를 JSON으로 내보낼 딕셔너리로 변환합니다."""
+    return {
+        'id': item['id'],
+        'doc_type': item['doc_type'],
+        'name_or_title': item['name_or_title'],
+        'department': item['department'],
+        'similarity': 1 - item['distance'] if item['distance'] is not None else None,
+        'reasoning': item['reasoning'],
+    }
+
+def run_batch(input_path, output_path=None, query_batch_size=64):
+    """
+    JSONL 파일의 쿼리 명세를 읽어 추천 결과를 JSONL로 출력합니다 (비대화형).
+    모델 로드와 컬렉션 준비는 한 번만 수행하고, 쿼리는 query_batch_size개씩 recommend_talent_batch로 처리합니다.
+    결과는 입력 순서대로 처리되는 즉시 기록하며, 진행 메시지는 결과와 섞이지 않도록 stderr로 출력합니다.
+    마지막에 전체 처리량과 쿼리 지연 시간 백분위(p50/p95/p99)를 출력합니다.
+    Args:
+        input_path (str): 쿼리 명세 JSONL 파일 경로 ('-'이면 stdin).
+        output_path (str, optional): 결과 JSONL 파일 경로. None 또는 '-'이면 stdout.
+        query_batch_size (int): 한 번에 묶어 처리할 쿼리 수. 1이면 쿼리별로 처리.
+    """
+    result_stream = sys.stdout if not output_path or output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    input_stream = sys.stdin if input_path == '-' else open(input_path, 'r', encoding='utf-8')
+    latencies = []
+    failed_lines = 0
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            print("HR 인재 및 채용 공고 추천 시스템 시작 (일괄 실행)")
+            hr_job_collection, embedding_model = prepare_recommender()
+            if hr_job_collection is None:
+                return
+
+            def flush_batch(pending):
+                batch_start = time.perf_counter()
+                batch_results = recommend_talent_batch(hr_job_collection, embedding_model, [query for _, query in pending],
+                                                       num_results=config.DEFAULT_NUM_RESULTS)
+                batch_latency = time.perf_counter() - batch_start
+                for (query_index, query), recommendations in zip(pending, batch_results):
+                    # 결과는 배치가 끝나야 나오므로 배치 전체 시간을 쿼리별 지연 시간으로 봄
+                    latencies.append(batch_latency)
+                    record = {'index': query_index, 'query': query, 'latency_ms': round(batch_latency * 1000, 2),
+                              'results': [_format_result_item(item) for item in recommendations]}
+                    result_stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+                result_stream.flush()
+
+            run_start = time.perf_counter()
+            pending = []
+            for line_number, line in enumerate(input_stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    pending.append((line_number, parse_query_spec(json.loads(line))))
+                except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+                    failed_lines += 1
+                    print(f"경고: {line_number}번째 줄의 쿼리 명세를 해석할 수 없습니다: {e}. 건너뜁니다.")
+                    continue
+                if len(pending) >= query_batch_size:
+                    flush_batch(pending)
+                    pending = []
+            if pending:
+                flush_batch(pending)
+            total_seconds = time.perf_counter() - run_start
+
+            if latencies:
+                import numpy as np # 백분위 계산에만 사용하므로 CLI 시작 시 가져오지 않음
+                p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+                print(f"일괄 실행 완료: 쿼리 {len(latencies)}개 ({failed_lines}개 건너뜀), {total_seconds:.2f}초, "
+                      f"처리량 {len(latencies) / total_seconds:.1f} queries/sec, "
+                      f"지연 시간 p50 {p50:.1f}ms / p95 {p95:.1f}ms / p99 {p99:.1f}ms")
+            else:
+                print(f"일괄 실행 완료: 처리한 쿼리가 없습니다 ({failed_lines}개 건너뜀).")
+            for cache_label, cache in (("쿼리 임베딩 캐시", get_query_embedding_cache()), ("추천 결과 캐시", get_result_cache())):
+                if cache is not None:
+                    cache_stats = cache.stats()
+                    print(f"{cache_label}: 적중 {cache_stats['hits']}개, 미적중 {cache_stats['misses']}개 (적중률 {cache_stats['hit_rate']:.1%}).")
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if result_stream is not sys.stdout:
+            result_stream.close()
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HR 인재 및 채용 공고 추천 시스템")
+    parser.add_argument('--batch', metavar='QUERIES_JSONL',
+                        help="쿼리 명세 JSONL 파일로 일괄 실행 ('-'이면 stdin). 각 줄: "
+                             '{"description": ..., "department": ..., "languages": [...], "skills": [...], "doc_type": "employee|job", "k": 5}')
+    parser.add_argument('--output', metavar='RESULTS_JSONL', help="일괄 실행 결과 JSONL 파일 (기본값: stdout)")
+    parser.add_argument('--query-batch-size', type=int, default=64, help="일괄 실행 시 한 번에 묶어 처리할 쿼리 수 (기본값: 64)")
+    parser.add_argument('--serve', action='store_true', help="모델과 컬렉션을 한 번 준비한 뒤 HTTP 추천 서버로 실행 (server.py)")
+    parser.add_argument('--host', help="서버 주소 (기본값: config.SERVER_HOST)")
+    parser.add_argument('--port', type=int, help="서버 포트 (기본값: config.SERVER_PORT)")
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
-    run_recommender()
+    args = _parse_args()
+    if args.serve:
+        from server import run_server
+        run_server(args.host, args.port)
+    elif args.batch:
+        run_batch(args.batch, args.output, max(1, args.query_batch_size))
+    else:
+        run_recommender()
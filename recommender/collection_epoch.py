@@ -0,0 +1,40 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 컬렉션 데이터 버전(epoch) 관리
+내용 : 컬렉션에 upsert/delete가 일어날 때마다 1씩 증가하는 epoch 값을 컬렉션 메타데이터('ingest_epoch')와
+프로세스 내 레지스트리에 함께 기록합니다. 추천 결과 캐시는 키에 epoch를 포함하므로, 적재로 데이터가 바뀌면
+이전 결과는 자동으로 사용되지 않습니다. 다른 프로세스에서 적재한 변경은 컬렉션 메타데이터를 다시 읽을 때 반영됩니다.
+"""
+# hr_recommender/recommender/collection_epoch.py
+
+import threading
+
+COLLECTION_EPOCH_METADATA_KEY = 'ingest_epoch'
+
+_epoch_registry = {} # 컬렉션 이름 -> 이 프로세스에서 마지막으로 기록한 epoch
+_registry_lock = threading.Lock()
+
+
+def get_collection_epoch(collection):
+    """컬렉션의 현재 epoch를 반환합니다 (메타데이터와 프로세스 내 레지스트리 중 큰 값)."""
+    stored_epoch = (collection.metadata or {}).get(COLLECTION_EPOCH_METADATA_KEY, 0)
+    with _registry_lock:
+        return max(int(stored_epoch or 0), _epoch_registry.get(collection.name, 0))
+
+def bump_collection_epoch(collection):
+    """
+    컬렉션 데이터가 바뀌었음을 기록합니다. epoch를 1 증가시켜 메타데이터와 레지스트리에 저장하고 새 값을 반환합니다.
+    생성 후 바꿀 수 없는 'hnsw:' 설정 키는 modify에 넘기지 않습니다.
+    """
+    new_epoch = get_collection_epoch(collection) + 1
+    with _registry_lock:
+        _epoch_registry[collection.name] = new_epoch
+    metadata = {key: value for key, value in (collection.metadata or {}).items() if not key.startswith('hnsw:')}
+    metadata[COLLECTION_EPOCH_METADATA_KEY] = new_epoch
+    try:
+        collection.modify(metadata=metadata)
+    except Exception as e:
+        # 메타데이터 기록에 실패해도 이 프로세스의 캐시는 레지스트리로 무효화됨
+        print(f"경고: 컬렉션 '{collection.name}'의 epoch 메타데이터를 기록할 수 없습니다: {e}")
+    return new_epoch
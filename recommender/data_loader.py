@@ -6,11 +6,154 @@
 시스템에서 사용할 수 있도록 불러옵니다. 파일 경로 유효성, JSON 형식 유효성을 검사하고, 
 지정된 키(예: 'employees', 'job_descriptions')를 통해 데이터 리스트를 추출합니다. 
 오류 발생 시 적절한 메시지를 출력하며 빈 리스트를 반환하여 안정적인 데이터 처리를 지원합니다.
+스트리밍 읽기는 빈 섹션과 읽기 실패를 구분할 수 있도록 오류 시 DataLoadError를 발생시킵니다.
 """
 # hr_recommender/recommender/data_loader.py
 
 import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+INTEGRATED_DATA_KEYS = ('employees', 'job_descriptions')
+
+# JSONL/샤드 입력에서 각 레코드의 'doc_type' 값(또는 샤드 파일명 접두어)과 섹션 키의 대응 관계
+DOC_TYPE_TO_DATA_KEY = {'employee': 'employees', 'job': 'job_descriptions'}
+_DOC_TYPE_ALIASES = {
+    'employee': 'employee', 'employees': 'employee',
+    'job': 'job', 'jobs': 'job', 'job_description': 'job', 'job_descriptions': 'job',
+}
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+
+
+class DataLoadError(Exception):
+    """섹션을 읽을 수 없을 때(파일/키 없음, 리스트가 아닌 값, JSON 형식 오류) 스트리밍 읽기에서 발생합니다."""
+
+
+def detect_input_format(path):
+    """
+    데이터 경로의 형식을 판별합니다.
+    Returns:
+        str: 'shards' (JSONL 샤드 디렉토리), 'jsonl' (줄 단위 JSON 파일) 또는 'json' (단일 통합 JSON 파일).
+    """
+    if os.path.isdir(path):
+        return 'shards'
+    if path.lower().endswith(JSONL_EXTENSIONS):
+        return 'jsonl'
+    return 'json'
+
+def _normalize_doc_type(value):
+    """'employees', 'job_descriptions' 등 다양한 표기를 'employee' / 'job'으로 정규화합니다. 알 수 없으면 None."""
+    if not isinstance(value, str):
+        return None
+    return _DOC_TYPE_ALIASES.get(value.strip().lower())
+
+def _doc_type_from_shard_name(file_path):
+    """샤드 파일명 접두어(예: 'employees-0001.jsonl' → 'employee')로 문서 타입을 추정합니다."""
+    base_name = os.path.basename(file_path)
+    return _normalize_doc_type(base_name.split('-', 1)[0].split('.', 1)[0])
+
+def list_shard_files(directory):
+    """샤드 디렉토리 안의 JSONL 파일 목록을 이름순으로 반환합니다 (처리 순서를 결정적으로 유지)."""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(JSONL_EXTENSIONS) and os.path.isfile(os.path.join(directory, name))
+    )
+
+def _count_skipped_line(read_stats):
+    if read_stats is not None:
+        read_stats['skipped_lines'] = read_stats.get('skipped_lines', 0) + 1
+
+def _iter_jsonl_records(file_path, read_stats=None):
+    """
+    JSONL 파일에서 (문서 타입, 레코드) 쌍을 한 줄씩 생성합니다.
+    레코드의 'doc_type' 필드가 우선하며, 없으면 샤드 파일명 접두어로 판단합니다.
+    'doc_type' 필드는 통합 JSON 형식과 동일한 레코드가 되도록 제거한 뒤 반환합니다.
+    read_stats가 주어지면 건너뛴 줄 수를 'skipped_lines'에 더합니다.
+    """
+    shard_doc_type = _doc_type_from_shard_name(file_path)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"경고: {file_path} {line_number}번째 줄의 JSON 형식이 올바르지 않습니다. 건너뜁니다.")
+                _count_skipped_line(read_stats)
+                continue
+            if not isinstance(record, dict):
+                print(f"경고: {file_path} {line_number}번째 줄이 객체가 아닙니다. 건너뜁니다.")
+                _count_skipped_line(read_stats)
+                continue
+            doc_type = _normalize_doc_type(record.pop('doc_type', None)) or shard_doc_type
+            if doc_type is None:
+                print(f"경고: {file_path} {line_number}번째 줄의 doc_type을 알 수 없습니다. 건너뜁니다.")
+                _count_skipped_line(read_stats)
+                continue
+            yield doc_type, record
+
+def _read_jsonl_file(file_path):
+    """
+    JSONL 파일 하나를 읽어 섹션별 레코드 리스트와 통계를 반환하는 내부 함수.
+    프로세스 풀의 작업 함수로도 사용되므로 모듈 최상위에 정의합니다.
+    """
+    parse_start = time.perf_counter()
+    sections = {}
+    read_stats = {'skipped_lines': 0}
+    for doc_type, record in _iter_jsonl_records(file_path, read_stats):
+        sections.setdefault(DOC_TYPE_TO_DATA_KEY[doc_type], []).append(record)
+    read_stats['bytes_read'] = os.path.getsize(file_path)
+    read_stats['parse_seconds'] = time.perf_counter() - parse_start
+    return sections, read_stats
+
+def _read_jsonl_sources(file_paths, max_workers=None):
+    """
+    여러 JSONL 파일(샤드)을 읽어 섹션별로 합칩니다. 파일이 둘 이상이면 프로세스 풀로 병렬 파싱하며,
+    결과는 파일 이름 순서대로 합쳐 항상 같은 레코드 순서를 보장합니다.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(file_paths)))
+
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            file_results = list(executor.map(_read_jsonl_file, file_paths))
+    else:
+        file_results = [_read_jsonl_file(file_path) for file_path in file_paths]
+
+    merged_sections = {}
+    merged_stats = {'bytes_read': 0, 'read_seconds': 0.0, 'parse_seconds': 0.0, 'files_read': len(file_paths), 'workers': max_workers,
+                    'skipped_lines': 0}
+    for file_sections, file_stats in file_results:
+        for data_key, records in file_sections.items():
+            merged_sections.setdefault(data_key, []).extend(records)
+        merged_stats['bytes_read'] += file_stats['bytes_read']
+        merged_stats['skipped_lines'] += file_stats['skipped_lines']
+        merged_stats['parse_seconds'] += file_stats['parse_seconds'] # 워커별 파싱 시간의 합 (CPU 시간 기준)
+    return merged_sections, merged_stats
+
+def _read_integrated_file(file_path):
+    """
+    통합 JSON 파일을 한 번 파싱하고 파싱 비용(시간, 바이트 수)을 함께 반환하는 내부 함수.
+    Args:
+        file_path (str): JSON 파일 경로.
+    Returns:
+        tuple: (파싱된 JSON 객체, 통계 딕셔너리). 통계에는 'bytes_read', 'read_seconds', 'parse_seconds'가 포함됩니다.
+    """
+    read_start = time.perf_counter()
+    with open(file_path, 'rb') as f:
+        raw_bytes = f.read()
+    parse_start = time.perf_counter()
+    data_content = json.loads(raw_bytes.decode('utf-8'))
+    parse_end = time.perf_counter()
+    load_stats = {
+        'bytes_read': len(raw_bytes),
+        'read_seconds': parse_start - read_start,
+        'parse_seconds': parse_end - parse_start,
+    }
+    return data_content, load_stats
+
 
 def _load_specific_data_from_integrated_file(file_path, data_key):
     """
@@ -24,9 +167,11 @@ def _load_specific_data_from_integrated_file(file_path, data_key):
     if not os.path.exists(file_path):
         print(f"오류: 통합 데이터 파일 {file_path}을(를) 찾을 수 없습니다.")
         return []
+    if detect_input_format(file_path) != 'json':
+        sections, _ = load_integrated_data(file_path, (data_key,))
+        return sections[data_key]
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data_content = json.load(f)
+        data_content, _ = _read_integrated_file(file_path)
         
         if isinstance(data_content, dict) and data_key in data_content:
             item_list = data_content[data_key]
@@ -48,6 +193,361 @@ def _load_specific_data_from_integrated_file(file_path, data_key):
         print(f"데이터 로드 중 오류 발생 ({file_path}, 키: {data_key}): {e}")
         return []
 
+def load_integrated_data(file_path, data_keys=INTEGRATED_DATA_KEYS, max_workers=None, use_cache=False):
+    """
+    통합 데이터를 한 번만 파싱하여 요청된 모든 섹션(직원, 채용 공고 등)을 함께 반환합니다.
+    섹션마다 파일을 다시 읽던 방식과 달리 파싱 시간과 최대 메모리 사용량이 한 번분으로 줄어듭니다.
+    file_path는 단일 통합 JSON 파일, 레코드마다 'doc_type'이 지정된 JSONL 파일,
+    또는 JSONL 샤드 파일(예: 'employees-0001.jsonl')이 들어 있는 디렉토리일 수 있습니다.
+    Args:
+        file_path (str): JSON/JSONL 파일 또는 샤드 디렉토리 경로.
+        data_keys (tuple): 추출할 섹션 키 목록.
+        max_workers (int, optional): 샤드 디렉토리를 병렬로 읽을 프로세스 수. 기본값은 CPU 코어 수.
+        use_cache (bool): True면 원본 옆의 컬럼형 캐시(record_cache)를 사용합니다. 원본이 바뀌지 않았다면
+                          텍스트 파싱 없이 캐시를 메모리 매핑하여 읽고, 캐시가 없거나 오래되었으면 파싱 후 새로 저장합니다.
+    Returns:
+        tuple: ({섹션 키: 데이터 리스트} 딕셔너리, 로드 통계 딕셔너리).
+               캐시를 사용한 경우 각 섹션은 리스트 대신 읽기 전용 시퀀스(ColumnarRecords)입니다.
+               오류가 발생하거나 섹션이 올바르지 않으면 해당 섹션은 빈 리스트가 되고, 통계의 'failed_sections'에
+               해당 섹션 키가 기록됩니다 (빈 섹션과 읽기 실패를 구분하기 위함). JSONL 입력에서 건너뛴 줄이 있으면
+               어느 섹션의 레코드였는지 알 수 없으므로 모든 섹션을 'failed_sections'로 기록합니다.
+    """
+    sections = {data_key: [] for data_key in data_keys}
+    load_stats = {'bytes_read': 0, 'read_seconds': 0.0, 'parse_seconds': 0.0, 'total_seconds': 0.0, 'cache_hit': False,
+                  'failed_sections': []}
+
+    if not os.path.exists(file_path):
+        print(f"오류: 통합 데이터 파일 {file_path}을(를) 찾을 수 없습니다.")
+        load_stats['failed_sections'] = list(data_keys)
+        return sections, load_stats
+
+    input_format = detect_input_format(file_path)
+    total_start = time.perf_counter()
+    source_key = None
+    if use_cache:
+        from .record_cache import compute_source_key, load_columnar_cache
+        cached_sections = load_columnar_cache(file_path, data_keys)
+        if cached_sections is not None:
+            load_stats['cache_hit'] = True
+            load_stats['total_seconds'] = time.perf_counter() - total_start
+            counts_display = ", ".join(f"'{data_key}' {len(items)}개" for data_key, items in cached_sections.items())
+            print(f"성공: {file_path}의 컬럼형 캐시에서 {counts_display} 아이템을 로드했습니다 "
+                  f"(파싱 생략, 총 {load_stats['total_seconds']:.3f}초).")
+            return cached_sections, load_stats
+        try:
+            # 캐시 키는 파싱 전에 계산 (파싱 도중 원본이 바뀌면 다음 실행에서 해시가 달라 캐시를 다시 만듦)
+            source_key = compute_source_key(file_path)
+        except OSError as e:
+            print(f"경고: 캐시 키 계산 중 오류 발생 ({file_path}): {e}. 컬럼형 캐시를 저장하지 않습니다.")
+
+    if input_format == 'json':
+        try:
+            data_content, read_stats = _read_integrated_file(file_path)
+            load_stats.update(read_stats)
+        except json.JSONDecodeError:
+            print(f"오류: {file_path} 파일의 JSON 형식이 올바르지 않습니다.")
+            load_stats['failed_sections'] = list(data_keys)
+            return sections, load_stats
+        except Exception as e:
+            print(f"데이터 로드 중 오류 발생 ({file_path}): {e}")
+            load_stats['failed_sections'] = list(data_keys)
+            return sections, load_stats
+
+        if not isinstance(data_content, dict):
+            print(f"오류: {file_path} 파일의 최상위 구조가 객체(딕셔너리)가 아닙니다.")
+            load_stats['failed_sections'] = list(data_keys)
+            return sections, load_stats
+
+        for data_key in data_keys:
+            item_list = data_content.get(data_key)
+            if item_list is None:
+                print(f"오류: {file_path} 파일에 '{data_key}' 키가 없습니다.")
+                load_stats['failed_sections'].append(data_key)
+            elif not isinstance(item_list, list):
+                print(f"오류: {file_path} 파일의 '{data_key}' 키의 값이 리스트가 아닙니다.")
+                load_stats['failed_sections'].append(data_key)
+            else:
+                sections[data_key] = item_list
+    else:
+        if input_format == 'shards':
+            # 파일명으로 요청되지 않은 섹션임을 알 수 있는 샤드는 읽지 않음
+            source_files = [
+                shard_file for shard_file in list_shard_files(file_path)
+                if _doc_type_from_shard_name(shard_file) is None
+                or DOC_TYPE_TO_DATA_KEY[_doc_type_from_shard_name(shard_file)] in data_keys
+            ]
+        else:
+            source_files = [file_path]
+        if not source_files:
+            print(f"오류: 샤드 디렉토리 {file_path}에 JSONL 파일이 없습니다.")
+            load_stats['failed_sections'] = list(data_keys)
+            return sections, load_stats
+        try:
+            loaded_sections, read_stats = _read_jsonl_sources(source_files, max_workers)
+            load_stats.update(read_stats)
+        except Exception as e:
+            print(f"데이터 로드 중 오류 발생 ({file_path}): {e}")
+            load_stats['failed_sections'] = list(data_keys)
+            return sections, load_stats
+        for data_key in data_keys:
+            sections[data_key] = loaded_sections.get(data_key, [])
+        if read_stats['skipped_lines']:
+            print(f"경고: {file_path}에서 읽을 수 없는 줄 {read_stats['skipped_lines']}개를 건너뛰었습니다. "
+                  f"모든 섹션을 읽기 실패로 표시합니다.")
+            load_stats['failed_sections'] = list(data_keys)
+
+    load_stats['total_seconds'] = time.perf_counter() - total_start
+    if source_key is not None:
+        if load_stats['failed_sections']:
+            # 읽기에 실패한 섹션(빈 리스트)을 캐시에 저장하면 다음 실행에서 실패 여부를 알 수 없게 되므로 저장하지 않음
+            print(f"일부 섹션({', '.join(load_stats['failed_sections'])})을 읽지 못해 컬럼형 캐시를 저장하지 않습니다.")
+        else:
+            from .record_cache import save_columnar_cache
+            save_columnar_cache(sections, file_path, source_key=source_key)
+    counts_display = ", ".join(f"'{data_key}' {len(items)}개" for data_key, items in sections.items())
+    source_display = f"JSONL 샤드 {load_stats['files_read']}개, 워커 {load_stats['workers']}개, " if input_format == 'shards' else ""
+    print(f"성공: {file_path}에서 {counts_display} 아이템을 로드했습니다 "
+          f"({source_display}{load_stats['bytes_read'] / (1024 * 1024):.1f} MB, 읽기 {load_stats['read_seconds']:.3f}초, "
+          f"파싱 {load_stats['parse_seconds']:.3f}초, 총 {load_stats['total_seconds']:.3f}초).")
+    return sections, load_stats
+
+def write_jsonl_shards(sections, output_dir, shard_size=10000):
+    """
+    섹션별 레코드를 'employees-0001.jsonl' 형태의 JSONL 샤드로 저장합니다.
+    각 줄에는 'doc_type' 필드가 추가되며, 기존 통합 JSON 파일을 샤드 형식으로 옮길 때 사용합니다.
+    Args:
+        sections (dict): {섹션 키: 레코드 리스트} (load_integrated_data의 반환값과 동일한 형태).
+        output_dir (str): 샤드를 저장할 디렉토리.
+        shard_size (int): 샤드 하나에 담을 최대 레코드 수.
+    Returns:
+        list: 생성된 샤드 파일 경로 목록.
+    """
+    data_key_to_doc_type = {data_key: doc_type for doc_type, data_key in DOC_TYPE_TO_DATA_KEY.items()}
+    os.makedirs(output_dir, exist_ok=True)
+    written_files = []
+    for data_key, records in sections.items():
+        doc_type = data_key_to_doc_type.get(data_key)
+        if doc_type is None:
+            print(f"경고: '{data_key}' 섹션의 doc_type을 알 수 없어 샤드로 저장하지 않습니다.")
+            continue
+        for shard_index, start_idx in enumerate(range(0, len(records), shard_size), start=1):
+            shard_path = os.path.join(output_dir, f"{data_key}-{shard_index:04d}.jsonl")
+            append_records_to_jsonl(shard_path, records[start_idx:start_idx + shard_size], doc_type, mode='w')
+            written_files.append(shard_path)
+    print(f"{output_dir}에 JSONL 샤드 {len(written_files)}개를 저장했습니다.")
+    return written_files
+
+def append_records_to_jsonl(file_path, records, doc_type, mode='a'):
+    """
+    레코드를 JSONL 파일 끝에 추가합니다 (일일 HR 변경분을 전체 파일 재작성 없이 덧붙일 때 사용).
+    Args:
+        file_path (str): JSONL 파일 경로.
+        records (iterable): 추가할 레코드(dict) 목록.
+        doc_type (str): 'employee' 또는 'job'.
+        mode (str): 파일 열기 모드. 기본값 'a'(추가).
+    Returns:
+        int: 기록한 레코드 수.
+    """
+    written_count = 0
+    with open(file_path, mode, encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps({**record, 'doc_type': doc_type}, ensure_ascii=False))
+            f.write('\n')
+            written_count += 1
+    return written_count
+
+STREAM_READ_CHUNK_BYTES = 1 << 16  # 스트리밍 읽기 시 한 번에 읽어들이는 문자 수
+_JSON_WHITESPACE = ' \t\n\r'
+
+class _IncrementalJsonScanner:
+    """
+    파일을 일정 크기씩 읽으면서 JSON 토큰을 순서대로 해석하는 내부 스캐너.
+    이미 소비한 앞부분은 버퍼에서 잘라내므로 메모리 사용량은 현재 해석 중인 값 하나의 크기로 제한됩니다.
+    """
+    def __init__(self, text_file, chunk_size=STREAM_READ_CHUNK_BYTES):
+        self._file = text_file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """버퍼에 다음 청크를 추가합니다. 더 읽을 내용이 없으면 False를 반환합니다."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """공백을 건너뛴 뒤 다음 문자를 소비하지 않고 반환합니다. 파일 끝이면 빈 문자열."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _JSON_WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, expected_chars):
+        """다음 문자가 expected_chars 중 하나인지 확인하고 소비합니다."""
+        char = self.peek()
+        if not char or char not in expected_chars:
+            raise json.JSONDecodeError(f"'{expected_chars}' 문자가 필요합니다", self._buffer, self._pos)
+        self._pos += 1
+        return char
+
+    def decode_value(self):
+        """다음 JSON 값 하나를 해석하여 반환합니다. 값이 청크 경계에 걸치면 더 읽은 뒤 다시 시도합니다."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # 숫자 등은 버퍼 끝에서 잘려도 해석될 수 있으므로, 끝에 닿았다면 더 읽어 확인합니다.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self):
+        """다음 JSON 값을 객체로 만들지 않고 건너뜁니다 (다른 섹션을 읽지 않기 위함)."""
+        if self.peek() not in '{[':
+            self.decode_value()
+            return
+        depth = 0
+        in_string = False
+        escaped = False
+        while True:
+            if self._pos >= len(self._buffer) and not self._fill():
+                raise json.JSONDecodeError("값이 끝나기 전에 파일이 끝났습니다", self._buffer, self._pos)
+            char = self._buffer[self._pos]
+            self._pos += 1
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 0:
+                    return
+
+def _iter_section_items(text_file, data_key):
+    """열린 통합 JSON 파일에서 data_key 배열의 원소를 하나씩 생성하는 내부 제너레이터."""
+    scanner = _IncrementalJsonScanner(text_file)
+    scanner.expect('{')
+    if scanner.peek() == '}':
+        raise KeyError(data_key)
+    while True:
+        key = scanner.decode_value()
+        scanner.expect(':')
+        if key == data_key:
+            if scanner.peek() != '[':
+                raise TypeError(data_key)
+            scanner.expect('[')
+            if scanner.peek() == ']':
+                return
+            while True:
+                yield scanner.decode_value()
+                if scanner.expect(',]') == ']':
+                    return
+        scanner.skip_value()
+        if scanner.expect(',}') == '}':
+            raise KeyError(data_key)
+
+def _iter_section_items_from_jsonl(file_path, data_key):
+    """JSONL 파일 또는 샤드 디렉토리에서 data_key 섹션에 해당하는 레코드만 순서대로 생성하는 내부 제너레이터."""
+    if os.path.isdir(file_path):
+        source_files = list_shard_files(file_path)
+    else:
+        source_files = [file_path]
+    read_stats = {'skipped_lines': 0}
+    for source_file in source_files:
+        shard_doc_type = _doc_type_from_shard_name(source_file)
+        if shard_doc_type is not None and DOC_TYPE_TO_DATA_KEY[shard_doc_type] != data_key and os.path.isdir(file_path):
+            continue # 파일명으로 다른 섹션임을 알 수 있는 샤드는 열지 않음
+        for doc_type, record in _iter_jsonl_records(source_file, read_stats):
+            if DOC_TYPE_TO_DATA_KEY[doc_type] == data_key:
+                yield record
+    if read_stats['skipped_lines']:
+        # 건너뛴 줄이 이 섹션의 레코드였을 수 있으므로 섹션 전체를 읽었다고 볼 수 없음
+        raise DataLoadError(f"{file_path}에서 읽을 수 없는 줄 {read_stats['skipped_lines']}개를 건너뛰어 "
+                            f"'{data_key}' 섹션을 모두 읽었는지 알 수 없습니다.")
+
+def iter_records_from_integrated_file(file_path, data_key, chunk_size=None):
+    """
+    통합 데이터 전체를 메모리에 올리지 않고 data_key 배열의 레코드를 순서대로 생성합니다.
+    대용량(수십만~수백만 건) 파일에서도 메모리 사용량이 레코드 하나(또는 청크 하나) 크기로 유지됩니다.
+    JSONL 파일과 JSONL 샤드 디렉토리도 같은 방식으로 읽을 수 있습니다.
+    Args:
+        file_path (str): JSON/JSONL 파일 또는 샤드 디렉토리 경로.
+        data_key (str): 데이터 리스트를 포함하는 JSON 내의 키 (예: 'employees', 'job_descriptions').
+        chunk_size (int, optional): 지정하면 레코드를 이 크기의 리스트로 묶어서 생성합니다.
+    Yields:
+        dict 또는 list: 레코드 하나, 또는 chunk_size가 지정된 경우 레코드 리스트.
+    Raises:
+        DataLoadError: 파일이나 키가 없거나, 값이 리스트가 아니거나, JSON 형식이 올바르지 않은 경우
+            (JSONL 입력은 읽을 수 없는 줄을 건너뛴 경우에도 섹션 끝에서 발생).
+            소비 측(동기화)이 읽기 실패를 "레코드 없음"으로 오인하여 기존 데이터를 삭제하지 않도록 빈 결과로 끝내지 않습니다.
+    """
+    if not os.path.exists(file_path):
+        raise DataLoadError(f"통합 데이터 파일 {file_path}을(를) 찾을 수 없습니다.")
+
+    yielded_count = 0
+    pending_chunk = []
+    try:
+        if detect_input_format(file_path) == 'json':
+            text_file = open(file_path, 'r', encoding='utf-8')
+            section_items = _iter_section_items(text_file, data_key)
+        else:
+            text_file = None
+            section_items = _iter_section_items_from_jsonl(file_path, data_key)
+        try:
+            for item in section_items:
+                yielded_count += 1
+                if chunk_size:
+                    pending_chunk.append(item)
+                    if len(pending_chunk) >= chunk_size:
+                        yield pending_chunk
+                        pending_chunk = []
+                else:
+                    yield item
+        finally:
+            if text_file is not None:
+                text_file.close()
+        if pending_chunk:
+            yield pending_chunk
+        print(f"성공: {file_path}에서 '{data_key}' 키의 아이템 {yielded_count}개를 스트리밍으로 읽었습니다.")
+    except KeyError as e:
+        raise DataLoadError(f"{file_path} 파일에 '{data_key}' 키가 없거나 파일 구조가 예상과 다릅니다.") from e
+    except TypeError as e:
+        raise DataLoadError(f"{file_path} 파일의 '{data_key}' 키의 값이 리스트가 아닙니다.") from e
+    except json.JSONDecodeError as e:
+        raise DataLoadError(f"{file_path} 파일의 JSON 형식이 올바르지 않습니다 ({yielded_count}개 아이템 이후): {e}") from e
+
+def iter_employees_from_integrated_file(file_path, chunk_size=None):
+    """통합 파일에서 HR 직원 데이터를 스트리밍으로 읽습니다."""
+    return iter_records_from_integrated_file(file_path, 'employees', chunk_size)
+
+def iter_job_descriptions_from_integrated_file(file_path, chunk_size=None):
+    """통합 파일에서 채용 공고(Job Description) 데이터를 스트리밍으로 읽습니다."""
+    return iter_records_from_integrated_file(file_path, 'job_descriptions', chunk_size)
+
 def load_employees_from_integrated_file(file_path):
     """통합 파일에서 HR 직원 데이터를 로드합니다."""
     return _load_specific_data_from_integrated_file(file_path, 'employees')
@@ -86,5 +586,33 @@ if __name__ == '__main__':
         print(f"로드된 채용 공고 수: {len(job_records)}")
         if job_records: print(f"첫 번째 채용 공고: {job_records[0].get('title')}")
 
+    print("\n--- 통합 로드 테스트 (단일 파싱) ---")
+    integrated_sections, integrated_stats = load_integrated_data(integrated_test_file)
+    print(f"직원 {len(integrated_sections['employees'])}명, 채용 공고 {len(integrated_sections['job_descriptions'])}건, "
+          f"읽은 바이트: {integrated_stats['bytes_read']}")
+
+    print("\n--- 스트리밍 읽기 테스트 (통합 파일) ---")
+    streamed_jobs = list(iter_job_descriptions_from_integrated_file(integrated_test_file))
+    print(f"스트리밍으로 읽은 채용 공고 수: {len(streamed_jobs)}, 원본과 동일: {streamed_jobs == job_records}")
+    for employee_chunk in iter_employees_from_integrated_file(integrated_test_file, chunk_size=1):
+        print(f"직원 청크: {[emp.get('id') for emp in employee_chunk]}")
+    try:
+        list(iter_records_from_integrated_file(integrated_test_file, 'unknown_section'))
+    except DataLoadError as e:
+        print(f"없는 섹션 스트리밍 읽기 오류 확인: {e}")
+
+    print("\n--- JSONL 샤드 테스트 ---")
+    shard_test_dir = 'integrated_data_temp_shards'
+    write_jsonl_shards(integrated_sections, shard_test_dir, shard_size=1)
+    append_records_to_jsonl(os.path.join(shard_test_dir, 'employees-0003.jsonl'),
+                            [{"id": "EMP_TEST_003", "name": "박직원", "position": "기획자", "department": "기획팀"}], 'employee')
+    shard_sections, shard_stats = load_integrated_data(shard_test_dir, max_workers=2)
+    print(f"샤드에서 로드한 직원 수: {len(shard_sections['employees'])}, 채용 공고 수: {len(shard_sections['job_descriptions'])}")
+    streamed_shard_employees = list(iter_employees_from_integrated_file(shard_test_dir))
+    print(f"샤드 스트리밍 직원 ID: {[emp.get('id') for emp in streamed_shard_employees]}")
+
     # --- 테스트 파일 삭제 ---
     os.remove(integrated_test_file)
+    for shard_file in list_shard_files(shard_test_dir):
+        os.remove(shard_file)
+    os.rmdir(shard_test_dir)
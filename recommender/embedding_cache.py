@@ -0,0 +1,199 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 임베딩 결과의 영구 캐시 관리
+내용 : (모델 이름, 임베딩용 텍스트의 SHA-256) 쌍을 키로 임베딩 벡터를 로컬 SQLite 파일에 float32 바이트로 저장합니다.
+모델을 호출하기 전에 캐시를 먼저 조회하여 이미 계산한 텍스트는 다시 임베딩하지 않으므로,
+컬렉션 재생성, 컬렉션 이름 변경, 다른 장비로의 재구축 시에도 임베딩 비용을 아낄 수 있습니다.
+최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+"""
+# hr_recommender/recommender/embedding_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+_SQLITE_MAX_VARIABLES = 500 # IN (...) 절 한 번에 넣을 최대 파라미터 수
+
+
+def hash_text(text):
+    """임베딩용 텍스트의 SHA-256 해시를 반환합니다."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite 기반 임베딩 캐시. 여러 스레드에서 사용할 수 있도록 연결 하나를 잠금으로 보호합니다.
+    Args:
+        cache_path (str): SQLite 파일 경로.
+        model_name (str): 캐시 키에 포함할 모델 이름 (모델이 바뀌면 다른 항목으로 취급).
+        max_entries (int, optional): 최대 저장 항목 수. None이면 제한 없음.
+    """
+    def __init__(self, cache_path, model_name, max_entries=None):
+        self.cache_path = cache_path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        cache_dir = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model_name TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model_name, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    def lookup(self, texts):
+        """
+        텍스트 목록에 대해 캐시에 있는 임베딩을 조회합니다.
+        Returns:
+            dict: {텍스트 위치(index): np.ndarray(float32)}. 캐시에 없는 텍스트는 포함되지 않습니다.
+        """
+        text_hashes = [hash_text(text) for text in texts]
+        found_vectors = {}
+        now = time.time()
+        with self._lock:
+            unique_hashes = list(dict.fromkeys(text_hashes))
+            for start_idx in range(0, len(unique_hashes), _SQLITE_MAX_VARIABLES):
+                hash_chunk = unique_hashes[start_idx:start_idx + _SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(hash_chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, dim, vector FROM embeddings WHERE model_name = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *hash_chunk]
+                ).fetchall()
+                for text_hash, dim, vector_bytes in rows:
+                    found_vectors[text_hash] = np.frombuffer(vector_bytes, dtype=np.float32, count=dim)
+                if rows:
+                    hit_placeholders = ",".join("?" * len(rows))
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE model_name = ? AND text_hash IN ({hit_placeholders})",
+                        [now, self.model_name, *(row[0] for row in rows)]
+                    )
+            self._conn.commit()
+
+        cached = {index: found_vectors[text_hash] for index, text_hash in enumerate(text_hashes) if text_hash in found_vectors}
+        self.hits += len(cached)
+        self.misses += len(texts) - len(cached)
+        return cached
+
+    def store(self, texts, vectors):
+        """텍스트와 임베딩 벡터를 캐시에 저장하고, 최대 항목 수를 넘으면 오래된 항목을 삭제합니다."""
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((self.model_name, hash_text(text), int(vector.shape[0]), vector.tobytes(), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_name, text_hash, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self):
+        """최대 항목 수를 넘는 만큼 가장 오래 사용되지 않은 항목을 삭제합니다 (잠금을 잡은 상태에서 호출)."""
+        if not self.max_entries:
+            return
+        entry_count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = entry_count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+
+    def encode(self, embedding_model, texts, encode_fn=None):
+        """
+        캐시를 먼저 조회하고, 없는 텍스트만 모델로 임베딩한 뒤 결과를 캐시에 저장합니다.
+        Args:
+            embedding_model: .encode(list[str])를 제공하는 임베딩 모델.
+            texts (list): 임베딩할 텍스트 목록.
+            encode_fn (callable, optional): 캐시에 없는 텍스트를 임베딩할 함수. 기본값은 embedding_model.encode.
+        Returns:
+            np.ndarray: 입력 순서대로 정렬된 (len(texts), dim) float32 배열.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        cached_vectors = self.lookup(texts)
+        missing_positions = [index for index in range(len(texts)) if index not in cached_vectors]
+        if missing_positions:
+            missing_texts = [texts[index] for index in missing_positions]
+            if encode_fn is None:
+                computed = embedding_model.encode(missing_texts, convert_to_tensor=False)
+            else:
+                computed = encode_fn(missing_texts)
+            computed = np.asarray(computed, dtype=np.float32)
+            self.store(missing_texts, computed)
+            for position, vector in zip(missing_positions, computed):
+                cached_vectors[position] = vector
+        return np.vstack([cached_vectors[index] for index in range(len(texts))])
+
+    def stats(self):
+        """누적 조회 통계(적중/미적중/적중률)를 반환합니다."""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_embedding_cache(cache_path, model_name, max_entries=None):
+    """
+    임베딩 캐시를 엽니다. 경로가 없거나 열 수 없으면 None을 반환하여 캐시 없이 동작하도록 합니다.
+    Args:
+        cache_path (str): SQLite 파일 경로. None이면 캐시를 사용하지 않습니다.
+        model_name (str): 캐시 키에 포함할 모델 이름.
+        max_entries (int, optional): 최대 저장 항목 수.
+    Returns:
+        EmbeddingCache 또는 None
+    """
+    if not cache_path:
+        return None
+    try:
+        embedding_cache = EmbeddingCache(cache_path, model_name, max_entries)
+        print(f"임베딩 캐시 사용: {cache_path} (모델: {model_name}, 최대 {max_entries or '무제한'}개)")
+        return embedding_cache
+    except (sqlite3.Error, OSError) as e:
+        print(f"경고: 임베딩 캐시({cache_path})를 열 수 없습니다: {e}. 캐시 없이 진행합니다.")
+        return None
+
+
+if __name__ == '__main__':
+    # --- 테스트용 코드 ---
+    class _FakeModel:
+        """호출 횟수를 세는 테스트용 임베딩 모델."""
+        def __init__(self):
+            self.encoded_texts = 0
+        def encode(self, texts, convert_to_tensor=False):
+            self.encoded_texts += len(texts)
+            return np.array([[len(text), 1.0, 0.5] for text in texts], dtype=np.float32)
+
+    test_cache_path = 'embedding_cache_temp_test.sqlite3'
+    fake_model = _FakeModel()
+    test_cache = open_embedding_cache(test_cache_path, 'fake-model', max_entries=3)
+    first = test_cache.encode(fake_model, ["직원 A", "직원 B"])
+    second = test_cache.encode(fake_model, ["직원 B", "직원 C", "직원 A"])
+    print(f"모델 호출 텍스트 수: {fake_model.encoded_texts} (기대값 3), 결과 일치: {np.array_equal(first[0], second[2])}")
+    test_cache.encode(fake_model, ["직원 D"])
+    remaining = test_cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    print(f"최대 3개 제한 후 남은 항목 수: {remaining}, 통계: {test_cache.stats()}")
+    test_cache.close()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(test_cache_path + suffix):
+            os.remove(test_cache_path + suffix)
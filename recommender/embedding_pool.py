@@ -0,0 +1,107 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 대량 임베딩을 위한 멀티 프로세스 인코딩 풀
+내용 : GPU 없이 여러 CPU 코어를 가진 장비에서 대량 데이터를 임베딩할 때, 여러 워커 프로세스가 각자 모델을 로드하여
+문서 목록을 나누어 임베딩합니다. 워커별 torch 스레드 수는 전체 코어 수를 워커 수로 나눈 값으로 맞추어 과도한 스레드 경합을 막고,
+결과는 항상 입력 순서대로 합쳐 반환하므로 ChromaDB upsert 순서가 결정적으로 유지됩니다.
+임베딩 모델과 같은 .encode(list[str]) 인터페이스를 제공하여 vector_db에 그대로 전달할 수 있습니다.
+"""
+# hr_recommender/recommender/embedding_pool.py
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+_worker_model = None # 워커 프로세스마다 한 번 로드되는 임베딩 모델
+
+
+def _init_worker(model_name, threads_per_worker):
+    """워커 프로세스 초기화: 스레드 수를 제한한 뒤 모델을 한 번 로드합니다."""
+    global _worker_model
+    # torch/BLAS가 임포트되기 전에 스레드 수를 정해야 모든 워커가 코어를 나누어 씀
+    for env_name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[env_name] = str(threads_per_worker)
+    os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+    from .model_registry import MODEL_CACHE_DIR, load_embedding_model, quantize_model, resolve_quantization_mode
+    from .embedding_utils import EMBEDDING_BACKEND
+    if EMBEDDING_BACKEND == 'onnx' and MODEL_CACHE_DIR:
+        # 메인 프로세스가 먼저 내보낸 ONNX 모델을 로드 (torch 없이 추론, 스레드 수는 onnxruntime 세션에 적용)
+        from .onnx_backend import load_onnx_embedding_model
+        _worker_model = load_onnx_embedding_model(model_name, verbose=False, intra_op_threads=threads_per_worker)
+        return
+
+    import torch
+    torch.set_num_threads(threads_per_worker)
+    if MODEL_CACHE_DIR:
+        # 메인 프로세스가 먼저 만든 로컬 스냅샷/직렬화 모델을 네트워크 없이 로드 (양자화 설정도 메인 프로세스와 동일하게 적용)
+        _worker_model = load_embedding_model(model_name, device='cpu', verbose=False)
+    else:
+        from sentence_transformers import SentenceTransformer
+        _worker_model = quantize_model(SentenceTransformer(model_name, device='cpu'), resolve_quantization_mode())
+
+def _encode_chunk(texts, batch_size):
+    """워커 프로세스에서 텍스트 청크 하나를 임베딩합니다."""
+    return np.asarray(_worker_model.encode(texts, batch_size=batch_size, convert_to_tensor=False), dtype=np.float32)
+
+
+class EmbeddingPool:
+    """
+    여러 프로세스에 문서를 나누어 임베딩하는 풀. 모델과 같은 encode() 인터페이스를 제공합니다.
+    Args:
+        model_name (str): 각 워커가 로드할 모델 이름 또는 로컬 경로.
+        num_workers (int): 워커 프로세스 수.
+        chunk_size (int): 워커 하나에 한 번에 넘길 문서 수.
+        threads_per_worker (int, optional): 워커별 torch 스레드 수. 기본값은 CPU 코어 수 / 워커 수.
+    """
+    def __init__(self, model_name, num_workers, chunk_size=256, threads_per_worker=None):
+        self.model_name = model_name
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        # fork는 부모의 torch 스레드 풀 상태를 물려받아 멈출 수 있으므로 spawn 사용
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(model_name, self.threads_per_worker),
+        )
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, **kwargs):
+        """
+        문서 목록을 청크로 나누어 워커들에게 분배하고, 입력 순서대로 합친 임베딩 배열을 반환합니다.
+        Returns:
+            np.ndarray: (len(sentences), dim) float32 배열.
+        """
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        chunks = [sentences[start_idx:start_idx + self.chunk_size] for start_idx in range(0, len(sentences), self.chunk_size)]
+        if not chunks:
+            return np.zeros((0, 0), dtype=np.float32)
+        # executor.map은 제출 순서대로 결과를 돌려주므로 ID 순서가 유지됨
+        return np.vstack(list(self._executor.map(_encode_chunk, chunks, [batch_size] * len(chunks))))
+
+    def close(self):
+        """워커 프로세스를 종료합니다."""
+        self._executor.shutdown(wait=True)
+
+
+def start_embedding_pool(model_name, num_workers, chunk_size=256):
+    """
+    멀티 프로세스 임베딩 풀을 시작합니다. 워커 수가 1 이하이면 None을 반환하여 단일 모델을 사용하도록 합니다.
+    Returns:
+        EmbeddingPool 또는 None
+    """
+    if not num_workers or num_workers <= 1:
+        return None
+    try:
+        embedding_pool = EmbeddingPool(model_name, num_workers, chunk_size)
+        print(f"멀티 프로세스 임베딩 풀 시작: 워커 {num_workers}개, 워커당 스레드 {embedding_pool.threads_per_worker}개, "
+              f"청크 크기 {chunk_size}")
+        return embedding_pool
+    except Exception as e:
+        print(f"경고: 멀티 프로세스 임베딩 풀을 시작할 수 없습니다: {e}. 단일 프로세스로 진행합니다.")
+        return None
@@ -5,22 +5,69 @@
 내용 : Hugging Face의 Sentence Transformer 모델을 로드하고, 
 직원 정보 및 채용 공고 정보를 임베딩 생성을 위한 단일 텍스트 문자열로 가공하는 기능을 수행합니다. 
 모델 로드 실패 시 오류 처리를 포함합니다.
+sentence_transformers(torch, transformers 포함)는 가져오는 데만 수 초가 걸리므로 모델을 실제로 로드할 때 가져옵니다.
 """
 # hr_recommender/recommender/embedding_utils.py
 
-from sentence_transformers import SentenceTransformer
+from .model_registry import (MODEL_CACHE_DIR, MODEL_WARMUP_BATCH_SIZES, configure_torch_threads, get_model_cache_key,
+                             load_embedding_model, quantize_model, resolve_quantization_mode, warm_up_model)
+
+try:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import TORCH_INTRA_OP_THREADS, TORCH_INTER_OP_THREADS
+except ImportError:
+    TORCH_INTRA_OP_THREADS = None
+    TORCH_INTER_OP_THREADS = None
+
+try:
+    from config import EMBEDDING_BACKEND
+except ImportError:
+    EMBEDDING_BACKEND = 'torch'
 
 def get_embedding_model(model_name):
     """
     지정된 이름의 Sentence Transformer 모델을 로드합니다.
+    MODEL_CACHE_DIR이 설정되어 있으면 로컬 모델 저장소를 사용합니다 (최초 1회 스냅샷 생성 후 오프라인 로드).
+    로드 전에 torch 스레드 수(TORCH_INTRA_OP_THREADS / TORCH_INTER_OP_THREADS)를 적용하고, 로드 후 워밍업을 실행하여
+    첫 검색 쿼리도 이후 쿼리와 같은 지연 시간으로 처리되도록 합니다.
+    MODEL_QUANTIZATION='dynamic_int8'이면 int8 동적 양자화 모델을 반환하며, model.model_name에 양자화 모드가 포함됩니다.
+    EMBEDDING_BACKEND='onnx'이면 한 번 내보낸 ONNX 모델을 onnxruntime으로 추론하는 OnnxEmbeddingModel을 반환합니다 (같은 encode 형식).
     Args:
         model_name (str): Hugging Face 모델 이름 또는 로컬 경로
     Returns:
-        SentenceTransformer: 로드된 모델 객체. 오류 시 None 반환.
+        SentenceTransformer 또는 OnnxEmbeddingModel: 로드된 모델 객체. 오류 시 None 반환.
     """
-    print(f"Sentence Transformer 모델 ({model_name}) 로드 중...")
+    backend = EMBEDDING_BACKEND
+    if backend == 'onnx' and not MODEL_CACHE_DIR:
+        print("경고: ONNX 백엔드는 MODEL_CACHE_DIR에 ONNX 파일을 보관해야 합니다. torch 백엔드로 로드합니다.")
+        backend = 'torch'
+    print(f"Sentence Transformer 모델 ({model_name}) 로드 중..." + (" (ONNX Runtime)" if backend == 'onnx' else ""))
     try:
-        model = SentenceTransformer(model_name)
+        if backend == 'onnx':
+            # 추론에 torch/sentence_transformers를 가져오지 않음 (스레드 수 설정은 onnxruntime 세션에 적용)
+            from .onnx_backend import load_onnx_embedding_model
+            model = load_onnx_embedding_model(model_name)
+            if MODEL_WARMUP_BATCH_SIZES:
+                print(f"모델 워밍업 완료 ({warm_up_model(model):.2f}초)")
+        else:
+            if TORCH_INTRA_OP_THREADS or TORCH_INTER_OP_THREADS:
+                intra_op_threads, inter_op_threads = configure_torch_threads(TORCH_INTRA_OP_THREADS, TORCH_INTER_OP_THREADS)
+                print(f"torch 스레드 설정: intra-op {intra_op_threads}개, inter-op {inter_op_threads}개")
+            if MODEL_CACHE_DIR:
+                # 로컬 저장소(스냅샷/직렬화 모델)를 거쳐 네트워크 없이 로드 (워밍업 포함)
+                model = load_embedding_model(model_name)
+            else:
+                from sentence_transformers import SentenceTransformer # 무거운 의존성은 처음 사용할 때 가져옴
+                model = quantize_model(SentenceTransformer(model_name), resolve_quantization_mode())
+                model.quantization = resolve_quantization_mode()
+                if MODEL_WARMUP_BATCH_SIZES:
+                    print(f"모델 워밍업 완료 ({warm_up_model(model):.2f}초)")
+        # 쿼리 임베딩 캐시 키 등에서 모델을 구분하기 위해 기록 (양자화 모드가 다르면 다른 모델로 취급)
+        model.model_name = get_model_cache_key(model_name, model.quantization, backend)
+        if model.quantization:
+            print(f"양자화 모드: {model.quantization} (Linear 계층 int8)")
         print("모델 로드 완료.")
         return model
     except Exception as e:
@@ -91,6 +138,14 @@ if __name__ == '__main__':
     test_model = get_embedding_model(MODEL_NAME)
     if test_model:
         print(f"{MODEL_NAME} 모델이 성공적으로 로드되었습니다.")
+        # 워밍업 후 첫 쿼리와 이후 쿼리의 지연 시간 비교
+        import time
+        query_latencies = []
+        for test_query in ["백엔드 개발자 Python", "데이터 분석 프로젝트", "모바일 앱 개발", "클라우드 인프라 구축"]:
+            query_start = time.perf_counter()
+            test_model.encode([test_query], convert_to_tensor=False)
+            query_latencies.append((time.perf_counter() - query_start) * 1000)
+        print(f"쿼리 임베딩 지연 시간: 첫 쿼리 {query_latencies[0]:.1f}ms, 이후 평균 {sum(query_latencies[1:]) / 3:.1f}ms")
 
     sample_employee = {
         "id": "EMP00001", "name": "홍길동", "position": "시니어 개발자", "department": "R&D팀",
@@ -0,0 +1,72 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 목록형 메타데이터(기술, 언어, 자격증)의 필터용 키 생성
+내용 : ChromaDB 메타데이터에는 목록이 "a, b, c" 문자열로 저장되어 DB 안에서 정확한 포함 여부 조건을 걸 수 없습니다.
+목록의 각 값을 정규화(공백 정리, 소문자)하여 'skill:python', 'lang:영어(비즈니스)' 같은 불리언 키로도 저장하면
+"Python 보유 AND 영어(비즈니스)" 같은 조건을 where 절({"skill:python": True})로 표현할 수 있습니다.
+언어는 숙련도 표기를 뗀 기본 언어 키('lang:영어')도 함께 저장하여 숙련도와 무관한 조건도 지원합니다.
+"""
+# hr_recommender/recommender/metadata_index.py
+
+import re
+
+# 원본 필드 이름 -> 필터 키 접두사. 채용 공고의 필수 기술은 직원 보유 기술과 같은 접두사를 사용하여 한 조건으로 함께 검색
+LIST_FIELD_KEY_PREFIXES = {
+    'skills': 'skill',
+    'required_skills': 'skill',
+    'preferred_skills': 'preferred_skill',
+    'languages': 'lang',
+    'certifications': 'cert',
+}
+
+_PROFICIENCY_SUFFIX = re.compile(r'\s*\([^)]*\)\s*$') # "영어(비즈니스)"의 "(비즈니스)" 부분
+
+
+def normalize_term(value):
+    """필터 키에 사용할 값으로 정규화합니다 (앞뒤 공백 제거, 연속 공백 하나로, 소문자)."""
+    return " ".join(str(value).split()).lower()
+
+def base_language(value):
+    """숙련도 표기를 뗀 기본 언어 이름을 반환합니다. 예: '영어(비즈니스)' -> '영어'."""
+    return _PROFICIENCY_SUFFIX.sub('', normalize_term(value))
+
+def filter_key(prefix, value):
+    """접두사와 값으로 필터 키를 만듭니다. 예: filter_key('skill', 'Python') -> 'skill:python'."""
+    return f"{prefix}:{normalize_term(value)}"
+
+def build_list_filter_keys(field_name, values):
+    """
+    목록형 필드 값으로부터 메타데이터에 추가할 불리언 필터 키를 만듭니다.
+    Args:
+        field_name (str): 원본 필드 이름 (예: 'skills', 'languages').
+        values (list): 필드 값 목록.
+    Returns:
+        dict: {필터 키: True}. 필터 대상이 아닌 필드이면 빈 딕셔너리.
+    """
+    prefix = LIST_FIELD_KEY_PREFIXES.get(field_name)
+    if not prefix or not values:
+        return {}
+    filter_keys = {}
+    for value in values:
+        if value is None or not normalize_term(value):
+            continue
+        filter_keys[filter_key(prefix, value)] = True
+        if prefix == 'lang':
+            filter_keys[filter_key(prefix, base_language(value))] = True
+    return filter_keys
+
+def language_filter_key(language):
+    """요구 언어 조건에 해당하는 필터 키를 반환합니다. 숙련도 없이 입력하면 기본 언어 키가 됩니다."""
+    return filter_key('lang', language)
+
+def skill_filter_key(skill):
+    """요구 기술 조건에 해당하는 필터 키를 반환합니다 (직원 보유 기술, 채용 공고 필수 기술 공통)."""
+    return filter_key('skill', skill)
+
+
+if __name__ == '__main__':
+    # --- 테스트용 코드 ---
+    print(build_list_filter_keys('languages', ["한국어(원어민)", "영어(비즈니스)"]))
+    print(build_list_filter_keys('skills', ["Python", " Spring  Boot "]))
+    print(language_filter_key("영어"), skill_filter_key("PYTHON"))
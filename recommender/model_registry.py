@@ -0,0 +1,402 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 임베딩 모델 로컬 저장소(registry) - 네트워크 없이 빠르게 모델 로드
+내용 : SentenceTransformer(모델 이름)은 실행할 때마다 Hugging Face hub 경로를 확인하므로, 외부망이 없는 서버에서는 실패하거나 타임아웃까지 대기합니다.
+처음 한 번 로드한 모델을 MODEL_CACHE_DIR 아래에 디렉토리 스냅샷(model.save)으로 고정하고, 이후에는 이 스냅샷만 오프라인으로 읽습니다.
+추가로 초기화가 끝난 모델 객체 전체를 torch.save로 직렬화해 두면 설정 파싱/모듈 구성 없이 역직렬화만으로 로드할 수 있습니다.
+토크나이저는 모델과 분리해 tokenizer.pt로 직렬화하여, 두 파일의 로드 시간을 따로 측정합니다.
+신뢰 경계: 직렬화 파일(model.pt, tokenizer.pt)은 pickle이라 읽는 순간 임의 코드를 실행할 수 있으므로, MODEL_CACHE_DIR은 이 서비스 계정만 쓸 수 있는
+디렉토리여야 합니다. 파일이나 저장소 디렉토리의 소유자가 현재 사용자가 아니거나 다른 사용자가 쓸 수 있으면 역직렬화하지 않고 스냅샷(safetensors,
+코드 실행 없음)에서 로드합니다. 생성 당시 라이브러리 버전(manifest.json)이 다를 때도 스냅샷에서 다시 만듭니다.
+네트워크 차단은 프로세스 환경 변수(HF_HUB_OFFLINE)를 바꾸지 않고, 로드 호출마다 local_files_only로 지정합니다.
+로드 단계별 시간(import, 토크나이저 로드, 가중치 로드, 스냅샷 저장, 토크나이저 첫 호출, 워밍업 forward)을 측정하여 출력합니다.
+스냅샷/원본에서 로드할 때는 모델 생성 중 토크나이저(AutoTokenizer/AutoProcessor) 로드에 쓴 시간을 따로 재고 나머지를 가중치 로드로 봅니다.
+로드 직후 워밍업(MODEL_WARMUP_BATCH_SIZES)으로 첫 쿼리 지연을 없애고, torch 스레드 수 설정 함수도 제공합니다.
+MODEL_QUANTIZATION='dynamic_int8'이면 로드한 fp32 모델의 Linear 계층에 int8 동적 양자화를 적용합니다 (정확도 비교: quantization_check.py).
+저장소 구조: MODEL_CACHE_DIR/<모델 이름>/snapshot/ (디렉토리 스냅샷), model.pt (토크나이저를 뺀 직렬화 모델),
+tokenizer.pt (직렬화 토크나이저), manifest.json
+"""
+# hr_recommender/recommender/model_registry.py
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+try:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import MODEL_CACHE_DIR, MODEL_OFFLINE, MODEL_SERIALIZED_CACHE
+except ImportError:
+    MODEL_CACHE_DIR = "./model_cache"
+    MODEL_OFFLINE = False
+    MODEL_SERIALIZED_CACHE = True
+
+try:
+    from config import MODEL_QUANTIZATION
+except ImportError:
+    MODEL_QUANTIZATION = None
+
+try:
+    from config import MODEL_WARMUP_BATCH_SIZES, MODEL_WARMUP_ROUNDS
+except ImportError:
+    MODEL_WARMUP_BATCH_SIZES = (1, 8)
+    MODEL_WARMUP_ROUNDS = 2
+
+SNAPSHOT_DIR_NAME = 'snapshot'
+SERIALIZED_FILE_NAME = 'model.pt'
+SERIALIZED_TOKENIZER_FILE_NAME = 'tokenizer.pt'
+# 첫 번째 모듈(Transformer)에서 토크나이저를 보관하는 속성 이름 (sentence-transformers 6부터 processor)
+TOKENIZER_ATTRIBUTES = ('processor', 'tokenizer')
+TOKENIZER_LOADER_CLASSES = ('AutoTokenizer', 'AutoProcessor')
+MANIFEST_FILE_NAME = 'manifest.json'
+QUANTIZATION_MODES = (None, 'dynamic_int8')
+WARMUP_TEXT = "소프트웨어 개발 프로젝트"
+# 워밍업용 긴 텍스트 (직원 프로필 임베딩 텍스트와 비슷한 길이로, 긴 시퀀스용 커널도 미리 선택되도록 함)
+WARMUP_LONG_TEXT = ("직책: 시니어 개발자. 부서: IT 개발팀. 보유 기술: Python, Django, AWS, Docker, Kubernetes. "
+                    "주요 프로젝트: 신규 서비스 개발. 레거시 시스템 개선. 사용 언어: 한국어(원어민), 영어(비즈니스). "
+                    "프로필 요약: 다양한 웹 서비스 개발 경험을 가진 개발자입니다.")
+
+
+def get_registry_path(model_name, cache_dir=None):
+    """모델 이름에 해당하는 저장소 디렉토리 경로 (이름을 파일 시스템에 안전한 형태 + 짧은 해시로 변환)."""
+    safe_name = re.sub(r'[^A-Za-z0-9._-]', '_', str(model_name)).strip('._') or 'model'
+    name_hash = hashlib.sha1(str(model_name).encode('utf-8')).hexdigest()[:8]
+    return os.path.join(cache_dir or MODEL_CACHE_DIR, f"{safe_name[-64:]}-{name_hash}")
+
+def _library_versions():
+    """직렬화 모델의 호환성 판단에 사용하는 라이브러리 버전."""
+    import sentence_transformers
+    import torch
+    import transformers
+    return {'sentence_transformers': sentence_transformers.__version__, 'torch': torch.__version__,
+            'transformers': transformers.__version__}
+
+def _read_manifest(registry_path):
+    try:
+        with open(os.path.join(registry_path, MANIFEST_FILE_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_manifest(registry_path, manifest):
+    temp_path = os.path.join(registry_path, MANIFEST_FILE_NAME + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, os.path.join(registry_path, MANIFEST_FILE_NAME))
+
+def _untrusted_path_reason(path):
+    """
+    직렬화 파일을 역직렬화해도 되는지 파일 소유자와 권한으로 확인합니다 (pickle 신뢰 경계).
+    Returns:
+        str: 신뢰할 수 없는 이유. 신뢰할 수 있으면 None.
+    """
+    if not hasattr(os, 'getuid'): # 소유자 개념이 다른 플랫폼(Windows)에서는 디렉토리 접근 권한 설정에 맡김
+        return None
+    for checked_path in (path, os.path.dirname(path)):
+        stat_result = os.stat(checked_path)
+        if stat_result.st_uid != os.getuid():
+            return f"{checked_path}의 소유자가 현재 사용자가 아닙니다"
+        if stat_result.st_mode & 0o022:
+            return f"{checked_path}에 다른 사용자의 쓰기 권한이 있습니다"
+    return None
+
+def _save_snapshot(model, registry_path):
+    """모델을 임시 디렉토리에 저장한 뒤 snapshot/으로 이름을 바꿉니다 (저장 중 중단되어도 불완전한 스냅샷이 남지 않음)."""
+    snapshot_path = os.path.join(registry_path, SNAPSHOT_DIR_NAME)
+    temp_path = f"{snapshot_path}.tmp-{os.getpid()}"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    model.save(temp_path)
+    if os.path.isdir(snapshot_path): # 다른 프로세스가 먼저 만든 경우
+        shutil.rmtree(temp_path, ignore_errors=True)
+    else:
+        os.replace(temp_path, snapshot_path)
+    return snapshot_path
+
+def _find_tokenizer_attribute(model):
+    """모델의 첫 번째 모듈에서 토크나이저를 보관하는 속성 이름을 찾습니다. 없으면 None."""
+    first_module_attributes = vars(model[0])
+    return next((attribute for attribute in TOKENIZER_ATTRIBUTES if first_module_attributes.get(attribute) is not None), None)
+
+def _save_serialized(model, registry_path, versions):
+    """
+    초기화된 모델 객체를 토크나이저를 뺀 model.pt와 tokenizer.pt로 나누어 직렬화하고,
+    생성 당시 라이브러리 버전과 토크나이저 속성 이름을 manifest에 기록합니다.
+    """
+    import torch
+    tokenizer_attribute = _find_tokenizer_attribute(model)
+    if tokenizer_attribute is None:
+        raise ValueError("모델에서 토크나이저를 찾을 수 없습니다")
+    first_module = model[0]
+    tokenizer = getattr(first_module, tokenizer_attribute)
+    temp_paths = {}
+    for file_name in (SERIALIZED_FILE_NAME, SERIALIZED_TOKENIZER_FILE_NAME):
+        temp_paths[file_name] = os.path.join(registry_path, f"{file_name}.tmp-{os.getpid()}")
+    setattr(first_module, tokenizer_attribute, None)
+    try:
+        torch.save(model, temp_paths[SERIALIZED_FILE_NAME])
+    finally:
+        setattr(first_module, tokenizer_attribute, tokenizer)
+    torch.save(tokenizer, temp_paths[SERIALIZED_TOKENIZER_FILE_NAME])
+    for file_name, temp_path in temp_paths.items():
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, os.path.join(registry_path, file_name))
+    manifest = _read_manifest(registry_path)
+    manifest['serialized'] = versions
+    manifest['serialized_tokenizer_attribute'] = tokenizer_attribute
+    _write_manifest(registry_path, manifest)
+
+def _load_serialized(registry_path, tokenizer_attribute, device=None):
+    """
+    model.pt와 tokenizer.pt를 각각 역직렬화하여 토크나이저를 다시 연결합니다.
+    호출 전에 두 파일의 소유자/권한(_untrusted_path_reason)을 확인해야 합니다.
+    Returns:
+        tuple: (모델, 토크나이저 로드 시간(초), 가중치(model.pt) 로드 시간(초))
+    """
+    import torch
+    # 모델 객체 전체(pickle)라 weights_only=True로는 읽을 수 없음. 호출자가 소유자/권한을 확인한 파일만 역직렬화
+    phase_start = time.perf_counter()
+    model = torch.load(os.path.join(registry_path, SERIALIZED_FILE_NAME), map_location=device or 'cpu', weights_only=False)
+    weights_seconds = time.perf_counter() - phase_start
+    phase_start = time.perf_counter()
+    tokenizer = torch.load(os.path.join(registry_path, SERIALIZED_TOKENIZER_FILE_NAME), weights_only=False)
+    setattr(model[0], tokenizer_attribute, tokenizer)
+    return model, time.perf_counter() - phase_start, weights_seconds
+
+@contextlib.contextmanager
+def _measure_tokenizer_loads():
+    """
+    블록 안에서 AutoTokenizer/AutoProcessor.from_pretrained에 쓴 시간을 합산합니다 (중첩 호출은 바깥 호출만 셈).
+    모델 생성 함수 하나가 토크나이저와 가중치를 함께 로드할 때 두 단계를 나누어 보기 위해 사용합니다.
+    클래스 메서드를 잠시 바꾸므로 다른 스레드에서 동시에 모델을 로드하지 않는 시작 단계에서만 사용합니다.
+    """
+    import transformers
+    measured = {'seconds': 0.0}
+    call_depth = [0]
+    original_methods = {}
+
+    def make_timed(original_function):
+        def timed_from_pretrained(cls, *args, **kwargs):
+            call_depth[0] += 1
+            call_start = time.perf_counter()
+            try:
+                return original_function(cls, *args, **kwargs)
+            finally:
+                call_depth[0] -= 1
+                if call_depth[0] == 0:
+                    measured['seconds'] += time.perf_counter() - call_start
+        return classmethod(timed_from_pretrained)
+
+    for class_name in TOKENIZER_LOADER_CLASSES:
+        loader_class = getattr(transformers, class_name, None)
+        original_method = vars(loader_class).get('from_pretrained') if loader_class is not None else None
+        if isinstance(original_method, classmethod):
+            original_methods[loader_class] = original_method
+            loader_class.from_pretrained = make_timed(original_method.__func__)
+    try:
+        yield measured
+    finally:
+        for loader_class, original_method in original_methods.items():
+            loader_class.from_pretrained = original_method
+
+def _load_sentence_transformer(model_name_or_path, device=None, local_files_only=True):
+    """
+    SentenceTransformer를 생성하고 (모델, 토크나이저 로드 시간(초), 가중치 로드 시간(초))을 반환합니다.
+    가중치 로드 시간에는 설정 파싱과 모듈 구성 시간이 포함됩니다.
+    """
+    from sentence_transformers import SentenceTransformer
+    phase_start = time.perf_counter()
+    with _measure_tokenizer_loads() as tokenizer_load:
+        model = SentenceTransformer(model_name_or_path, device=device, local_files_only=local_files_only)
+    total_seconds = time.perf_counter() - phase_start
+    return model, tokenizer_load['seconds'], max(0.0, total_seconds - tokenizer_load['seconds'])
+
+def get_model_cache_key(model_name, quantization=None, backend='torch'):
+    """
+    캐시 키(쿼리/결과/영속 임베딩 캐시)에 사용할 모델 이름. 양자화 모드가 다르면 임베딩 값도 다르므로 모드를 포함합니다.
+    fp32 ONNX 모델은 원본과 같은 임베딩(일치도 확인: onnx_backend)이므로 같은 키를, 양자화한 ONNX 모델은 torch 양자화와
+    구현이 달라 별도 키를 사용합니다.
+    예: get_model_cache_key('all-MiniLM-L6-v2', 'dynamic_int8') -> 'all-MiniLM-L6-v2@dynamic_int8'
+    """
+    if not quantization:
+        return model_name
+    return f"{model_name}@onnx-{quantization}" if backend == 'onnx' else f"{model_name}@{quantization}"
+
+def resolve_quantization_mode(quantization=None):
+    """양자화 설정 값을 정규화합니다. None이면 config.MODEL_QUANTIZATION을 사용하고, 'none'은 양자화하지 않음(None)."""
+    quantization = MODEL_QUANTIZATION if quantization is None else quantization
+    return None if quantization in (None, 'none') else quantization
+
+def quantize_model(model, quantization=None):
+    """
+    CPU 추론용 양자화를 적용합니다.
+    'dynamic_int8': 모든 nn.Linear 가중치를 int8로 저장하고, 활성값은 실행 시점에 동적으로 양자화합니다 (PyTorch dynamic quantization).
+    트랜스포머 추론 시간의 대부분을 차지하는 Linear 연산이 int8 커널로 실행되며, 임베딩/LayerNorm은 fp32로 유지됩니다.
+    Args:
+        model: SentenceTransformer (torch.nn.Module).
+        quantization (str, optional): None이면 그대로 반환.
+    Returns:
+        양자화된 모델 (원본 모델은 변경하지 않음).
+    """
+    if not quantization:
+        return model
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"지원하지 않는 양자화 모드입니다: {quantization} (지원: {', '.join(str(mode) for mode in QUANTIZATION_MODES)})")
+    import copy
+    import warnings
+    import torch
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore') # torch.ao.quantization의 API 이전 안내 경고
+        quantized_model = torch.ao.quantization.quantize_dynamic(copy.deepcopy(model), {torch.nn.Linear}, dtype=torch.qint8)
+    quantized_model.eval()
+    return quantized_model
+
+def configure_torch_threads(intra_op_threads=None, inter_op_threads=None):
+    """
+    torch의 연산 내부(intra-op) / 연산 간(inter-op) 스레드 수를 설정합니다. None이면 해당 값은 바꾸지 않습니다.
+    inter-op 스레드 수는 프로세스에서 병렬 작업이 한 번이라도 실행된 뒤에는 바꿀 수 없으므로, 모델 로드 전에 호출해야 합니다.
+    Returns:
+        tuple: 적용 후 (intra-op 스레드 수, inter-op 스레드 수)
+    """
+    import torch
+    if intra_op_threads:
+        torch.set_num_threads(int(intra_op_threads))
+    if inter_op_threads and inter_op_threads != torch.get_num_interop_threads():
+        try:
+            torch.set_num_interop_threads(int(inter_op_threads))
+        except RuntimeError as e:
+            print(f"경고: inter-op 스레드 수를 변경할 수 없습니다 (이미 병렬 작업이 시작됨): {e}")
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+def warm_up_model(model, batch_sizes=None, rounds=None):
+    """
+    첫 검색 쿼리가 지연되지 않도록 모델을 미리 실행합니다. 첫 encode 호출에서 일어나는 메모리 할당과 커널 선택을
+    실제 사용 형태(쿼리 1개, 여러 문서 배치, 짧은/긴 텍스트)로 미리 끝내 둡니다.
+    Args:
+        model: .encode(list[str])를 제공하는 임베딩 모델.
+        batch_sizes (tuple, optional): 워밍업할 배치 크기 목록. 기본값은 config.MODEL_WARMUP_BATCH_SIZES (비어 있으면 생략).
+        rounds (int, optional): 배치 크기별 반복 횟수. 기본값은 config.MODEL_WARMUP_ROUNDS.
+    Returns:
+        float: 워밍업에 걸린 시간(초).
+    """
+    batch_sizes = MODEL_WARMUP_BATCH_SIZES if batch_sizes is None else batch_sizes
+    rounds = MODEL_WARMUP_ROUNDS if rounds is None else rounds
+    warmup_start = time.perf_counter()
+    for _ in range(max(1, rounds) if batch_sizes else 0):
+        for batch_size in batch_sizes:
+            texts = [WARMUP_TEXT if index % 2 == 0 else WARMUP_LONG_TEXT for index in range(max(1, batch_size))]
+            model.encode(texts, batch_size=len(texts), convert_to_tensor=False)
+    return time.perf_counter() - warmup_start
+
+def _report_load_timings(model_name, source, timings):
+    phase_text = ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in timings.items())
+    print(f"모델 로드 단계별 시간 ({model_name}, {source}): {phase_text} (합계 {sum(timings.values()):.2f}초)")
+
+def load_embedding_model(model_name, cache_dir=None, offline=None, use_serialized=None, device=None, verbose=True,
+                         quantization=None):
+    """
+    로컬 저장소를 거쳐 임베딩 모델을 로드합니다. 저장소에 스냅샷이 있으면 네트워크를 전혀 사용하지 않습니다.
+    스냅샷이 없으면 모델 이름(hub 이름 또는 로컬 경로)으로 한 번 로드하여 스냅샷을 만듭니다 (offline이면 로컬 hub 캐시에서만 찾음).
+    Args:
+        model_name (str): Hugging Face 모델 이름 또는 로컬 경로.
+        cache_dir (str, optional): 저장소 디렉토리. 기본값은 config.MODEL_CACHE_DIR.
+        offline (bool, optional): 스냅샷이 없을 때도 네트워크를 쓰지 않을지 여부. 기본값은 config.MODEL_OFFLINE.
+        use_serialized (bool, optional): 직렬화 모델을 사용/생성할지 여부. 기본값은 config.MODEL_SERIALIZED_CACHE.
+        device (str, optional): 모델을 올릴 장치 (예: 'cpu'). None이면 라이브러리 기본값.
+        verbose (bool): 단계별 로드 시간을 출력할지 여부.
+        quantization (str, optional): 양자화 모드 ('dynamic_int8'). 기본값은 config.MODEL_QUANTIZATION ('none'이면 사용 안 함).
+            스냅샷/직렬화 모델은 항상 fp32로 저장하고, 양자화는 로드할 때마다 적용합니다.
+    Returns:
+        SentenceTransformer: 로드된 모델. model.load_timings에 단계별 시간(초)을, model.quantization에 양자화 모드를 기록.
+    """
+    quantization = resolve_quantization_mode(quantization)
+    offline = MODEL_OFFLINE if offline is None else offline
+    use_serialized = MODEL_SERIALIZED_CACHE if use_serialized is None else use_serialized
+    registry_path = get_registry_path(model_name, cache_dir)
+    snapshot_path = os.path.join(registry_path, SNAPSHOT_DIR_NAME)
+    serialized_path = os.path.join(registry_path, SERIALIZED_FILE_NAME)
+    timings = {}
+
+    has_snapshot = os.path.isdir(snapshot_path)
+    phase_start = time.perf_counter()
+    # 라이브러리 import 비용을 토크나이저/가중치 로드와 구분하여 기록
+    import torch
+    import sentence_transformers
+    timings['import'] = time.perf_counter() - phase_start
+
+    os.makedirs(registry_path, mode=0o700, exist_ok=True)
+    versions = _library_versions()
+    model, source = None, None
+    if not has_snapshot:
+        # 저장소에 처음 등록: hub 이름/로컬 경로로 로드한 뒤 스냅샷으로 고정
+        model, timings['tokenizer'], timings['weights'] = _load_sentence_transformer(model_name, device, local_files_only=offline)
+        source = "원본에서 로드 후 스냅샷 생성"
+    elif use_serialized and os.path.exists(serialized_path):
+        serialized_tokenizer_path = os.path.join(registry_path, SERIALIZED_TOKENIZER_FILE_NAME)
+        manifest = _read_manifest(registry_path)
+        untrusted_reason = (_untrusted_path_reason(serialized_path) or
+                            (os.path.exists(serialized_tokenizer_path) and _untrusted_path_reason(serialized_tokenizer_path)))
+        if untrusted_reason:
+            print(f"경고: 직렬화 모델을 신뢰할 수 없어 스냅샷에서 로드합니다 ({untrusted_reason}).")
+        elif manifest.get('serialized') == versions and manifest.get('serialized_tokenizer_attribute') \
+                and os.path.exists(serialized_tokenizer_path):
+            try:
+                model, timings['tokenizer'], timings['weights'] = _load_serialized(
+                    registry_path, manifest['serialized_tokenizer_attribute'], device)
+                source = "직렬화 모델"
+            except Exception as e:
+                print(f"경고: 직렬화 모델을 읽을 수 없어 스냅샷에서 다시 로드합니다: {e}")
+        elif verbose:
+            print("직렬화 모델의 형식이나 라이브러리 버전이 현재와 달라 스냅샷에서 다시 만듭니다.")
+    if model is None:
+        model, timings['tokenizer'], timings['weights'] = _load_sentence_transformer(snapshot_path, device)
+        source = "디렉토리 스냅샷"
+
+    if not has_snapshot:
+        phase_start = time.perf_counter()
+        _save_snapshot(model, registry_path)
+        _write_manifest(registry_path, {**_read_manifest(registry_path), 'model_name': model_name, 'snapshot': versions,
+                                        'created_at': time.strftime('%Y-%m-%d %H:%M:%S')})
+        timings['snapshot_save'] = time.perf_counter() - phase_start
+        if verbose:
+            print(f"모델 스냅샷 저장: {snapshot_path}")
+
+    if use_serialized and source != "직렬화 모델":
+        try:
+            _save_serialized(model, registry_path, versions)
+        except Exception as e: # 직렬화할 수 없는 모델이면 디렉토리 스냅샷만 사용
+            print(f"경고: 모델을 직렬화할 수 없습니다 (디렉토리 스냅샷만 사용): {e}")
+
+    if quantization:
+        phase_start = time.perf_counter()
+        model = quantize_model(model, quantization)
+        timings['quantize'] = time.perf_counter() - phase_start
+
+    # 토크나이저 로드와 별개로, 첫 호출에서 일어나는 초기화 비용을 따로 측정
+    phase_start = time.perf_counter()
+    preprocess = getattr(model, 'preprocess', None) or model.tokenize # sentence-transformers 6부터 tokenize 대신 preprocess
+    preprocess([WARMUP_TEXT])
+    timings['tokenizer_first_call'] = time.perf_counter() - phase_start
+
+    timings['warmup_forward'] = warm_up_model(model)
+
+    model.load_timings = timings
+    model.quantization = quantization
+    if verbose:
+        _report_load_timings(model_name, f"{source}, {quantization}" if quantization else source, timings)
+    return model
+
+
+if __name__ == '__main__':
+    # --- 테스트용 코드: 두 번 로드하여 스냅샷 생성 후 오프라인 로드 시간 비교 ---
+    import tempfile
+    test_model_name = sys.argv[1] if len(sys.argv) > 1 else 'all-MiniLM-L6-v2'
+    with tempfile.TemporaryDirectory() as test_cache_dir:
+        first_model = load_embedding_model(test_model_name, cache_dir=test_cache_dir)
+        second_model = load_embedding_model(test_model_name, cache_dir=test_cache_dir, offline=True)
+        difference = abs(first_model.encode([WARMUP_TEXT]) - second_model.encode([WARMUP_TEXT])).max()
+        print(f"스냅샷 전후 임베딩 최대 차이: {difference:.2e}")
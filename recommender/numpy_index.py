@@ -0,0 +1,273 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : NumPy 기반 메모리 내 정확 검색(exact search) 백엔드
+내용 : 직원 1만 명 + 채용 공고 84개, 384차원 기준 전체 임베딩은 float32로 약 15MB입니다.
+이 정도 크기는 ChromaDB 클라이언트/SQLite/HNSW를 거치지 않고 행렬-벡터 곱 한 번으로 전수 검색하는 편이 빠르고 결과도 정확합니다.
+ChromaDB 컬렉션(영속 저장소)에서 임베딩/메타데이터/문서를 한 번 읽어 연속된 float32 행렬과 컬럼형 메타데이터로 보관하고,
+추천 모듈이 사용하는 컬렉션 인터페이스(name, metadata, count, get, query)를 같은 형식으로 제공합니다.
+where 조건은 컬럼별 값 코드 배열에 대한 벡터 연산(마스크)으로 평가하고, 상위 k개는 argpartition으로 고릅니다.
+거리는 컬렉션의 거리 함수 설정(l2: 제곱 L2, cosine, ip)을 ChromaDB와 같은 정의로 계산합니다.
+적재(upsert/delete)는 계속 ChromaDB 컬렉션에 하고, 적재 후 이 인덱스를 다시 만들어야 변경이 반영됩니다.
+"""
+# hr_recommender/recommender/numpy_index.py
+
+import numpy as np
+
+_MISSING_CODE = -1 # 메타데이터에 해당 키가 없는 문서
+
+
+def _value_token(value):
+    """
+    메타데이터 값을 비교용 토큰으로 변환합니다. ChromaDB처럼 불리언과 숫자(1 == True)를 구분하고, 정수와 실수는 같은 숫자로 취급합니다.
+    """
+    if isinstance(value, bool):
+        return ('bool', value)
+    if isinstance(value, (int, float)):
+        return ('num', float(value))
+    return ('str', str(value))
+
+def get_collection_space(collection):
+    """ChromaDB 컬렉션의 거리 함수 설정('l2', 'cosine', 'ip')을 반환합니다. 확인할 수 없으면 ChromaDB 기본값 'l2'."""
+    try:
+        space = ((collection.configuration_json or {}).get('hnsw') or {}).get('space')
+    except Exception:
+        space = None
+    return space or (collection.metadata or {}).get('hnsw:space') or 'l2'
+
+
+class _MetadataColumn:
+    """
+    메타데이터 키 하나의 컬럼형 표현. 문서별 값을 고유 값 목록의 인덱스(코드, int32)로 저장합니다 (없는 값은 -1).
+    조건 비교는 고유 값에 대해서만 파이썬으로 수행하고, 문서 단위 마스크는 코드 배열에 대한 NumPy 연산으로 만듭니다.
+    """
+    def __init__(self, row_count):
+        self.codes = np.full(row_count, _MISSING_CODE, dtype=np.int32)
+        self.values = [] # 코드 -> 원래 값
+        self._code_by_token = {}
+
+    def set_value(self, row_index, value):
+        token = _value_token(value)
+        code = self._code_by_token.get(token)
+        if code is None:
+            code = self._code_by_token[token] = len(self.values)
+            self.values.append(value)
+        self.codes[row_index] = code
+
+    def codes_for(self, values):
+        """주어진 값들에 해당하는 코드 배열 (컬럼에 없는 값은 제외)."""
+        codes = (self._code_by_token.get(_value_token(value)) for value in values)
+        return np.array([code for code in codes if code is not None], dtype=np.int32)
+
+    def codes_where(self, predicate):
+        """predicate(값)이 참인 고유 값들의 코드 배열."""
+        return np.array([code for code, value in enumerate(self.values) if predicate(value)], dtype=np.int32)
+
+
+class NumpyCollection:
+    """
+    ChromaDB 컬렉션 하나의 메모리 내 정확 검색 인덱스.
+    Args:
+        name (str): 컬렉션 이름 (추천 결과 캐시 키 등에 사용).
+        ids (list): 문서 ID 목록.
+        embeddings: 문서 임베딩 (문서 수 x 차원).
+        metadatas (list): 문서별 메타데이터 딕셔너리 목록.
+        documents (list): 문서 텍스트 목록.
+        space (str): 거리 함수 ('l2', 'cosine', 'ip').
+        metadata (dict, optional): 컬렉션 메타데이터 (원본 ChromaDB 컬렉션 값).
+    """
+    def __init__(self, name, ids, embeddings, metadatas, documents, space='l2', metadata=None):
+        if space not in ('l2', 'cosine', 'ip'):
+            raise ValueError(f"지원하지 않는 거리 함수입니다: {space}")
+        self.name = name
+        self.metadata = metadata
+        self.space = space
+        self._ids = list(ids)
+        self._metadatas = [metadata_item or {} for metadata_item in metadatas]
+        self._documents = list(documents) if documents is not None else [None] * len(self._ids)
+
+        matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32).reshape(len(self._ids), -1))
+        if space == 'cosine':
+            # 행을 미리 정규화해 두면 코사인 거리는 1 - 내적
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1.0, norms)
+        self._matrix = matrix
+        self._squared_norms = np.einsum('ij,ij->i', matrix, matrix) if space == 'l2' else None
+
+        self._columns = {}
+        for row_index, metadata_item in enumerate(self._metadatas):
+            for key, value in metadata_item.items():
+                if value is None:
+                    continue
+                column = self._columns.get(key)
+                if column is None:
+                    column = self._columns[key] = _MetadataColumn(len(self._ids))
+                column.set_value(row_index, value)
+
+    @classmethod
+    def from_chroma(cls, collection, page_size=5000):
+        """
+        ChromaDB 컬렉션의 전체 임베딩/메타데이터/문서를 페이지 단위로 읽어 인덱스를 만듭니다.
+        Returns:
+            NumpyCollection: 원본 컬렉션과 이름, 메타데이터, 거리 함수가 같은 인덱스.
+        """
+        ids, embeddings, metadatas, documents = [], [], [], []
+        total_count = collection.count()
+        for offset in range(0, total_count, page_size):
+            page = collection.get(include=['embeddings', 'metadatas', 'documents'], limit=page_size, offset=offset)
+            ids.extend(page['ids'])
+            embeddings.append(np.asarray(page['embeddings'], dtype=np.float32))
+            metadatas.extend(page['metadatas'])
+            documents.extend(page['documents'])
+        dimension = embeddings[0].shape[1] if embeddings else 0
+        embedding_matrix = np.concatenate(embeddings) if embeddings else np.zeros((0, dimension), dtype=np.float32)
+        return cls(collection.name, ids, embedding_matrix, metadatas, documents,
+                   space=get_collection_space(collection), metadata=collection.metadata)
+
+    def count(self):
+        return len(self._ids)
+
+    def memory_bytes(self):
+        """임베딩 행렬과 메타데이터 코드 배열이 차지하는 메모리(바이트)."""
+        return self._matrix.nbytes + sum(column.codes.nbytes for column in self._columns.values())
+
+    # --- where 조건 평가 ---
+    def _field_mask(self, key, condition):
+        """메타데이터 키 하나에 대한 조건({"$in": [...]} 또는 값 그대로)의 문서 마스크."""
+        column = self._columns.get(key)
+        codes = column.codes if column is not None else np.full(len(self._ids), _MISSING_CODE, dtype=np.int32)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        mask = np.ones(len(self._ids), dtype=bool)
+        for operator, operand in condition.items():
+            if operator in ('$eq', '$ne'):
+                matched = np.isin(codes, column.codes_for([operand])) if column is not None else np.zeros_like(mask)
+            elif operator in ('$in', '$nin'):
+                matched = np.isin(codes, column.codes_for(operand)) if column is not None else np.zeros_like(mask)
+            elif operator in ('$gt', '$gte', '$lt', '$lte'):
+                if column is None:
+                    matched = np.zeros_like(mask)
+                else:
+                    compare = {'$gt': lambda value: value > operand, '$gte': lambda value: value >= operand,
+                               '$lt': lambda value: value < operand, '$lte': lambda value: value <= operand}[operator]
+                    numeric_only = lambda value: isinstance(value, (int, float)) and not isinstance(value, bool) and compare(value)
+                    matched = np.isin(codes, column.codes_where(numeric_only))
+            else:
+                raise ValueError(f"지원하지 않는 where 연산자입니다: {operator}")
+            # ChromaDB와 같이 $ne/$nin은 키가 없는 문서도 포함
+            mask &= ~matched if operator in ('$ne', '$nin') else matched
+        return mask
+
+    def _where_mask(self, where):
+        """where 조건 전체의 문서 마스크 ($and/$or 중첩 지원)."""
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, condition in where.items():
+            if key == '$and':
+                for sub_where in condition:
+                    mask &= self._where_mask(sub_where)
+            elif key == '$or':
+                or_mask = np.zeros(len(self._ids), dtype=bool)
+                for sub_where in condition:
+                    or_mask |= self._where_mask(sub_where)
+                mask &= or_mask
+            else:
+                mask &= self._field_mask(key, condition)
+        return mask
+
+    def _distances(self, query_matrix, row_indices):
+        """쿼리 행렬(q x 차원)과 선택된 문서들 사이의 거리 (q x 문서 수)."""
+        candidate_matrix = self._matrix if row_indices is None else self._matrix[row_indices]
+        if self.space == 'cosine':
+            norms = np.linalg.norm(query_matrix, axis=1, keepdims=True)
+            query_matrix = query_matrix / np.where(norms == 0, 1.0, norms)
+        dot_products = query_matrix @ candidate_matrix.T
+        if self.space == 'l2':
+            squared_norms = self._squared_norms if row_indices is None else self._squared_norms[row_indices]
+            query_norms = np.einsum('ij,ij->i', query_matrix, query_matrix)
+            return np.maximum(query_norms[:, None] + squared_norms[None, :] - 2.0 * dot_products, 0.0)
+        return 1.0 - dot_products
+
+    def _rows_payload(self, row_indices, include):
+        """문서 인덱스 목록을 ChromaDB 결과 형식의 필드(메타데이터, 문서, 임베딩)로 변환합니다."""
+        return {
+            'metadatas': [self._metadatas[row] for row in row_indices] if 'metadatas' in include else None,
+            'documents': [self._documents[row] for row in row_indices] if 'documents' in include else None,
+            'embeddings': self._matrix[row_indices] if 'embeddings' in include else None,
+        }
+
+    def query(self, query_embeddings, n_results=10, where=None, include=('metadatas', 'documents', 'distances')):
+        """
+        ChromaDB collection.query와 같은 형식으로 정확한 최근접 검색을 수행합니다.
+        Args:
+            query_embeddings: 쿼리 임베딩 목록 ([[float, ...], ...]) 또는 벡터 하나.
+            n_results (int): 쿼리당 반환할 최대 결과 수.
+            where (dict, optional): 메타데이터 조건 ($and, $or, $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte).
+            include (list): 'metadatas', 'documents', 'distances', 'embeddings' 중 반환할 항목.
+        Returns:
+            dict: {'ids': [[...]], 'distances': [[...]], 'metadatas': [[...]], 'documents': [[...]], ...} (쿼리별 목록)
+        """
+        query_matrix = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        if self._matrix.shape[0] and query_matrix.shape[1] != self._matrix.shape[1]:
+            raise ValueError(f"쿼리 임베딩 차원({query_matrix.shape[1]})이 컬렉션 차원({self._matrix.shape[1]})과 다릅니다.")
+        row_indices = np.flatnonzero(self._where_mask(where)) if where else None
+        candidate_count = len(self._ids) if row_indices is None else len(row_indices)
+        top_k = max(0, min(int(n_results), candidate_count))
+
+        results = {'ids': [], 'distances': [], 'metadatas': [], 'documents': [], 'embeddings': []}
+        distance_matrix = self._distances(query_matrix, row_indices) if top_k else None
+        for query_index in range(query_matrix.shape[0]):
+            if top_k:
+                distances = distance_matrix[query_index]
+                top_positions = np.argpartition(distances, top_k - 1)[:top_k] if top_k < candidate_count else np.arange(candidate_count)
+                top_positions = top_positions[np.argsort(distances[top_positions], kind='stable')]
+                top_rows = top_positions if row_indices is None else row_indices[top_positions]
+                top_distances = distances[top_positions].tolist()
+            else:
+                top_rows, top_distances = np.array([], dtype=np.int64), []
+            payload = self._rows_payload(top_rows, include)
+            results['ids'].append([self._ids[row] for row in top_rows])
+            results['distances'].append(top_distances)
+            for field in ('metadatas', 'documents', 'embeddings'):
+                results[field].append(payload[field])
+        for field in ('distances', 'metadatas', 'documents', 'embeddings'):
+            if field not in include:
+                results[field] = None
+        return results
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=('metadatas', 'documents')):
+        """ChromaDB collection.get과 같은 형식으로 ID/조건에 맞는 문서를 반환합니다 (저장 순서 기준 limit/offset)."""
+        mask = self._where_mask(where) if where else np.ones(len(self._ids), dtype=bool)
+        if ids is not None:
+            wanted_ids = set(ids)
+            mask &= np.fromiter((doc_id in wanted_ids for doc_id in self._ids), dtype=bool, count=len(self._ids))
+        row_indices = np.flatnonzero(mask)
+        start = offset or 0
+        row_indices = row_indices[start:start + limit] if limit is not None else row_indices[start:]
+        payload = self._rows_payload(row_indices, include)
+        return {'ids': [self._ids[row] for row in row_indices], **payload}
+
+
+if __name__ == '__main__':
+    # --- 테스트용 코드: 같은 데이터를 ChromaDB(메모리)에 넣고 조건 검색 결과를 비교 ---
+    import chromadb
+
+    rng = np.random.default_rng(0)
+    test_embeddings = rng.normal(size=(300, 16)).astype(np.float32)
+    test_metadatas = [{'doc_type': 'employee' if i % 3 else 'job', 'department': ['개발팀', '인사팀', '영업팀'][i % 3],
+                       'years': i % 10, **({'skill:python': True} if i % 4 == 0 else {})} for i in range(300)]
+    test_ids = [f"doc_{i}" for i in range(300)]
+    chroma_collection = chromadb.EphemeralClient().create_collection('numpy_index_test')
+    chroma_collection.add(ids=test_ids, embeddings=test_embeddings.tolist(), metadatas=test_metadatas,
+                          documents=[f"문서 {i}" for i in range(300)])
+    numpy_collection = NumpyCollection.from_chroma(chroma_collection)
+
+    test_queries = rng.normal(size=(3, 16)).astype(np.float32).tolist()
+    test_filters = [None, {'doc_type': 'employee'}, {'$and': [{'skill:python': True}, {'years': {'$gte': 5}}]},
+                    {'$or': [{'department': {'$in': ['개발팀', '영업팀']}}, {'doc_type': {'$ne': 'employee'}}]}]
+    for test_where in test_filters:
+        expected = chroma_collection.query(query_embeddings=test_queries, n_results=10, where=test_where)
+        actual = numpy_collection.query(test_queries, n_results=10, where=test_where)
+        overlap = np.mean([len(set(e) & set(a)) / max(len(e), 1) for e, a in zip(expected['ids'], actual['ids'])])
+        print(f"where={test_where}: ChromaDB 결과와 겹치는 비율 {overlap:.0%}, "
+              f"최근접 거리 {expected['distances'][0][0]:.4f} / {actual['distances'][0][0]:.4f}")
+    print(f"문서 수 {numpy_collection.count()}, 메모리 {numpy_collection.memory_bytes() / 1024:.1f}KB")
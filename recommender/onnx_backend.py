@@ -0,0 +1,298 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : ONNX Runtime 기반 임베딩 모델 백엔드
+내용 : sentence-transformers/PyTorch 스택은 가져오는 데 수 초가 걸리고, CPU 추론 엔진으로도 가장 빠르지는 않습니다.
+설정된 모델의 트랜스포머 부분을 한 번만 ONNX로 내보내 로컬 모델 저장소(MODEL_CACHE_DIR/<모델>/onnx/)에 보관하고,
+이후에는 onnxruntime + tokenizers만으로 추론합니다 (torch, transformers, sentence_transformers를 가져오지 않음).
+풀링(mean/cls/max)과 정규화는 원본 모델 구성(Pooling, Normalize 모듈)을 그대로 NumPy로 재현하며,
+vector_db와 talent_recommender가 사용하는 .encode(list[str]) -> ndarray 계약과 .tokenizer / .max_seq_length 속성을 제공합니다.
+MODEL_QUANTIZATION='dynamic_int8'이면 내보낸 ONNX 모델을 onnxruntime 동적 양자화(int8 가중치)로 한 번 더 변환해 둡니다.
+내보내기에는 torch와 onnx 패키지가, 추론에는 onnxruntime과 tokenizers 패키지가 필요합니다.
+원본 모델과의 일치도 확인: python -m recommender.onnx_backend [모델 이름] (자동 점검: tests/test_onnx_parity.py)
+"""
+# hr_recommender/recommender/onnx_backend.py
+
+import json
+import os
+import time
+
+import numpy as np
+
+from .model_registry import get_registry_path, resolve_quantization_mode
+
+try:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import TORCH_INTRA_OP_THREADS, TORCH_INTER_OP_THREADS
+except ImportError:
+    TORCH_INTRA_OP_THREADS = None
+    TORCH_INTER_OP_THREADS = None
+
+ONNX_DIR_NAME = 'onnx'
+ONNX_MODEL_FILE_NAME = 'model.onnx'
+ONNX_QUANTIZED_FILE_NAME = 'model.dynamic_int8.onnx'
+ONNX_CONFIG_FILE_NAME = 'onnx_config.json'
+ONNX_OPSET_VERSION = 17
+SUPPORTED_POOLING_MODES = ('mean', 'cls', 'max')
+
+# 원본 모델과의 일치도 확인에 사용하는 텍스트 (짧은 쿼리부터 직원 프로필 길이까지)
+PARITY_CHECK_TEXTS = [
+    "백엔드 개발자 Python",
+    "소프트웨어 개발 프로젝트",
+    "해외 고객 대응이 가능한 영업 담당자, 영어(비즈니스) 필수",
+    "직책: 시니어 개발자. 부서: IT 개발팀. 보유 기술: Python, Django, AWS, Docker, Kubernetes. "
+    "주요 프로젝트: 신규 서비스 개발. 레거시 시스템 개선. 사용 언어: 한국어(원어민), 영어(비즈니스).",
+    "Data engineer with Spark, Airflow and Kafka experience for a real-time analytics platform",
+]
+
+
+def get_onnx_dir(model_name, cache_dir=None):
+    """모델의 ONNX 파일을 보관하는 저장소 디렉토리."""
+    return os.path.join(get_registry_path(model_name, cache_dir), ONNX_DIR_NAME)
+
+def _describe_pipeline(model):
+    """
+    SentenceTransformer 모듈 구성에서 풀링 방식과 정규화 여부를 읽습니다.
+    ONNX로 재현할 수 있는 구성은 Transformer -> Pooling -> (Normalize)뿐이며, 그 외 모듈(Dense 등)이 있으면 ValueError.
+    """
+    module_types = [type(module).__name__ for module in model]
+    if module_types[:2] != ['Transformer', 'Pooling'] or any(name != 'Normalize' for name in module_types[2:]):
+        raise ValueError(f"ONNX 백엔드는 Transformer -> Pooling -> (Normalize) 구성만 지원합니다 (현재: {' -> '.join(module_types)}).")
+    pooling_config = model[1].get_config_dict()
+    pooling_mode = pooling_config.get('pooling_mode')
+    if pooling_mode is None: # 이전 버전 sentence-transformers 설정 형식
+        pooling_mode = 'cls' if pooling_config.get('pooling_mode_cls_token') else \
+            'max' if pooling_config.get('pooling_mode_max_tokens') else 'mean'
+    if pooling_mode not in SUPPORTED_POOLING_MODES:
+        raise ValueError(f"ONNX 백엔드가 지원하지 않는 풀링 방식입니다: {pooling_mode}")
+    return {'pooling_mode': pooling_mode, 'normalize': 'Normalize' in module_types[2:]}
+
+def export_onnx_model(model_name, cache_dir=None, verbose=True):
+    """
+    모델의 트랜스포머 부분을 ONNX로 내보내고 토크나이저와 풀링 설정을 함께 저장합니다 (이미 있으면 그대로 사용).
+    원본 모델은 로컬 모델 저장소(load_embedding_model)를 거쳐 fp32로 로드합니다.
+    Returns:
+        str: ONNX 디렉토리 경로.
+    """
+    onnx_dir = get_onnx_dir(model_name, cache_dir)
+    if os.path.exists(os.path.join(onnx_dir, ONNX_CONFIG_FILE_NAME)):
+        return onnx_dir
+    try:
+        import onnx # noqa: F401 (torch.onnx.export가 사용)
+        import torch
+    except ImportError as e:
+        raise ImportError(f"ONNX 내보내기에는 torch와 onnx 패키지가 필요합니다 (pip install onnx): {e}") from e
+    from .model_registry import load_embedding_model
+
+    export_start = time.perf_counter()
+    source_model = load_embedding_model(model_name, cache_dir=cache_dir, quantization='none', verbose=False)
+    pipeline = _describe_pipeline(source_model)
+    transformer_model = source_model[0].auto_model
+    transformer_model.eval()
+    tokenizer = source_model.tokenizer
+    sample = tokenizer(PARITY_CHECK_TEXTS[:2], padding=True, truncation=True, max_length=source_model.max_seq_length,
+                       return_tensors='pt')
+    input_names = [name for name in tokenizer.model_input_names if name in sample]
+
+    class _TokenEmbeddings(torch.nn.Module):
+        """ONNX 그래프의 입력 이름과 순서를 고정하고 마지막 은닉 상태(토큰 임베딩)만 반환하는 래퍼."""
+        def __init__(self, wrapped_model):
+            super().__init__()
+            self.wrapped_model = wrapped_model
+        def forward(self, *inputs):
+            return self.wrapped_model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    temp_dir = f"{onnx_dir}.tmp-{os.getpid()}"
+    os.makedirs(temp_dir, exist_ok=True)
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names + ['token_embeddings']}
+    export_kwargs = dict(input_names=input_names, output_names=['token_embeddings'], dynamic_axes=dynamic_axes,
+                         opset_version=ONNX_OPSET_VERSION)
+    with torch.no_grad():
+        try:
+            torch.onnx.export(_TokenEmbeddings(transformer_model), tuple(sample[name] for name in input_names),
+                              os.path.join(temp_dir, ONNX_MODEL_FILE_NAME), dynamo=False, **export_kwargs)
+        except TypeError: # dynamo 인자가 없는 이전 버전 torch
+            torch.onnx.export(_TokenEmbeddings(transformer_model), tuple(sample[name] for name in input_names),
+                              os.path.join(temp_dir, ONNX_MODEL_FILE_NAME), **export_kwargs)
+    tokenizer.save_pretrained(temp_dir)
+    onnx_config = {
+        'model_name': model_name,
+        'input_names': input_names,
+        'max_seq_length': source_model.max_seq_length,
+        'pad_token_id': tokenizer.pad_token_id or 0,
+        'embedding_dimension': source_model.get_sentence_embedding_dimension(),
+        'opset_version': ONNX_OPSET_VERSION,
+        **pipeline,
+    }
+    with open(os.path.join(temp_dir, ONNX_CONFIG_FILE_NAME), 'w', encoding='utf-8') as f:
+        json.dump(onnx_config, f, ensure_ascii=False, indent=2)
+    if os.path.isdir(onnx_dir): # 다른 프로세스가 먼저 만든 경우
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    else:
+        os.replace(temp_dir, onnx_dir)
+    if verbose:
+        print(f"ONNX 모델 내보내기 완료: {onnx_dir} ({time.perf_counter() - export_start:.2f}초)")
+    return onnx_dir
+
+def _quantized_onnx_path(onnx_dir):
+    """ONNX 모델의 int8 동적 양자화 버전 경로 (없으면 한 번 만듦)."""
+    quantized_path = os.path.join(onnx_dir, ONNX_QUANTIZED_FILE_NAME)
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        temp_path = f"{quantized_path}.tmp-{os.getpid()}.onnx"
+        quantize_dynamic(os.path.join(onnx_dir, ONNX_MODEL_FILE_NAME), temp_path, weight_type=QuantType.QInt8)
+        os.replace(temp_path, quantized_path)
+    return quantized_path
+
+
+class OnnxTokenizer:
+    """
+    tokenizers 라이브러리 기반 토크나이저. vector_db가 토큰 길이를 셀 때 사용하는 Hugging Face 토크나이저 호출 형식
+    tokenizer(texts, add_special_tokens=True, truncation=True, max_length=N) -> {'input_ids': [...], 'attention_mask': [...]}을 지원합니다.
+    """
+    def __init__(self, tokenizer_path, max_seq_length):
+        from tokenizers import Tokenizer
+        self._tokenizer = Tokenizer.from_file(tokenizer_path)
+        self._tokenizer.no_padding()
+        self.max_seq_length = max_seq_length
+
+    def __call__(self, texts, add_special_tokens=True, truncation=True, max_length=None, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        if truncation:
+            self._tokenizer.enable_truncation(max_length or self.max_seq_length)
+        else:
+            self._tokenizer.no_truncation()
+        encodings = self._tokenizer.encode_batch(list(texts), add_special_tokens=add_special_tokens)
+        return {'input_ids': [encoding.ids for encoding in encodings],
+                'attention_mask': [encoding.attention_mask for encoding in encodings],
+                'token_type_ids': [encoding.type_ids for encoding in encodings]}
+
+
+class OnnxEmbeddingModel:
+    """
+    ONNX Runtime으로 추론하는 문장 임베딩 모델. SentenceTransformer.encode와 같은 형식으로 사용합니다.
+    Args:
+        onnx_dir (str): export_onnx_model이 만든 디렉토리.
+        quantization (str, optional): 'dynamic_int8'이면 int8 동적 양자화 ONNX 모델을 사용.
+        intra_op_threads (int, optional): onnxruntime 연산 내부 스레드 수 (None이면 onnxruntime 기본값).
+        inter_op_threads (int, optional): onnxruntime 연산 간 스레드 수 (None이면 onnxruntime 기본값).
+    """
+    def __init__(self, onnx_dir, quantization=None, intra_op_threads=None, inter_op_threads=None):
+        import onnxruntime
+        with open(os.path.join(onnx_dir, ONNX_CONFIG_FILE_NAME), 'r', encoding='utf-8') as f:
+            self.onnx_config = json.load(f)
+        self.max_seq_length = self.onnx_config['max_seq_length']
+        self.quantization = quantization
+        self.tokenizer = OnnxTokenizer(os.path.join(onnx_dir, 'tokenizer.json'), self.max_seq_length)
+        session_options = onnxruntime.SessionOptions()
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            session_options.intra_op_num_threads = int(intra_op_threads)
+        if inter_op_threads:
+            session_options.inter_op_num_threads = int(inter_op_threads)
+        model_path = _quantized_onnx_path(onnx_dir) if quantization == 'dynamic_int8' else os.path.join(onnx_dir, ONNX_MODEL_FILE_NAME)
+        self._session = onnxruntime.InferenceSession(model_path, session_options, providers=['CPUExecutionProvider'])
+
+    def get_sentence_embedding_dimension(self):
+        return self.onnx_config['embedding_dimension']
+
+    def _pool(self, token_embeddings, attention_mask):
+        """토큰 임베딩을 원본 모델의 Pooling 설정대로 문장 임베딩으로 만듭니다."""
+        pooling_mode = self.onnx_config['pooling_mode']
+        if pooling_mode == 'cls':
+            return token_embeddings[:, 0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        if pooling_mode == 'max':
+            return np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+        return (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def _encode_batch(self, texts):
+        encoded = self.tokenizer(texts, truncation=True, max_length=self.max_seq_length)
+        sequence_length = max(len(input_ids) for input_ids in encoded['input_ids'])
+        feeds = {}
+        for name in self.onnx_config['input_names']:
+            pad_value = self.onnx_config['pad_token_id'] if name == 'input_ids' else 0
+            padded = np.full((len(texts), sequence_length), pad_value, dtype=np.int64)
+            for row, values in enumerate(encoded[name]):
+                padded[row, :len(values)] = values
+            feeds[name] = padded
+        attention_mask = feeds.get('attention_mask')
+        if attention_mask is None:
+            attention_mask = np.zeros((len(texts), sequence_length), dtype=np.int64)
+            for row, values in enumerate(encoded['attention_mask']):
+                attention_mask[row, :len(values)] = values
+        token_embeddings = self._session.run(['token_embeddings'], feeds)[0]
+        sentence_embeddings = self._pool(token_embeddings, attention_mask)
+        if self.onnx_config['normalize']:
+            sentence_embeddings = sentence_embeddings / np.clip(np.linalg.norm(sentence_embeddings, axis=1, keepdims=True), 1e-12, None)
+        return sentence_embeddings.astype(np.float32)
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, convert_to_numpy=True, show_progress_bar=None,
+               normalize_embeddings=False, **kwargs):
+        """
+        문장 목록을 임베딩합니다. SentenceTransformer.encode처럼 길이가 비슷한 문장끼리 배치를 만든 뒤 원래 순서로 돌려줍니다.
+        Returns:
+            np.ndarray: (문장 수, 차원) float32 배열. 문자열 하나를 넘기면 (차원,) 배열.
+        """
+        single_input = isinstance(sentences, str)
+        sentences = [sentences] if single_input else list(sentences)
+        embeddings = np.zeros((len(sentences), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        order = np.argsort([-len(sentence) for sentence in sentences], kind='stable')
+        for start in range(0, len(sentences), max(1, batch_size)):
+            batch_indices = order[start:start + max(1, batch_size)]
+            embeddings[batch_indices] = self._encode_batch([sentences[index] for index in batch_indices])
+        if normalize_embeddings:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single_input else embeddings
+
+def load_onnx_embedding_model(model_name, cache_dir=None, quantization=None, verbose=True, intra_op_threads=None):
+    """
+    ONNX 임베딩 모델을 로드합니다. 저장소에 ONNX 파일이 없으면 한 번 내보냅니다.
+    Args:
+        model_name (str): Hugging Face 모델 이름 또는 로컬 경로.
+        cache_dir (str, optional): 모델 저장소 디렉토리. 기본값은 config.MODEL_CACHE_DIR.
+        quantization (str, optional): 양자화 모드. 기본값은 config.MODEL_QUANTIZATION.
+        verbose (bool): 로드 시간을 출력할지 여부.
+        intra_op_threads (int, optional): 연산 내부 스레드 수. 기본값은 config.TORCH_INTRA_OP_THREADS.
+    Returns:
+        OnnxEmbeddingModel: 로드된 모델.
+    """
+    quantization = resolve_quantization_mode(quantization)
+    load_start = time.perf_counter()
+    onnx_dir = export_onnx_model(model_name, cache_dir, verbose=verbose)
+    model = OnnxEmbeddingModel(onnx_dir, quantization, intra_op_threads or TORCH_INTRA_OP_THREADS, TORCH_INTER_OP_THREADS)
+    if verbose:
+        print(f"ONNX 임베딩 모델 로드 완료 ({model_name}{', ' + quantization if quantization else ''}, "
+              f"{time.perf_counter() - load_start:.2f}초)")
+    return model
+
+def check_onnx_parity(model_name, texts=None, cache_dir=None, min_cosine=0.9999):
+    """
+    같은 텍스트를 원본(sentence-transformers, fp32) 모델과 ONNX 모델로 임베딩하여 코사인 유사도를 비교합니다.
+    Returns:
+        dict: {'min_cosine': float, 'mean_cosine': float, 'passed': bool}
+    """
+    from .model_registry import load_embedding_model
+    texts = texts or PARITY_CHECK_TEXTS
+    reference = np.asarray(load_embedding_model(model_name, cache_dir=cache_dir, quantization='none', verbose=False)
+                           .encode(texts, convert_to_tensor=False), dtype=np.float32)
+    candidate = load_onnx_embedding_model(model_name, cache_dir=cache_dir, quantization='none', verbose=False).encode(texts)
+    cosine = np.sum(reference * candidate, axis=1) / np.maximum(
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1), 1e-12)
+    return {'min_cosine': float(cosine.min()), 'mean_cosine': float(cosine.mean()), 'passed': bool(cosine.min() >= min_cosine)}
+
+
+if __name__ == '__main__':
+    # --- 테스트용 코드: 원본 모델과 ONNX 모델의 임베딩 일치도 확인 ---
+    try:
+        from config import MODEL_NAME
+    except ImportError:
+        MODEL_NAME = 'all-MiniLM-L6-v2'
+    test_model_name = sys.argv[1] if len(sys.argv) > 1 else MODEL_NAME
+    parity = check_onnx_parity(test_model_name)
+    print(f"원본 모델 대비 ONNX 임베딩 코사인 유사도: 최소 {parity['min_cosine']:.6f}, 평균 {parity['mean_cosine']:.6f} "
+          f"({'통과' if parity['passed'] else '실패'})")
+    sys.exit(0 if parity['passed'] else 1)
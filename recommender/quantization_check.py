@@ -0,0 +1,160 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 양자화 임베딩 모델의 정확도/속도 비교
+내용 : MODEL_QUANTIZATION을 켜기 전에 우리 데이터(hr_data.json)에서 fp32 모델 대비 검색 품질이 얼마나 달라지는지 확인합니다.
+직원 문서를 fp32 모델과 양자화 모델로 각각 임베딩하고, 채용 공고 텍스트와 예시 프로젝트 설명을 쿼리로 사용하여
+상위 k명 인재가 fp32 결과와 얼마나 겹치는지(top-k overlap)를 계산합니다. 검색은 NumpyCollection(정확 검색)으로 수행하므로
+HNSW 근사 오차 없이 모델 차이만 비교됩니다.
+ - 전체 양자화: 문서와 쿼리 모두 양자화 모델로 임베딩 (새 컬렉션으로 다시 적재한 경우)
+ - 쿼리만 양자화: 저장된 fp32 문서 임베딩에 양자화 모델 쿼리로 검색 (기존 컬렉션에서 설정만 켠 경우)
+--min-overlap을 주면 전체 양자화의 평균 top-k 겹침이 기준보다 낮을 때 종료 코드 1을 반환합니다 (배포 전 점검/CI용).
+사용법: python -m recommender.quantization_check [--data data/hr_data.json] [--k 10] [--limit 2000] [--mode dynamic_int8]
+                                                 [--min-overlap 0.9]
+"""
+# hr_recommender/recommender/quantization_check.py
+
+import argparse
+import time
+
+import numpy as np
+
+from .data_loader import load_integrated_data
+from .embedding_utils import prepare_text_for_employee_embedding, prepare_text_for_job_embedding
+from .model_registry import load_embedding_model, quantize_model
+from .numpy_index import NumpyCollection
+
+try:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import INTEGRATED_DATA_FILE, MODEL_NAME, EMBED_BATCH_SIZE
+except ImportError:
+    INTEGRATED_DATA_FILE = 'data/hr_data.json'
+    MODEL_NAME = 'all-MiniLM-L6-v2'
+    EMBED_BATCH_SIZE = 32
+
+# 채용 공고 외에 추가로 사용하는 자유 입력 형태의 프로젝트 설명 쿼리
+SAMPLE_PROJECT_QUERIES = [
+    "백엔드 개발자 Python",
+    "소프트웨어 개발 프로젝트",
+    "데이터 분석 및 머신러닝 모델 개발",
+    "모바일 앱 개발 프로젝트 (Flutter, Kotlin)",
+    "클라우드 인프라 구축 및 운영 자동화",
+    "해외 고객 대응이 가능한 영업 담당자",
+]
+
+
+def _encode_timed(model, texts, batch_size):
+    """텍스트 목록을 임베딩하고 (임베딩 행렬, 걸린 시간(초))을 반환합니다."""
+    encode_start = time.perf_counter()
+    embeddings = np.asarray(model.encode(texts, batch_size=batch_size, convert_to_tensor=False), dtype=np.float32)
+    return embeddings, time.perf_counter() - encode_start
+
+def _single_query_latency_ms(model, queries):
+    """쿼리를 하나씩 임베딩할 때의 평균 지연 시간(밀리초)."""
+    model.encode(queries[:1], convert_to_tensor=False)
+    query_start = time.perf_counter()
+    for query in queries:
+        model.encode([query], convert_to_tensor=False)
+    return (time.perf_counter() - query_start) * 1000 / max(1, len(queries))
+
+def _top_k_ids(document_ids, document_embeddings, query_embeddings, k):
+    index = NumpyCollection('quantization_check', document_ids, document_embeddings, [{}] * len(document_ids), None)
+    return index.query(query_embeddings, n_results=k, include=[])['ids']
+
+def _overlap_stats(reference_ids, candidate_ids):
+    """쿼리별 top-k 겹침 비율의 평균/최소값과 1위 일치율."""
+    overlaps = [len(set(reference) & set(candidate)) / max(1, len(reference))
+                for reference, candidate in zip(reference_ids, candidate_ids)]
+    top1_matches = [bool(reference) and bool(candidate) and reference[0] == candidate[0]
+                    for reference, candidate in zip(reference_ids, candidate_ids)]
+    return {'mean_overlap': float(np.mean(overlaps)) if overlaps else 0.0,
+            'min_overlap': float(np.min(overlaps)) if overlaps else 0.0,
+            'top1_agreement': float(np.mean(top1_matches)) if top1_matches else 0.0}
+
+def compare_quantized_model(data_file=None, model_name=None, quantization='dynamic_int8', k=10, limit=None,
+                            batch_size=None):
+    """
+    fp32 모델과 양자화 모델의 임베딩 속도와 검색 결과 일치도를 비교합니다.
+    Args:
+        data_file (str, optional): 통합 데이터 파일. 기본값은 config.INTEGRATED_DATA_FILE.
+        model_name (str, optional): 모델 이름. 기본값은 config.MODEL_NAME.
+        quantization (str): 비교할 양자화 모드.
+        k (int): 비교할 상위 결과 수.
+        limit (int, optional): 사용할 최대 직원 수 (빠른 확인용).
+        batch_size (int, optional): 문서 임베딩 배치 크기. 기본값은 config.EMBED_BATCH_SIZE.
+    Returns:
+        dict: 속도, 임베딩 코사인 유사도, 전체 양자화/쿼리만 양자화 각각의 top-k 겹침 통계.
+    """
+    data_file = data_file or INTEGRATED_DATA_FILE
+    model_name = model_name or MODEL_NAME
+    batch_size = batch_size or EMBED_BATCH_SIZE
+    sections, _ = load_integrated_data(data_file)
+    employees = list(sections['employees'])[:limit] if limit else list(sections['employees'])
+    jobs = list(sections['job_descriptions'])
+    if not employees:
+        raise ValueError(f"{data_file}에 직원 데이터가 없습니다.")
+    document_ids = [str(employee.get('id', index)) for index, employee in enumerate(employees)]
+    documents = [prepare_text_for_employee_embedding(employee) for employee in employees]
+    queries = [prepare_text_for_job_embedding(job) for job in jobs] + SAMPLE_PROJECT_QUERIES
+
+    fp32_model = load_embedding_model(model_name, quantization='none', verbose=False)
+    quantized_model = quantize_model(fp32_model, quantization)
+    print(f"비교 대상: {model_name} fp32 vs {quantization}, 직원 문서 {len(documents)}개, 쿼리 {len(queries)}개, top-{k}")
+
+    fp32_documents, fp32_seconds = _encode_timed(fp32_model, documents, batch_size)
+    quantized_documents, quantized_seconds = _encode_timed(quantized_model, documents, batch_size)
+    fp32_queries, _ = _encode_timed(fp32_model, queries, batch_size)
+    quantized_queries, _ = _encode_timed(quantized_model, queries, batch_size)
+
+    cosine = np.sum(fp32_documents * quantized_documents, axis=1) / np.maximum(
+        np.linalg.norm(fp32_documents, axis=1) * np.linalg.norm(quantized_documents, axis=1), 1e-12)
+    reference_ids = _top_k_ids(document_ids, fp32_documents, fp32_queries, k)
+    return {
+        'documents': len(documents),
+        'queries': len(queries),
+        'k': k,
+        'fp32_docs_per_sec': len(documents) / fp32_seconds,
+        'quantized_docs_per_sec': len(documents) / quantized_seconds,
+        'fp32_query_ms': _single_query_latency_ms(fp32_model, SAMPLE_PROJECT_QUERIES),
+        'quantized_query_ms': _single_query_latency_ms(quantized_model, SAMPLE_PROJECT_QUERIES),
+        'embedding_cosine_mean': float(np.mean(cosine)),
+        'embedding_cosine_min': float(np.min(cosine)),
+        'full_quantized': _overlap_stats(reference_ids, _top_k_ids(document_ids, quantized_documents, quantized_queries, k)),
+        'query_only_quantized': _overlap_stats(reference_ids, _top_k_ids(document_ids, fp32_documents, quantized_queries, k)),
+    }
+
+def check_overlap_threshold(report, min_overlap):
+    """전체 양자화(문서+쿼리)의 평균 top-k 겹침이 min_overlap 이상이면 True. 기준이 없으면(None) 항상 True."""
+    return min_overlap is None or report['full_quantized']['mean_overlap'] >= min_overlap
+
+def print_comparison_report(report, quantization='dynamic_int8'):
+    print(f"\n--- fp32 vs {quantization} 비교 결과 ---")
+    print(f"문서 임베딩 처리량: fp32 {report['fp32_docs_per_sec']:.1f}개/초, {quantization} {report['quantized_docs_per_sec']:.1f}개/초 "
+          f"({report['quantized_docs_per_sec'] / report['fp32_docs_per_sec']:.2f}배)")
+    print(f"쿼리 1개 임베딩 지연 시간: fp32 {report['fp32_query_ms']:.1f}ms, {quantization} {report['quantized_query_ms']:.1f}ms")
+    print(f"문서 임베딩 코사인 유사도 (fp32 대비): 평균 {report['embedding_cosine_mean']:.4f}, 최소 {report['embedding_cosine_min']:.4f}")
+    for label, key in (("전체 양자화 (문서+쿼리)", 'full_quantized'), ("쿼리만 양자화 (기존 컬렉션)", 'query_only_quantized')):
+        stats = report[key]
+        print(f"{label}: top-{report['k']} 겹침 평균 {stats['mean_overlap']:.1%} (최소 {stats['min_overlap']:.1%}), "
+              f"1위 일치율 {stats['top1_agreement']:.1%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="양자화 임베딩 모델의 정확도/속도를 fp32 모델과 비교")
+    parser.add_argument('--data', help="통합 데이터 파일 (기본값: config.INTEGRATED_DATA_FILE)")
+    parser.add_argument('--model', help="모델 이름 (기본값: config.MODEL_NAME)")
+    parser.add_argument('--mode', default='dynamic_int8', help="양자화 모드 (기본값: dynamic_int8)")
+    parser.add_argument('--k', type=int, default=10, help="비교할 상위 결과 수 (기본값: 10)")
+    parser.add_argument('--limit', type=int, help="사용할 최대 직원 수")
+    parser.add_argument('--min-overlap', type=float,
+                        help="전체 양자화의 평균 top-k 겹침 기준 (0~1). 이보다 낮으면 종료 코드 1")
+    args = parser.parse_args()
+    comparison_report = compare_quantized_model(args.data, args.model, args.mode, args.k, args.limit)
+    print_comparison_report(comparison_report, args.mode)
+    if args.min_overlap is not None:
+        passed = check_overlap_threshold(comparison_report, args.min_overlap)
+        print(f"겹침 기준 {args.min_overlap:.1%}: {'통과' if passed else '실패'} "
+              f"(전체 양자화 평균 {comparison_report['full_quantized']['mean_overlap']:.1%})")
+        sys.exit(0 if passed else 1)
@@ -0,0 +1,118 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 동시에 들어온 검색 쿼리 임베딩을 묶어서 계산 (마이크로 배칭)
+내용 : 서버 모드에서 요청마다 embedding_model.encode([설명 하나])를 호출하면 CPU에서 배치 크기 1로 모델을 돌리게 되어 비효율적입니다.
+요청들이 임베딩을 기다리는 동안 최대 max_wait_ms 밀리초 또는 max_batch_size개까지 모아 한 번의 encode 호출로 계산하고,
+결과 벡터를 각 요청에 나누어 돌려줍니다. 모델 계산은 전용 스레드 하나에서 순서대로 실행되므로,
+계산 중에 도착한 요청은 자연스럽게 다음 배치로 모입니다. 쿼리 임베딩 캐시가 주어지면 캐시에 있는 설명은 배치에 넣지 않습니다.
+"""
+# hr_recommender/recommender/query_batcher.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .query_cache import get_model_cache_name
+
+
+class AsyncEmbeddingBatcher:
+    """
+    asyncio 이벤트 루프에서 사용하는 쿼리 임베딩 마이크로 배처.
+    Args:
+        embedding_model: .encode(list[str])를 제공하는 임베딩 모델.
+        max_wait_ms (float): 첫 요청이 도착한 뒤 배치를 더 모으기 위해 기다리는 최대 시간(밀리초).
+        max_batch_size (int): 한 번에 임베딩할 최대 쿼리 수. 이만큼 모이면 기다리지 않고 바로 계산 (1이면 묶지 않음).
+        query_cache (QueryEmbeddingCache, optional): 먼저 조회하고 계산 결과를 저장할 쿼리 임베딩 캐시.
+    """
+    def __init__(self, embedding_model, max_wait_ms=5, max_batch_size=32, query_cache=None):
+        self.embedding_model = embedding_model
+        self.query_cache = query_cache
+        self._model_cache_name = get_model_cache_name(embedding_model)
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='query-embed')
+        self._pending = [] # (텍스트, future) 목록
+        self._flush_handle = None
+        self._tasks = set() # 실행 중인 배치 임베딩 태스크 (완료되면 제거, 종료 시 대기)
+        self.batches = 0
+        self.items = 0
+
+    async def embed(self, text):
+        """텍스트 하나의 임베딩(list[float])을 반환합니다. 다른 요청들과 묶여서 계산됩니다."""
+        if self.query_cache is not None:
+            cached = self.query_cache.get(self._model_cache_name, text)
+            if cached is not None:
+                return cached
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        """모인 요청들을 배치 하나로 넘겨 임베딩을 시작합니다."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._encode_batch(batch))
+            self._tasks.add(task) # 이벤트 루프는 태스크를 약하게 참조하므로 완료 전까지 참조를 유지
+            task.add_done_callback(self._tasks.discard)
+
+    def _encode_sync(self, texts):
+        return np.asarray(self.embedding_model.encode(texts, batch_size=len(texts), convert_to_tensor=False)).tolist()
+
+    async def _encode_batch(self, batch):
+        """전용 스레드에서 배치를 임베딩하고 결과를 각 요청의 future에 전달합니다."""
+        texts = [text for text, _ in batch]
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(self._executor, self._encode_sync, texts)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(batch)
+        for (text, future), vector in zip(batch, vectors):
+            if self.query_cache is not None:
+                self.query_cache.put(self._model_cache_name, text, vector)
+            if not future.done(): # 요청이 취소된 경우 건너뜀
+                future.set_result(vector)
+
+    def stats(self):
+        """누적 배치 수, 쿼리 수, 평균 배치 크기를 반환합니다."""
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'max_wait_ms': self.max_wait_ms,
+            'max_batch_size': self.max_batch_size,
+        }
+
+    async def aclose(self):
+        """
+        이벤트 루프를 닫기 전에 호출합니다. 아직 배치로 넘기지 않은 요청은 취소하고,
+        이미 계산 중인 배치는 끝날 때까지 기다려 요청들이 결과를 받도록 합니다.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        for _, future in pending:
+            future.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,140 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 검색 쿼리(프로젝트 설명) 임베딩 및 추천 결과의 메모리 캐시
+내용 : 채용 담당자는 같거나 거의 같은 프로젝트 설명("백엔드 개발자 Python", 기본값 "소프트웨어 개발 프로젝트" 등)을 반복해서 검색합니다.
+(모델 이름, 정규화한 설명 텍스트)를 키로 임베딩을 메모리에 보관하여, 반복 쿼리는 모델을 전혀 호출하지 않도록 합니다.
+정규화는 유니코드 NFC 변환과 공백 정리만 수행합니다 (대소문자는 모델에 따라 임베딩이 달라질 수 있어 유지).
+최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터, TTL이 지난 항목은 조회 시 삭제합니다.
+같은 LRU/TTL 구조로 추천 결과 전체를 (컬렉션 epoch, 검색 조건) 키로 보관하는 결과 캐시도 제공합니다.
+"""
+# hr_recommender/recommender/query_cache.py
+
+import copy
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_query_text(text):
+    """캐시 키에 사용할 설명 텍스트로 정규화합니다 (NFC, 앞뒤 공백 제거, 연속 공백 하나로)."""
+    return " ".join(unicodedata.normalize('NFC', str(text)).split())
+
+def get_model_cache_name(embedding_model):
+    """캐시 키에 사용할 모델 이름을 반환합니다. get_embedding_model이 기록한 이름이 없으면 객체 식별자를 사용."""
+    return getattr(embedding_model, 'model_name', None) or f"{type(embedding_model).__name__}@{id(embedding_model)}"
+
+
+class LruTtlCache:
+    """
+    LRU + TTL 메모리 캐시. 여러 스레드(서버 요청 처리 스레드)에서 사용할 수 있도록 잠금으로 보호합니다.
+    Args:
+        max_entries (int): 최대 보관 항목 수.
+        ttl_seconds (float, optional): 항목 유효 시간(초). None이면 만료 없음.
+    """
+    def __init__(self, max_entries=1024, ttl_seconds=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # 키 -> (저장 시각, 값)
+        self._lock = threading.Lock()
+
+    def get_item(self, key):
+        """캐시된 값을 반환합니다. 없거나 만료되었으면 None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put_item(self, key, value):
+        """값을 저장하고, 최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목을 삭제합니다."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """누적 조회 통계(적중/미적중/적중률)와 현재 항목 수를 반환합니다."""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class QueryEmbeddingCache(LruTtlCache):
+    """(모델 이름, 정규화한 설명 텍스트)를 키로 하는 쿼리 임베딩 캐시."""
+
+    def get(self, model_name, text):
+        """캐시된 임베딩(list[float])을 반환합니다. 없거나 만료되었으면 None."""
+        return self.get_item((model_name, normalize_query_text(text)))
+
+    def put(self, model_name, text, embedding):
+        """임베딩을 저장합니다."""
+        self.put_item((model_name, normalize_query_text(text)), np.asarray(embedding, dtype=np.float32).tolist())
+
+    def encode(self, embedding_model, texts):
+        """
+        캐시를 먼저 조회하고, 없는 텍스트만 모델 호출 한 번으로 임베딩합니다.
+        Returns:
+            list: 입력 순서대로의 임베딩 목록 (list[list[float]]).
+        """
+        model_name = get_model_cache_name(embedding_model)
+        embeddings = [self.get(model_name, text) for text in texts]
+        missing_positions = [index for index, embedding in enumerate(embeddings) if embedding is None]
+        if missing_positions:
+            # 같은 배치 안의 중복 설명은 한 번만 임베딩
+            unique_texts = list(dict.fromkeys(normalize_query_text(texts[index]) for index in missing_positions))
+            computed = np.asarray(embedding_model.encode(unique_texts, convert_to_tensor=False)).tolist()
+            computed_by_text = dict(zip(unique_texts, computed))
+            for text, embedding in computed_by_text.items():
+                self.put(model_name, text, embedding)
+            for index in missing_positions:
+                embeddings[index] = computed_by_text[normalize_query_text(texts[index])]
+        return embeddings
+
+
+class RecommendationResultCache(LruTtlCache):
+    """
+    추천 결과 캐시. 키에 컬렉션 epoch를 포함하므로 적재로 데이터가 바뀌면 이전 결과는 더 이상 조회되지 않습니다.
+    반환하는 결과는 복사본이므로 호출 측에서 수정해도 캐시에는 영향이 없습니다.
+    """
+
+    def get(self, key):
+        cached = self.get_item(key)
+        return copy.deepcopy(cached) if cached is not None else None
+
+    def put(self, key, recommendations):
+        self.put_item(key, copy.deepcopy(recommendations))
+
+
+if __name__ == '__main__':
+    # --- 테스트용 코드 ---
+    class _FakeModel:
+        """호출 횟수를 세는 테스트용 임베딩 모델."""
+        model_name = 'fake-model'
+        def __init__(self):
+            self.encoded_texts = 0
+        def encode(self, texts, convert_to_tensor=False):
+            self.encoded_texts += len(texts)
+            return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+    fake_model = _FakeModel()
+    test_cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=None)
+    test_cache.encode(fake_model, ["백엔드 개발자 Python", "백엔드  개발자 Python ", "소프트웨어 개발 프로젝트"])
+    test_cache.encode(fake_model, ["백엔드 개발자 Python"])
+    print(f"모델 호출 텍스트 수: {fake_model.encoded_texts} (기대값 2), 통계: {test_cache.stats()}")
@@ -0,0 +1,446 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 파싱된 HR 레코드의 바이너리 컬럼형 캐시 관리
+내용 : 통합 데이터 파일(JSON/JSONL/샤드 디렉토리)을 파싱한 결과를 원본 옆의 캐시 디렉토리에 컬럼 단위 numpy 배열로 저장합니다.
+문자열은 하나의 문자열 테이블에 중복 없이 저장(인터닝)하고 각 컬럼은 문자열 ID 배열로, 리스트 필드(skills, projects,
+languages, certifications 등)는 ID 배열과 오프셋 배열로 표현합니다. 원본 파일의 크기/수정 시각/내용 해시가 일치하면
+텍스트 파싱 없이 캐시를 메모리 매핑하여 레코드를 복원하므로 재시작 시 데이터 준비 시간이 크게 줄어듭니다.
+"""
+# hr_recommender/recommender/record_cache.py
+
+import hashlib
+import json
+import os
+import time
+from collections.abc import Sequence
+
+import numpy as np
+
+CACHE_FORMAT_VERSION = 1
+MANIFEST_FILE_NAME = 'manifest.json'
+STRINGS_FILE_NAME = 'strings.txt'
+STRING_OFFSETS_FILE_NAME = 'string_offsets.npy'
+
+# 컬럼 값 상태 (state 배열에 저장)
+_STATE_VALUE = 0
+_STATE_NULL = 1
+_STATE_MISSING = 2
+
+_VALUE_DTYPES = {'int': np.int64, 'float': np.float64, 'bool': np.uint8}
+
+
+class UnsupportedRecordLayout(Exception):
+    """컬럼형 캐시로 표현할 수 없는 레코드 구조(타입이 섞인 필드, 깊은 중첩 등)일 때 발생합니다."""
+
+
+def get_cache_dir(source_path):
+    """원본 데이터 경로 옆의 캐시 디렉토리 경로를 반환합니다 (예: data/.hr_data.json.cache)."""
+    normalized_path = os.path.normpath(source_path)
+    return os.path.join(os.path.dirname(normalized_path), f".{os.path.basename(normalized_path)}.cache")
+
+def _list_source_files(source_path):
+    """캐시 키 계산에 사용할 원본 파일 목록을 반환합니다 (디렉토리면 내부 파일 전체, 이름순)."""
+    if os.path.isdir(source_path):
+        return sorted(
+            os.path.join(source_path, name) for name in os.listdir(source_path)
+            if not name.startswith('.') and os.path.isfile(os.path.join(source_path, name))
+        )
+    return [source_path]
+
+def compute_source_signature(source_path):
+    """원본 파일들의 이름, 크기, 수정 시각(ns)으로 이루어진 가벼운 캐시 키를 계산합니다."""
+    return [
+        {'name': os.path.basename(file_path), 'size': os.path.getsize(file_path), 'mtime_ns': os.stat(file_path).st_mtime_ns}
+        for file_path in _list_source_files(source_path)
+    ]
+
+def compute_source_hash(source_path):
+    """원본 파일 내용 전체의 SHA-256 해시를 계산합니다 (수정 시각만 바뀐 경우 캐시 재사용 판단용)."""
+    digest = hashlib.sha256()
+    for file_path in _list_source_files(source_path):
+        digest.update(os.path.basename(file_path).encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def compute_source_key(source_path):
+    """
+    캐시 키 (크기/수정 시각 서명, 내용 해시)를 계산합니다.
+    원본을 파싱하기 전에 계산해서 save_columnar_cache에 넘겨야, 파싱하는 동안 원본이 바뀌었을 때 새 해시가 이전 내용에 기록되지 않습니다.
+    """
+    return compute_source_signature(source_path), compute_source_hash(source_path)
+
+
+def _value_kind(value):
+    """스칼라/리스트 값의 컬럼 종류를 판별합니다."""
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, str):
+        return 'str'
+    if isinstance(value, list) and all(isinstance(element, str) for element in value):
+        return 'str_list'
+    raise UnsupportedRecordLayout(f"지원하지 않는 값 타입: {type(value).__name__}")
+
+def _merge_kinds(current_kind, new_kind, column_name):
+    """한 컬럼에 서로 다른 종류의 값이 섞여 있을 때 공통 종류를 결정합니다 (int와 float만 float로 합침)."""
+    if current_kind is None or current_kind == new_kind:
+        return new_kind
+    if {current_kind, new_kind} == {'int', 'float'}:
+        return 'float'
+    raise UnsupportedRecordLayout(f"'{column_name}' 필드에 서로 다른 타입({current_kind}, {new_kind})이 섞여 있습니다.")
+
+def _build_section_layout(records):
+    """
+    레코드 목록을 훑어 필드 순서와 컬럼 종류를 결정합니다. 딕셔너리 값(예: education)은 한 단계까지 펼칩니다.
+    Returns:
+        tuple: (필드 순서 [(필드명, 하위 필드명 리스트 또는 None)], {컬럼명: 종류})
+    """
+    field_order = {}
+    column_kinds = {}
+    for record in records:
+        if not isinstance(record, dict):
+            raise UnsupportedRecordLayout("레코드가 딕셔너리가 아닙니다.")
+        for key, value in record.items():
+            if value is None:
+                field_order.setdefault(key, None)
+                column_kinds.setdefault(key, None)
+                continue
+            kind = 'dict' if isinstance(value, dict) else _value_kind(value)
+            column_kinds[key] = _merge_kinds(column_kinds.get(key), kind, key)
+            if kind != 'dict':
+                field_order.setdefault(key, None)
+                continue
+            sub_keys = field_order.get(key) or {}
+            field_order[key] = sub_keys
+            for sub_key, sub_value in value.items():
+                sub_keys.setdefault(sub_key, None)
+                column_name = f"{key}.{sub_key}"
+                if sub_value is None:
+                    column_kinds.setdefault(column_name, None)
+                else:
+                    column_kinds[column_name] = _merge_kinds(column_kinds.get(column_name), _value_kind(sub_value), column_name)
+
+    # 딕셔너리 필드는 상태(값/null/없음)만 담는 컬럼과 하위 필드 컬럼들로 저장됨
+    layout = [(key, list(sub_keys) if sub_keys is not None else None) for key, sub_keys in field_order.items()]
+    # 모든 값이 null인 컬럼은 문자열 컬럼으로 취급
+    column_kinds = {column_name: kind or 'str' for column_name, kind in column_kinds.items()}
+    return layout, column_kinds
+
+def _iter_column_values(records, key, sub_key):
+    """컬럼 하나의 값을 (상태, 값) 쌍으로 생성합니다."""
+    for record in records:
+        if key not in record:
+            yield _STATE_MISSING, None
+            continue
+        value = record[key]
+        if sub_key is not None:
+            if value is None or sub_key not in value:
+                yield _STATE_MISSING, None
+                continue
+            value = value[sub_key]
+        yield (_STATE_NULL, None) if value is None else (_STATE_VALUE, value)
+
+def _encode_column(records, key, sub_key, kind, intern_string):
+    """컬럼 하나를 numpy 배열 묶음으로 변환합니다."""
+    states = []
+    values = []
+    offsets = [0]
+    for state, value in _iter_column_values(records, key, sub_key):
+        states.append(state)
+        if kind == 'str_list':
+            if state == _STATE_VALUE:
+                values.extend(intern_string(element) for element in value)
+            offsets.append(len(values))
+        elif kind == 'str':
+            values.append(intern_string(value) if state == _STATE_VALUE else -1)
+        else:
+            values.append(value if state == _STATE_VALUE else 0)
+
+    arrays = {'state': np.asarray(states, dtype=np.uint8)}
+    if kind == 'dict':
+        return arrays
+    if kind in ('str', 'str_list'):
+        arrays['ids'] = np.asarray(values, dtype=np.int32)
+    else:
+        arrays['values'] = np.asarray(values, dtype=_VALUE_DTYPES[kind])
+    if kind == 'str_list':
+        arrays['offsets'] = np.asarray(offsets, dtype=np.int64)
+    return arrays
+
+def save_columnar_cache(sections, source_path, cache_dir=None, source_key=None):
+    """
+    파싱된 섹션 데이터를 원본 옆 캐시 디렉토리에 컬럼형 numpy 배열로 저장합니다.
+    Args:
+        sections (dict): {섹션 키: 레코드 리스트}.
+        source_path (str): 원본 데이터 경로 (캐시 키 계산용).
+        cache_dir (str, optional): 캐시 디렉토리. 기본값은 get_cache_dir(source_path).
+        source_key (tuple, optional): 파싱 전에 compute_source_key로 계산한 캐시 키. 생략하면 지금 계산합니다.
+            주어진 경우 원본의 서명이 그 사이 바뀌었으면 (파싱 도중 원본 변경) 저장하지 않습니다.
+    Returns:
+        bool: 저장 성공 여부.
+    """
+    cache_dir = cache_dir or get_cache_dir(source_path)
+    save_start = time.perf_counter()
+    try:
+        if source_key is None:
+            source_key = compute_source_key(source_path)
+        elif compute_source_signature(source_path) != source_key[0]:
+            print(f"경고: 파싱하는 동안 원본 데이터({source_path})가 변경되어 컬럼형 캐시를 저장하지 않습니다.")
+            return False
+        source_signature, source_hash = source_key
+
+        string_ids = {}
+        def intern_string(text):
+            string_id = string_ids.get(text)
+            if string_id is None:
+                string_id = len(string_ids)
+                string_ids[text] = string_id
+            return string_id
+
+        section_manifests = {}
+        section_arrays = {}
+        for section_index, (data_key, records) in enumerate(sections.items()):
+            layout, column_kinds = _build_section_layout(records)
+            column_manifests = []
+            for key, sub_keys in layout:
+                for sub_key in [None] + (sub_keys or []):
+                    column_name = key if sub_key is None else f"{key}.{sub_key}"
+                    column_prefix = f"s{section_index}_c{len(column_manifests)}"
+                    arrays = _encode_column(records, key, sub_key, column_kinds[column_name], intern_string)
+                    for part_name, array in arrays.items():
+                        section_arrays[f"{column_prefix}_{part_name}.npy"] = array
+                    column_manifests.append({'name': column_name, 'kind': column_kinds[column_name], 'prefix': column_prefix})
+            section_manifests[data_key] = {'count': len(records), 'layout': layout, 'columns': column_manifests}
+    except UnsupportedRecordLayout as e:
+        print(f"경고: 레코드 구조를 컬럼형 캐시로 저장할 수 없습니다 ({e}). 캐시 없이 진행합니다.")
+        return False
+    except OSError as e:
+        print(f"경고: 캐시 키 계산 중 오류 발생 ({source_path}): {e}")
+        return False
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest_path = os.path.join(cache_dir, MANIFEST_FILE_NAME)
+        # 매니페스트를 먼저 지워 두어, 쓰기 도중 중단되더라도 불완전한 캐시가 유효한 것으로 읽히지 않게 함
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+        string_table = list(string_ids)
+        string_offsets = np.zeros(len(string_table) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in string_table], out=string_offsets[1:])
+        with open(os.path.join(cache_dir, STRINGS_FILE_NAME), 'w', encoding='utf-8', newline='') as f:
+            f.write(''.join(string_table))
+        np.save(os.path.join(cache_dir, STRING_OFFSETS_FILE_NAME), string_offsets)
+        for file_name, array in section_arrays.items():
+            np.save(os.path.join(cache_dir, file_name), array)
+
+        manifest = {
+            'version': CACHE_FORMAT_VERSION,
+            'source_signature': source_signature,
+            'source_sha256': source_hash,
+            'string_count': len(string_table),
+            'sections': section_manifests,
+        }
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"경고: 컬럼형 캐시 저장 중 오류 발생 ({cache_dir}): {e}")
+        return False
+
+    print(f"컬럼형 캐시 저장 완료: {cache_dir} (문자열 {len(string_table)}개, {time.perf_counter() - save_start:.3f}초)")
+    return True
+
+
+def _split_string_table(text, offsets):
+    """문자 오프셋 배열에 따라 이어 붙여 저장된 문자열 테이블을 문자열 리스트로 나눕니다."""
+    offset_list = offsets.tolist()
+    return [text[start:end] for start, end in zip(offset_list, offset_list[1:])]
+
+
+_ITER_BLOCK_SIZE = 1024 # 순회 시 한 번에 디코딩하는 레코드 수
+
+
+class ColumnarRecords(Sequence):
+    """
+    컬럼형 캐시의 한 섹션을 레코드(dict) 시퀀스처럼 다루는 읽기 전용 뷰.
+    레코드는 접근할 때 필요한 범위의 mmap 컬럼 값만 디코딩하여 만들어지며 (순회는 _ITER_BLOCK_SIZE개씩),
+    필드 순서는 섹션 전체에서 처음 등장한 순서를 따릅니다.
+    """
+    def __init__(self, count, layout, columns, strings):
+        self._count = count
+        self._layout = layout
+        self._columns = columns # {컬럼명: (종류, {부분 이름: mmap 배열})}
+        self._strings = strings
+
+    def __len__(self):
+        return self._count
+
+    def _decode_column(self, column_name, start, stop):
+        """컬럼 하나의 [start, stop) 범위를 파이썬 값 리스트로 변환합니다 (None은 null, _MISSING은 필드 없음)."""
+        kind, arrays = self._columns[column_name]
+        states = arrays['state'][start:stop].tolist()
+        if kind == 'dict':
+            return [{} if state == _STATE_VALUE else (None if state == _STATE_NULL else _MISSING) for state in states]
+        if kind == 'str':
+            ids = arrays['ids'][start:stop].tolist()
+            return [self._strings[string_id] if state == _STATE_VALUE else (None if state == _STATE_NULL else _MISSING)
+                    for state, string_id in zip(states, ids)]
+        if kind == 'str_list':
+            offsets = arrays['offsets'][start:stop + 1].tolist()
+            base_offset = offsets[0] if offsets else 0
+            ids = arrays['ids'][base_offset:offsets[-1] if offsets else 0].tolist()
+            return [[self._strings[string_id] for string_id in ids[offsets[i] - base_offset:offsets[i + 1] - base_offset]]
+                    if state == _STATE_VALUE else (None if state == _STATE_NULL else _MISSING)
+                    for i, state in enumerate(states)]
+        values = arrays['values'][start:stop].tolist()
+        if kind == 'bool':
+            values = [bool(value) for value in values]
+        return [value if state == _STATE_VALUE else (None if state == _STATE_NULL else _MISSING)
+                for state, value in zip(states, values)]
+
+    def _decode_field(self, key, sub_keys, start, stop):
+        """최상위 필드 하나의 [start, stop) 범위 값을 만듭니다. 딕셔너리 필드는 하위 컬럼으로 조립합니다."""
+        values = self._decode_column(key, start, stop)
+        if sub_keys is None:
+            return values
+        sub_columns = [(sub_key, self._decode_column(f"{key}.{sub_key}", start, stop)) for sub_key in sub_keys]
+        for position, value in enumerate(values):
+            if value is None or value is _MISSING:
+                continue
+            for sub_key, sub_values in sub_columns:
+                if sub_values[position] is not _MISSING:
+                    value[sub_key] = sub_values[position]
+        return values
+
+    def _build_records(self, start, stop):
+        """[start, stop) 범위의 레코드를 만듭니다. 필요한 범위의 컬럼만 디코딩합니다."""
+        records = [{} for _ in range(stop - start)]
+        for key, sub_keys in self._layout:
+            for record, value in zip(records, self._decode_field(key, sub_keys, start, stop)):
+                if value is not _MISSING:
+                    record[key] = value
+        return records
+
+    def column(self, column_name):
+        """컬럼 하나의 값 리스트를 반환합니다 (예: 'id', 'skills', 'education.degree'). 없는 필드는 None. 해당 컬럼만 디코딩합니다."""
+        sub_keys = dict(self._layout).get(column_name) if column_name in self._columns else None
+        values = self._decode_field(column_name, sub_keys, 0, self._count)
+        return [None if value is _MISSING else value for value in values]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step == 1:
+                return self._build_records(start, max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._build_records(index, index + 1)[0]
+
+    def __iter__(self):
+        for start in range(0, self._count, _ITER_BLOCK_SIZE):
+            yield from self._build_records(start, min(self._count, start + _ITER_BLOCK_SIZE))
+
+
+_MISSING = object()
+
+
+def load_columnar_cache(source_path, data_keys, cache_dir=None):
+    """
+    원본이 바뀌지 않았다면 컬럼형 캐시를 메모리 매핑하여 섹션 데이터를 반환합니다.
+    크기와 수정 시각이 같으면 바로 사용하고, 수정 시각만 다르면 내용 해시를 비교하여 재사용 여부를 결정합니다.
+    Args:
+        source_path (str): 원본 데이터 경로.
+        data_keys (tuple): 필요한 섹션 키 목록.
+        cache_dir (str, optional): 캐시 디렉토리. 기본값은 get_cache_dir(source_path).
+    Returns:
+        dict: {섹션 키: ColumnarRecords}. 캐시가 없거나 오래되었거나 손상된 경우 None.
+    """
+    cache_dir = cache_dir or get_cache_dir(source_path)
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != CACHE_FORMAT_VERSION:
+            return None
+        if any(data_key not in manifest['sections'] for data_key in data_keys):
+            return None
+
+        current_signature = compute_source_signature(source_path)
+        if current_signature != manifest['source_signature']:
+            previous_sizes = [(entry['name'], entry['size']) for entry in manifest['source_signature']]
+            current_sizes = [(entry['name'], entry['size']) for entry in current_signature]
+            if previous_sizes != current_sizes or compute_source_hash(source_path) != manifest['source_sha256']:
+                print(f"원본 데이터가 변경되어 컬럼형 캐시({cache_dir})를 다시 만듭니다.")
+                return None
+            # 내용은 같고 수정 시각만 바뀐 경우: 다음 실행에서 해시 계산을 생략하도록 키만 갱신
+            manifest['source_signature'] = current_signature
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+        with open(os.path.join(cache_dir, STRINGS_FILE_NAME), 'r', encoding='utf-8', newline='') as f:
+            string_text = f.read()
+        string_offsets = np.load(os.path.join(cache_dir, STRING_OFFSETS_FILE_NAME), mmap_mode='r')
+        strings = _split_string_table(string_text, string_offsets)
+
+        sections = {}
+        for data_key in data_keys:
+            section_manifest = manifest['sections'][data_key]
+            columns = {}
+            for column_manifest in section_manifest['columns']:
+                prefix = column_manifest['prefix']
+                part_names = ['state']
+                if column_manifest['kind'] in ('str', 'str_list'):
+                    part_names.append('ids')
+                elif column_manifest['kind'] != 'dict':
+                    part_names.append('values')
+                if column_manifest['kind'] == 'str_list':
+                    part_names.append('offsets')
+                columns[column_manifest['name']] = (column_manifest['kind'], {
+                    part_name: np.load(os.path.join(cache_dir, f"{prefix}_{part_name}.npy"), mmap_mode='r')
+                    for part_name in part_names
+                })
+            layout = [(key, sub_keys) for key, sub_keys in section_manifest['layout']]
+            sections[data_key] = ColumnarRecords(section_manifest['count'], layout, columns, strings)
+        return sections
+    except (OSError, ValueError, KeyError) as e:
+        print(f"경고: 컬럼형 캐시({cache_dir})를 읽을 수 없습니다: {e}")
+        return None
+
+
+if __name__ == '__main__':
+    # --- 테스트용 코드 ---
+    import shutil
+    sample_sections = {
+        "employees": [
+            {"id": "EMP_TEST_001", "name": "김직원", "skills": ["Python", "SQL"], "languages": ["한국어(원어민)"],
+             "education": {"degree": "학사", "school": "한국대학교", "graduation_year": 2018}},
+            {"id": "EMP_TEST_002", "name": "이직원", "skills": [], "languages": ["한국어(원어민)", "영어(중급)"],
+             "education": {"degree": "석사", "school": "서울대학교", "graduation_year": None}},
+        ],
+        "job_descriptions": [
+            {"id": "JOB_TEST_001", "title": "백엔드 개발자", "required_skills": ["Java", "Spring"], "salary": None},
+            {"id": "JOB_TEST_002", "title": "UX 디자이너", "required_skills": [], "salary": 4500.5, "remote": True},
+        ]
+    }
+    test_source = 'record_cache_temp_source.json'
+    with open(test_source, 'w', encoding='utf-8') as f:
+        json.dump(sample_sections, f, ensure_ascii=False)
+
+    save_columnar_cache(sample_sections, test_source)
+    cached_sections = load_columnar_cache(test_source, ('employees', 'job_descriptions'))
+    print(f"캐시 복원 결과 일치: {cached_sections is not None and {k: list(v) for k, v in cached_sections.items()} == sample_sections}")
+    print(f"직원 ID 컬럼: {cached_sections['employees'].column('id')}")
+
+    shutil.rmtree(get_cache_dir(test_source))
+    os.remove(test_source)
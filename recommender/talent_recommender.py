@@ -9,62 +9,150 @@
 """
 # hr_recommender/recommender/talent_recommender.py
 
-def recommend_talent_from_db(collection, embedding_model, project_description, num_results=3, department_filter=None, required_languages=None, target_doc_type=None):
+import json
+import math
+from collections import Counter
+
+from .metadata_index import base_language, language_filter_key, normalize_term, skill_filter_key
+from .collection_epoch import get_collection_epoch
+from .query_cache import QueryEmbeddingCache, RecommendationResultCache, get_model_cache_name, normalize_query_text
+
+try:
+    import sys
+    import os
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from config import ADAPTIVE_OVERFETCH, OVERFETCH_GROWTH, OVERFETCH_MAX_RESULTS
+except ImportError:
+    ADAPTIVE_OVERFETCH = True
+    OVERFETCH_GROWTH = 2.0
+    OVERFETCH_MAX_RESULTS = 500
+try:
+    from config import QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL
+except ImportError:
+    QUERY_EMBEDDING_CACHE_SIZE = 1024
+    QUERY_EMBEDDING_CACHE_TTL = 3600
+try:
+    from config import RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+except ImportError:
+    RESULT_CACHE_SIZE = 256
+    RESULT_CACHE_TTL = 600
+
+_cardinality_cache = {} # 컬렉션 이름 -> ((이름, epoch, 문서 수), 메타데이터 값별 문서 수)
+_query_embedding_cache = QueryEmbeddingCache(QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL) if QUERY_EMBEDDING_CACHE_SIZE else None
+_result_cache = RecommendationResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL) if RESULT_CACHE_SIZE else None
+
+def get_query_embedding_cache():
+    """프로세스 전체에서 공유하는 쿼리 임베딩 캐시를 반환합니다. QUERY_EMBEDDING_CACHE_SIZE가 0이면 None."""
+    return _query_embedding_cache
+
+def encode_queries(embedding_model, texts):
+    """프로젝트 설명 목록을 임베딩합니다 (list[list[float]]). 캐시가 켜져 있으면 반복 설명은 모델을 호출하지 않습니다."""
+    if _query_embedding_cache is not None:
+        return _query_embedding_cache.encode(embedding_model, texts)
+    return embedding_model.encode(texts, convert_to_tensor=False).tolist()
+
+def get_result_cache():
+    """프로세스 전체에서 공유하는 추천 결과 캐시를 반환합니다. RESULT_CACHE_SIZE가 0이면 None."""
+    return _result_cache
+
+def _result_cache_key(collection, embedding_model, project_description, num_results, department_filter=None,
+                      required_languages=None, target_doc_type=None, required_skills=None):
+    """추천 결과 캐시 키: (컬렉션, epoch, 모델, 검색 조건). 적재로 epoch가 바뀌면 다른 키가 됩니다."""
+    return (
+        collection.name, get_collection_epoch(collection), get_model_cache_name(embedding_model),
+        normalize_query_text(project_description), num_results,
+        (department_filter or "").strip() or None,
+        tuple(required_languages or ()), tuple(required_skills or ()),
+        target_doc_type if target_doc_type in ('employee', 'job') else None,
+        ADAPTIVE_OVERFETCH,
+    )
+
+def get_cached_recommendations(collection, embedding_model, project_description, num_results=3, department_filter=None,
+                               required_languages=None, target_doc_type=None, required_skills=None):
+    """같은 조건의 추천 결과가 현재 epoch에서 이미 계산되었으면 그 복사본을, 아니면 None을 반환합니다 (모델/DB 호출 없음)."""
+    if _result_cache is None:
+        return None
+    return _result_cache.get(_result_cache_key(collection, embedding_model, project_description, num_results, department_filter,
+                                               required_languages, target_doc_type, required_skills))
+
+def _casing_variants(value):
+    """대소문자만 다른 표기를 모두 찾기 위한 후보 문자열(입력 그대로, 소문자, 대문자, 첫 글자 대문자)을 반환합니다."""
+    return list(dict.fromkeys([value, value.lower(), value.upper(), value.title(), value.capitalize()]))
+
+def _combine_conditions(operator, conditions):
+    """조건 목록을 $and/$or로 묶습니다. ChromaDB는 조건이 하나뿐인 $and/$or를 허용하지 않으므로 그대로 반환합니다."""
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {operator: conditions}
+
+def build_query_filters(target_doc_type=None, department_filter=None, required_languages=None, required_skills=None):
     """
-    프로젝트 설명을 기반으로 ChromaDB에서 유사한 직원 및/또는 채용 공고를 검색하고 필터링하여 추천합니다.
-    Args:
-        collection (chromadb.Collection): 검색할 ChromaDB 컬렉션.
-        embedding_model (SentenceTransformer): 프로젝트 설명 임베딩용 모델.
-        project_description (str): 프로젝트 설명.
-        num_results (int): 반환할 추천 아이템 수.
-        department_filter (str, optional): 필터링할 부서 이름.
-        required_languages (list, optional): (직원 대상) 필요한 언어 목록.
-        target_doc_type (str, optional): 'employee', 'job', 또는 None (모두). 특정 타입의 문서만 검색.
+    추천 조건을 ChromaDB where 조건으로 변환하여, HNSW 검색 단계에서 조건에 맞는 문서만 반환되도록 합니다.
+    기술/언어 조건은 적재 시 저장한 불리언 필터 키('skill:python', 'lang:영어')로 표현합니다.
+    부서는 문자열 비교가 대소문자를 구분하므로 대소문자 표기 후보를 모두 허용하고,
+    최종 판정은 기존처럼 Python 필터에서 한 번 더 확인합니다.
+    언어 조건은 직원에게만 적용하므로, 모든 타입을 검색할 때는 "직원이면서 언어 충족 OR 채용 공고"로 표현합니다.
     Returns:
-        list: 추천된 아이템 정보 딕셔너리의 리스트. 각 아이템은 'doc_type' 포함.
+        dict 또는 None: where 조건.
     """
-    project_embedding = embedding_model.encode([project_description], convert_to_tensor=False).tolist()
+    where_conditions = []
+    if target_doc_type in ('employee', 'job'):
+        where_conditions.append({"doc_type": target_doc_type})
+    if department_filter:
+        department_variants = _casing_variants(department_filter)
+        if len(department_variants) == 1:
+            where_conditions.append({"department": department_variants[0]})
+        else:
+            where_conditions.append({"department": {"$in": department_variants}})
+    for skill in required_skills or []:
+        where_conditions.append({skill_filter_key(skill): True})
 
-    initial_query_count = num_results * 5 if num_results * 5 > 10 else 20 # 더 많은 결과 요청
+    language_conditions = [{language_filter_key(language): True} for language in required_languages or []]
+    if language_conditions and target_doc_type == 'employee':
+        where_conditions.extend(language_conditions)
+    elif language_conditions and not target_doc_type:
+        employee_condition = _combine_conditions("$and", [{"doc_type": "employee"}] + language_conditions)
+        where_conditions.append({"$or": [employee_condition, {"doc_type": {"$ne": "employee"}}]})
 
-    # ChromaDB의 where 필터를 사용하여 doc_type 필터링 (지원하는 경우)
-    where_filter = {}
-    if target_doc_type and target_doc_type in ['employee', 'job']:
-        where_filter = {"doc_type": target_doc_type}
-        print(f"'{target_doc_type}' 타입의 문서만 검색합니다.")
+    return _combine_conditions("$and", where_conditions)
 
+def _query_collection(collection, query_embedding, n_results, where_filter=None):
+    """
+    조건을 적용하여 컬렉션을 검색합니다. 조건 적용에 실패하면 조건 없이 다시 검색합니다.
+    Returns:
+        tuple: (검색 결과 딕셔너리 또는 None, 조건이 실제로 적용되었는지 여부)
+    """
+    include = ['metadatas', 'documents', 'distances']
     try:
-        query_results = collection.query(
-            query_embeddings=project_embedding,
-            n_results=initial_query_count,
-            where=where_filter if where_filter else None, # where 필터 적용
-            include=['metadatas', 'documents', 'distances']
-        )
+        return collection.query(
+            query_embeddings=query_embedding,
+            n_results=n_results,
+            where=where_filter, # 문서 타입, 부서, 기술, 언어 조건
+            include=include
+        ), True
     except Exception as e:
         print(f"ChromaDB 쿼리 중 오류: {e}")
+        if not where_filter:
+            return None, False
         # where 필터가 지원되지 않거나 다른 문제일 수 있음. 필터 없이 재시도.
-        if where_filter:
-            print("Warning: Where 필터 적용 실패. 필터 없이 모든 타입 문서 검색 시도.")
-            query_results = collection.query(
-                query_embeddings=project_embedding,
-                n_results=initial_query_count,
-                include=['metadatas', 'documents', 'distances']
-            )
-        else:
-            return []
-
-
-    if not query_results['ids'] or not query_results['ids'][0]:
-        print("유사한 아이템(직원/채용공고)을 찾지 못했습니다.")
-        return []
+        print("Warning: Where 필터 적용 실패. 필터 없이 모든 타입 문서 검색 시도.")
+        try:
+            return collection.query(query_embeddings=query_embedding, n_results=n_results, include=include), False
+        except Exception as retry_error:
+            print(f"ChromaDB 쿼리 중 오류: {retry_error}")
+            return None, False
 
+def _build_candidates(query_results, target_doc_type=None):
+    """검색 결과를 추천 후보 딕셔너리 목록으로 변환합니다. 조건 없이 검색된 경우를 위해 문서 타입을 한 번 더 확인합니다."""
     candidates = []
     for i in range(len(query_results['ids'][0])):
         metadata = query_results['metadatas'][0][i]
         doc_type = metadata.get('doc_type', 'unknown') # doc_type 가져오기
 
-        # target_doc_type이 설정되었고, where 필터가 작동 안했을 경우 여기서 한번 더 필터링
-        if target_doc_type and target_doc_type != doc_type and not where_filter: # where_filter가 없었다는 것은 위에서 필터 없이 재시도했다는 의미
+        # where 필터가 작동 안했을 경우에도 target_doc_type이 지켜지도록 여기서 한번 더 필터링
+        if target_doc_type and target_doc_type != doc_type:
             continue
 
         candidate = {
@@ -92,8 +180,26 @@ def recommend_talent_from_db(collection, embedding_model, project_description, n
             candidate['responsibilities'] = metadata.get('responsibilities', "") # 문자열로 변환된 상태
 
         candidates.append(candidate)
+    return candidates
+
+def _merge_query_results(primary_results, extra_results):
+    """단일 쿼리 검색 결과 두 개를 ID 기준으로 중복 없이 합칩니다 (primary_results 순서 우선)."""
+    merged = {key: [[]] for key in ('ids', 'metadatas', 'documents', 'distances')}
+    seen_ids = set()
+    for results in (primary_results, extra_results):
+        for i, item_id in enumerate(results['ids'][0]):
+            if item_id in seen_ids:
+                continue
+            seen_ids.add(item_id)
+            for key in merged:
+                merged[key][0].append(results[key][0][i] if results.get(key) else None)
+    return merged
 
-    # --- 필터링 (검색 증강) ---
+def _apply_post_filters(candidates, project_description, department_filter=None, required_languages=None, required_skills=None, verbose=True):
+    """
+    후보 목록에 부서/기술/언어 필터와 프로젝트 키워드 매칭을 적용하고 추천 이유를 기록합니다 (검색 증강).
+    verbose가 False이면 단계별 후보 수를 출력하지 않습니다 (추가 조회가 필요한지 판단할 때 사용).
+    """
     # 부서 필터 (공통)
     if department_filter:
         filtered_candidates = []
@@ -102,7 +208,8 @@ def recommend_talent_from_db(collection, embedding_model, project_description, n
                 c['reasoning'].append(f"부서 일치: {c['department']}")
                 filtered_candidates.append(c)
         candidates = filtered_candidates
-        print(f"부서 필터링 후 후보 수: {len(candidates)}")
+        if verbose:
+            print(f"부서 필터링 후 후보 수: {len(candidates)}")
 
     # 프로젝트 키워드 매칭 (직원: projects, 채용공고: responsibilities 또는 description)
     project_keywords = [kw.strip().lower() for kw in project_description.split() if len(kw.strip()) > 2]
@@ -119,6 +226,19 @@ def recommend_talent_from_db(collection, embedding_model, project_description, n
                 candidate['reasoning'].append(f"프로젝트/업무 관련 키워드 {matched_keywords_count}개 매칭")
 
 
+    # 기술 필터 (직원: 보유 기술, 채용 공고: 필수 기술)
+    if required_skills:
+        required_skill_terms = {normalize_term(skill): skill for skill in required_skills}
+        filtered_by_skill = []
+        for candidate in candidates:
+            candidate_skills = {normalize_term(skill) for skill in (candidate.get('skills_info') or "").split(",")}
+            if all(term in candidate_skills for term in required_skill_terms):
+                candidate['reasoning'].append(f"요구 기술 충족: {', '.join(required_skill_terms.values())}")
+                filtered_by_skill.append(candidate)
+        candidates = filtered_by_skill
+        if verbose:
+            print(f"기술 필터링 후 후보 수: {len(candidates)}")
+
     # 언어 필터 (직원 대상)
     if required_languages:
         filtered_by_lang = []
@@ -142,12 +262,354 @@ def recommend_talent_from_db(collection, embedding_model, project_description, n
             else: # 채용 공고는 언어 필터 적용 안 함 (필요시 추가 가능)
                 filtered_by_lang.append(candidate)
         candidates = filtered_by_lang
-        print(f"언어 필터링 후 후보 수: {len(candidates)}")
+        if verbose:
+            print(f"언어 필터링 후 후보 수: {len(candidates)}")
 
+    return candidates
 
-    candidates.sort(key=lambda c: (-len(c['reasoning']), c['distance']))
+def get_metadata_cardinalities(collection, page_size=5000):
+    """
+    컬렉션 메타데이터의 값별 문서 수(문서 타입, 부서, 기술/언어 필터 키)를 집계합니다.
+    전체 메타데이터를 한 번 읽으므로 추천 결과 캐시처럼 (컬렉션 이름, epoch, 문서 수) 기준으로 캐시합니다.
+    적재로 upsert/삭제가 일어나면 epoch가 바뀌므로, 문서 수가 같아도 메타데이터(예: 부서 이동)가 바뀌면 다시 집계합니다.
+    Returns:
+        dict: {'total': int, 'doc_type': Counter, 'department': Counter, 'filter_keys': Counter}
+    """
+    total_count = collection.count()
+    cache_key = (collection.name, get_collection_epoch(collection), total_count)
+    cached = _cardinality_cache.get(collection.name)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+
+    cardinalities = {'total': total_count, 'doc_type': Counter(), 'department': Counter(), 'filter_keys': Counter()}
+    for offset in range(0, total_count, page_size):
+        page = collection.get(include=['metadatas'], limit=page_size, offset=offset)
+        for metadata in page['metadatas']:
+            if not metadata:
+                continue
+            cardinalities['doc_type'][metadata.get('doc_type', 'unknown')] += 1
+            cardinalities['department'][str(metadata.get('department', ''))] += 1
+            for key, value in metadata.items():
+                if value is True and ':' in key:
+                    cardinalities['filter_keys'][key] += 1
+    _cardinality_cache[collection.name] = (cache_key, cardinalities)
+    return cardinalities
+
+def estimate_filter_selectivity(cardinalities, target_doc_type=None, department_filter=None, required_languages=None, required_skills=None):
+    """
+    검색 대상 문서(target_doc_type) 중 부서/기술/언어 조건을 모두 만족하는 비율을 추정합니다.
+    조건끼리는 독립이라고 가정하고 값별 문서 수의 비율을 곱합니다.
+    Returns:
+        float: 0~1 사이의 추정 선택도 (데이터가 없으면 1.0)
+    """
+    total_count = cardinalities['total']
+    if not total_count:
+        return 1.0
+    scope_count = cardinalities['doc_type'].get(target_doc_type, 0) if target_doc_type else total_count
+    if not scope_count:
+        return 0.0
+    selectivity = 1.0
+    if department_filter:
+        department_count = sum(count for department, count in cardinalities['department'].items()
+                               if department.lower() == department_filter.lower())
+        selectivity *= department_count / total_count
+    if not cardinalities['filter_keys']: # 필터 키가 없는 이전 형식의 컬렉션: 기술/언어 선택도는 알 수 없으므로 추정에서 제외
+        return min(1.0, selectivity * total_count / scope_count)
+    for skill in required_skills or []:
+        selectivity *= cardinalities['filter_keys'].get(skill_filter_key(skill), 0) / total_count
+    if required_languages and target_doc_type != 'job':
+        employee_count = cardinalities['doc_type'].get('employee', 0) or 1
+        language_ratio = 1.0
+        for language in required_languages:
+            language_ratio *= min(1.0, cardinalities['filter_keys'].get(language_filter_key(language), 0) / employee_count)
+        if target_doc_type == 'employee':
+            selectivity *= language_ratio
+        else: # 채용 공고는 언어 조건과 무관하게 통과
+            employee_share = cardinalities['doc_type'].get('employee', 0) / total_count
+            selectivity *= employee_share * language_ratio + (1 - employee_share)
+    return min(1.0, selectivity * total_count / scope_count)
+
+def is_language_pushdown_exact(cardinalities, language):
+    """
+    요구 언어 하나에 대해 where 조건(필터 키 일치)과 사후 필터(언어 문자열 부분 일치)가 같은 직원을 고르는지 확인합니다.
+    요구 언어가 색인이 만든 키('lang:영어(비즈니스)' 또는 기본 언어 키 'lang:영어')와 정확히 일치하고,
+    그 문자열을 포함하는 다른 언어 값도 모두 같은 키를 가질 때만 True ('영'처럼 일부만 입력하면 False).
+    """
+    term = str(language).lower()
+    indexed_languages = {key[len('lang:'):] for key in cardinalities['filter_keys'] if key.startswith('lang:')}
+    if normalize_term(language) != term or term not in indexed_languages:
+        return False
+    return all(value == term or base_language(value) == term for value in indexed_languages if term in value)
+
+def _pushdown_languages(collection, required_languages):
+    """where 조건으로 표현해도 사후 필터와 결과가 같은 요구 언어만 반환합니다. 나머지는 사후 필터로만 적용합니다."""
+    if not required_languages:
+        return required_languages
+    cardinalities = get_metadata_cardinalities(collection)
+    return [language for language in required_languages if is_language_pushdown_exact(cardinalities, language)] or None
+
+def is_pushdown_complete(cardinalities, department_filter=None, required_languages=None, required_skills=None):
+    """
+    where 조건만으로 모든 조건 충족 문서를 찾을 수 있는지 확인합니다.
+    기술/언어 필터 키가 없는 이전 형식의 컬렉션이거나, 대소문자 표기 후보에 없는 부서 표기가 컬렉션에 있거나,
+    색인 키와 정확히 일치하지 않는(부분 일치로만 찾을 수 있는) 요구 언어가 있으면 False.
+    """
+    if (required_languages or required_skills) and not cardinalities['filter_keys']:
+        return False
+    if any(not is_language_pushdown_exact(cardinalities, language) for language in required_languages or []):
+        return False
+    if department_filter:
+        department_variants = set(_casing_variants(department_filter))
+        for department in cardinalities['department']:
+            if department.lower() == department_filter.lower() and department not in department_variants:
+                return False
+    return True
 
+def _initial_query_count(num_results):
+    """
+    첫 검색에서 조회할 후보 수를 반환합니다.
+    최종 순위는 추천 이유(키워드 일치) 수로 후보를 다시 정렬하여 정하므로, 적응형 조회에서도 이 후보 풀 크기부터 조회합니다.
+    첫 검색은 조건을 where로 적용하므로 반환된 후보는 이미 조건을 충족하고(조건 안에서의 선택도 = 1),
+    선택도 추정으로 줄이거나 늘릴 근거가 없습니다. 추정 선택도는 조건을 사후 필터로 적용하는 대체 검색의 첫 조회 수에 사용합니다.
+    """
+    return num_results * 5 if num_results * 5 > 10 else 20 # 더 많은 결과 요청
+
+def _search_with_overfetch(collection, query_embedding, where_filter, n_results, count_survivors, num_results, adaptive, max_results, growth, search_stats):
+    """
+    n_results개를 조회하고, adaptive이면 조건을 통과한 후보가 num_results개 이상이 될 때까지
+    n_results를 growth배씩 늘려 다시 조회합니다. 조회 결과가 요청보다 적으면(조건에 맞는 문서 소진) 또는 상한에 닿으면 멈춥니다.
+    Returns:
+        tuple: (검색 결과 딕셔너리 또는 None, 조건이 실제로 적용되었는지 여부)
+    """
+    while True:
+        query_results, filters_applied = _query_collection(collection, query_embedding, n_results, where_filter)
+        search_stats['rounds'] += 1
+        if query_results is None:
+            return None, filters_applied
+        returned_count = len(query_results['ids'][0])
+        search_stats['candidates_fetched'] += returned_count
+        search_stats['n_results'] = n_results
+        if not adaptive or returned_count < n_results or n_results >= max_results:
+            return query_results, filters_applied
+        if count_survivors(query_results) >= num_results:
+            return query_results, filters_applied
+        n_results = min(max_results, max(n_results + 1, math.ceil(n_results * growth)))
+
+def recommend_talent_from_db(collection, embedding_model, project_description, num_results=3, department_filter=None, required_languages=None, target_doc_type=None, query_embedding=None, required_skills=None, stats=None, verbose=True):
+    """
+    프로젝트 설명을 기반으로 ChromaDB에서 유사한 직원 및/또는 채용 공고를 검색하고 필터링하여 추천합니다.
+    문서 타입, 부서, 기술, (직원 대상) 언어 조건은 ChromaDB 검색 조건으로 먼저 적용하고, Python 필터로 최종 확인합니다.
+    기본 후보 풀(num_results의 5배, 최소 20개)부터 조회하며, ADAPTIVE_OVERFETCH가 켜져 있으면 조건을 통과한 후보가
+    num_results개보다 적을 때 조회 수를 기하급수적으로 늘립니다. 첫 검색은 where 조건으로 조건 충족 문서만 반환하므로
+    선택도 추정 없이 기본 후보 풀을 사용하고(재정렬에 필요한 후보 수 유지), 검색 조건을 사후 필터로 적용해야 하는 대체 검색은
+    메타데이터 값별 문서 수로 추정한 선택도에 맞추어 (기본 후보 풀 이상으로) 처음 조회 수를 정합니다.
+    Args:
+        collection (chromadb.Collection): 검색할 ChromaDB 컬렉션.
+        embedding_model (SentenceTransformer): 프로젝트 설명 임베딩용 모델.
+        project_description (str): 프로젝트 설명.
+        num_results (int): 반환할 추천 아이템 수.
+        department_filter (str, optional): 필터링할 부서 이름.
+        required_languages (list, optional): (직원 대상) 필요한 언어 목록.
+        target_doc_type (str, optional): 'employee', 'job', 또는 None (모두). 특정 타입의 문서만 검색.
+        query_embedding (list, optional): 미리 계산한 프로젝트 설명 임베딩 ([[float, ...]]). 주어지면 모델을 호출하지 않음.
+            project_description을 embedding_model로 임베딩한 값이어야 합니다 (추천 결과 캐시 키가 설명과 모델 기준).
+        required_skills (list, optional): 필요한 기술 목록 (직원: 보유 기술, 채용 공고: 필수 기술).
+        stats (dict, optional): 주어지면 검색 라운드 수('rounds'), 조회한 후보 수('candidates_fetched'),
+            마지막 조회 수('n_results'), 조건 통과 후보 수('survivors'), 추정 선택도('estimated_selectivity')를 기록.
+        verbose (bool): False이면 진행 상황을 출력하지 않음 (일괄 추천에서 사용).
+    Returns:
+        list: 추천된 아이템 정보 딕셔너리의 리스트. 각 아이템은 'doc_type' 포함.
+    """
+    search_stats = stats if stats is not None else {}
+    search_stats.update({'rounds': 0, 'candidates_fetched': 0, 'n_results': 0, 'survivors': 0, 'estimated_selectivity': None,
+                         'result_cache_hit': False})
+
+    result_cache_key = None
+    if _result_cache is not None:
+        result_cache_key = _result_cache_key(collection, embedding_model, project_description, num_results, department_filter,
+                                             required_languages, target_doc_type, required_skills)
+        cached_recommendations = _result_cache.get(result_cache_key)
+        if cached_recommendations is not None:
+            search_stats['result_cache_hit'] = True
+            search_stats['survivors'] = len(cached_recommendations)
+            if verbose:
+                print("같은 조건의 추천 결과를 캐시에서 가져왔습니다 (데이터 변경 없음).")
+            return cached_recommendations
+
+    if query_embedding is None:
+        query_embedding = encode_queries(embedding_model, [project_description])
+    has_filters = bool(department_filter or required_languages or required_skills)
+    initial_query_count = _initial_query_count(num_results)
+
+    if verbose and target_doc_type and target_doc_type in ['employee', 'job']:
+        print(f"'{target_doc_type}' 타입의 문서만 검색합니다.")
+    # 색인 키와 정확히 일치하지 않는 요구 언어는 where 조건에서 빼고 사후 필터(부분 일치)로만 적용
+    where_filter = build_query_filters(target_doc_type, department_filter,
+                                       _pushdown_languages(collection, required_languages), required_skills)
+
+    def count_survivors(results):
+        candidates = _build_candidates(results, target_doc_type)
+        return len(_apply_post_filters(candidates, project_description, department_filter, required_languages, required_skills, verbose=False))
+
+    query_results, filters_applied = _search_with_overfetch(
+        collection, query_embedding, where_filter, initial_query_count, count_survivors,
+        num_results, ADAPTIVE_OVERFETCH, OVERFETCH_MAX_RESULTS, OVERFETCH_GROWTH, search_stats
+    )
+    if query_results is None:
+        return []
+
+    # 대소문자 표기 후보로도 찾지 못한 부서 표기나, 필터 키가 없는 이전 형식의 컬렉션이 있을 수 있으므로
+    # 결과가 모자라면 사후 필터 방식으로 다시 검색
+    # (적응형 조회에서는 메타데이터 값별 문서 수로 where 조건이 이미 완전했는지 확인하여 불필요한 재검색을 생략)
+    needs_fallback = filters_applied and has_filters and len(query_results['ids'][0]) < num_results
+    cardinalities = get_metadata_cardinalities(collection) if needs_fallback and ADAPTIVE_OVERFETCH else None
+    if cardinalities is not None and is_pushdown_complete(cardinalities, department_filter, required_languages, required_skills):
+        needs_fallback = False
+    if needs_fallback:
+        if verbose:
+            print("검색 조건 적용 결과가 부족하여 문서 타입 조건만으로 다시 검색한 뒤 부서/기술/언어 조건을 사후 적용합니다.")
+        fallback_query_count = initial_query_count
+        if cardinalities is not None:
+            selectivity = estimate_filter_selectivity(cardinalities, target_doc_type, department_filter, required_languages, required_skills)
+            search_stats['estimated_selectivity'] = selectivity
+            fallback_query_count = min(OVERFETCH_MAX_RESULTS,
+                                       max(initial_query_count, math.ceil(num_results / max(selectivity, 1e-6))))
+        fallback_where = build_query_filters(target_doc_type)
+        fallback_results, _ = _search_with_overfetch(
+            collection, query_embedding, fallback_where, fallback_query_count, count_survivors,
+            num_results, ADAPTIVE_OVERFETCH, OVERFETCH_MAX_RESULTS, OVERFETCH_GROWTH, search_stats
+        )
+        if fallback_results is not None:
+            query_results = _merge_query_results(query_results, fallback_results)
+
+    if not query_results['ids'] or not query_results['ids'][0]:
+        if verbose:
+            print("유사한 아이템(직원/채용공고)을 찾지 못했습니다.")
+        if result_cache_key is not None:
+            _result_cache.put(result_cache_key, [])
+        return []
+
+    candidates = _build_candidates(query_results, target_doc_type)
+    candidates = _apply_post_filters(candidates, project_description, department_filter, required_languages, required_skills, verbose)
+    search_stats['survivors'] = len(candidates)
+    if verbose and ADAPTIVE_OVERFETCH:
+        selectivity_display = f", 추정 선택도 {search_stats['estimated_selectivity']:.2%}" if search_stats['estimated_selectivity'] is not None else ""
+        print(f"검색 라운드 {search_stats['rounds']}회, 조회 후보 {search_stats['candidates_fetched']}개, "
+              f"조건 충족 {search_stats['survivors']}개{selectivity_display}")
+
+    recommendations = _rank_candidates(candidates, num_results)
+    if result_cache_key is not None:
+        _result_cache.put(result_cache_key, recommendations)
+    return recommendations
+
+def _rank_candidates(candidates, num_results):
+    """추천 이유가 많은 순, 거리가 가까운 순으로 정렬하여 상위 num_results개를 반환합니다."""
+    candidates.sort(key=lambda c: (-len(c['reasoning']), c['distance']))
     return candidates[:num_results]
 
+def _normalize_batch_query(query, num_results):
+    """일괄 추천 입력 하나(문자열 또는 딕셔너리)를 recommend_talent_from_db 인자 딕셔너리로 정규화합니다."""
+    if isinstance(query, str):
+        query = {'project_description': query}
+    return {
+        'project_description': query.get('project_description') or "",
+        'num_results': query.get('num_results') or num_results,
+        'department_filter': query.get('department_filter') or None,
+        'required_languages': query.get('required_languages') or None,
+        'required_skills': query.get('required_skills') or None,
+        'target_doc_type': query.get('target_doc_type') if query.get('target_doc_type') in ('employee', 'job') else None,
+    }
+
+def _row_query_results(query_results, row_index):
+    """여러 임베딩을 한 번에 검색한 결과에서 row_index번째 쿼리의 결과만 단일 쿼리 결과 형태로 꺼냅니다."""
+    return {key: [query_results[key][row_index] if query_results.get(key) else []]
+            for key in ('ids', 'metadatas', 'documents', 'distances')}
+
+def _may_find_more(collection, query, returned_count, n_results, filters_applied):
+    """후보가 모자란 쿼리를 다시 검색하면 더 찾을 수 있는지 판단합니다 (조건에 맞는 문서가 이미 소진되었으면 False)."""
+    if returned_count >= n_results or not filters_applied:
+        return True
+    if not (query['department_filter'] or query['required_languages'] or query['required_skills']):
+        return False
+    cardinalities = get_metadata_cardinalities(collection)
+    return not is_pushdown_complete(cardinalities, query['department_filter'], query['required_languages'], query['required_skills'])
+
+def recommend_talent_batch(collection, embedding_model, queries, num_results=3, query_embeddings=None):
+    """
+    여러 프로젝트 설명을 한 번에 추천합니다. 설명 전체를 모델 호출 한 번으로 임베딩하고,
+    같은 검색 조건(where)을 가진 쿼리끼리 묶어 조건별로 collection.query를 한 번씩만 호출합니다.
+    조건을 통과한 후보가 모자란 쿼리만 recommend_talent_from_db(미리 계산한 임베딩 사용)로 다시 검색합니다.
+    Args:
+        collection (chromadb.Collection): 검색할 ChromaDB 컬렉션.
+        embedding_model (SentenceTransformer): 프로젝트 설명 임베딩용 모델.
+        queries (list): 프로젝트 설명 문자열 또는 recommend_talent_from_db 인자 이름을 키로 갖는 딕셔너리
+            ('project_description', 'num_results', 'department_filter', 'required_languages', 'required_skills', 'target_doc_type')의 목록.
+        num_results (int): 쿼리에 'num_results'가 없을 때 사용할 추천 아이템 수.
+        query_embeddings (list, optional): 미리 계산한 설명 임베딩 목록 (queries와 같은 순서). 주어지면 모델을 호출하지 않음.
+    Returns:
+        list: queries와 같은 순서의 추천 결과 리스트 목록.
+    """
+    normalized_queries = [_normalize_batch_query(query, num_results) for query in queries]
+    if not normalized_queries:
+        return []
+    batch_results = [None] * len(normalized_queries)
+
+    # 현재 epoch에서 이미 계산한 조건은 결과 캐시에서 바로 가져옴
+    pending_indices = []
+    for query_index, query in enumerate(normalized_queries):
+        cached_recommendations = get_cached_recommendations(collection, embedding_model, **query)
+        if cached_recommendations is not None:
+            batch_results[query_index] = cached_recommendations
+        else:
+            pending_indices.append(query_index)
+
+    if query_embeddings is None:
+        query_embeddings = [None] * len(normalized_queries)
+        if pending_indices:
+            pending_embeddings = encode_queries(embedding_model, [normalized_queries[index]['project_description'] for index in pending_indices])
+            for query_index, embedding in zip(pending_indices, pending_embeddings):
+                query_embeddings[query_index] = embedding
+
+    # 검색 조건이 같은 쿼리끼리 묶어 한 번에 검색
+    query_groups = {}
+    for query_index in pending_indices:
+        query = normalized_queries[query_index]
+        where_filter = build_query_filters(query['target_doc_type'], query['department_filter'],
+                                           _pushdown_languages(collection, query['required_languages']), query['required_skills'])
+        group_key = json.dumps(where_filter, sort_keys=True, ensure_ascii=False)
+        query_groups.setdefault(group_key, (where_filter, []))[1].append(query_index)
+
+    requery_indices = []
+    for where_filter, query_indices in query_groups.values():
+        n_results = max(_initial_query_count(normalized_queries[index]['num_results']) for index in query_indices)
+        group_results, filters_applied = _query_collection(
+            collection, [query_embeddings[index] for index in query_indices], n_results, where_filter
+        )
+        if group_results is None:
+            requery_indices.extend(query_indices)
+            continue
+        for row_index, query_index in enumerate(query_indices):
+            query = normalized_queries[query_index]
+            row_results = _row_query_results(group_results, row_index)
+            candidates = _apply_post_filters(
+                _build_candidates(row_results, query['target_doc_type']), query['project_description'],
+                query['department_filter'], query['required_languages'], query['required_skills'], verbose=False
+            )
+            if len(candidates) < query['num_results'] and _may_find_more(collection, query, len(row_results['ids'][0]), n_results, filters_applied):
+                requery_indices.append(query_index)
+            else:
+                batch_results[query_index] = _rank_candidates(candidates, query['num_results'])
+                if _result_cache is not None:
+                    _result_cache.put(_result_cache_key(collection, embedding_model, **query), batch_results[query_index])
+
+    for query_index in requery_indices:
+        batch_results[query_index] = recommend_talent_from_db(
+            collection, embedding_model, query_embedding=[query_embeddings[query_index]], verbose=False,
+            **normalized_queries[query_index]
+        )
+    print(f"일괄 추천 완료: 쿼리 {len(normalized_queries)}개 (결과 캐시 적중 {len(normalized_queries) - len(pending_indices)}개), "
+          f"검색 조건 그룹 {len(query_groups)}개, 개별 재검색 {len(requery_indices)}개")
+    return batch_results
+
 if __name__ == '__main__':
     print("talent_recommender.py는 직접 실행용이 아닌 모듈입니다.")
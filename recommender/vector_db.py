@@ -5,14 +5,25 @@
 내용 : ChromaDB 클라이언트를 초기화하고 지정된 컬렉션을 사용합니다. 
 직원(HR) 데이터와 채용 공고(Job Description) 데이터를 각각의 준비 함수를 통해 임베딩용 텍스트로 변환하고,
 임베딩 모델을 사용해 벡터로 변환합니다. 'doc_type' 메타데이터를 추가하여 문서 종류를 구분하며,
-ChromaDB에서 지원하는 타입으로 메타데이터를 가공하여 저장합니다. 데이터 변경 감지 시 컬렉션을 재생성하며, 
-대량 데이터 임베딩 및 ChromaDB 업로드 시 설정된 배치 크기(CHROMA_UPSERT_BATCH_SIZE)를 적용합니다.
+ChromaDB에서 지원하는 타입으로 메타데이터를 가공하여 저장합니다. 레코드별 내용 지문을 비교하여 변경분만 다시 임베딩하며, 
+대량 데이터 임베딩 시에는 EMBED_BATCH_SIZE를, ChromaDB 업로드 시에는 UPSERT_BATCH_SIZE를 각각 배치 크기로 적용합니다.
 """
 # hr_recommender/recommender/vector_db.py
 
-import chromadb
 from .embedding_utils import prepare_text_for_employee_embedding, prepare_text_for_job_embedding
+from .collection_epoch import bump_collection_epoch
+from .metadata_index import build_list_filter_keys
+from .data_loader import DOC_TYPE_TO_DATA_KEY, DataLoadError
+import hashlib
+import json
 import math # 배치 처리를 위해 추가
+import queue
+import threading
+import time
+
+import numpy as np
+from collections.abc import Sequence
+from itertools import islice
 
 # config는 main.py에서 로드되므로, 여기서 직접 임포트하지 않고 upsert_batch_size를 인자로 받도록 수정 가능
 # 또는 main에서 config 객체를 넘겨받도록 할 수 있음. 여기서는 config에서 직접 값을 가져오는 것으로 가정.
@@ -20,163 +31,613 @@ try:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-    from config import CHROMA_UPSERT_BATCH_SIZE
+    from config import UPSERT_BATCH_SIZE, EMBED_BATCH_SIZE
+except ImportError:
+    print("경고: config 모듈에서 UPSERT_BATCH_SIZE/EMBED_BATCH_SIZE를 가져올 수 없습니다. 기본값 1000/32를 사용합니다.")
+    UPSERT_BATCH_SIZE = 1000
+    EMBED_BATCH_SIZE = 32
+try:
+    from config import AUTO_TUNE_BATCH_SIZES, EMBED_BATCH_SIZE_CANDIDATES
+except ImportError:
+    AUTO_TUNE_BATCH_SIZES = False
+    EMBED_BATCH_SIZE_CANDIDATES = (8, 16, 32, 64, 128)
+try:
+    from config import LENGTH_BUCKETING
+except ImportError:
+    LENGTH_BUCKETING = True
+try:
+    from config import INGEST_PIPELINE, INGEST_QUEUE_SIZE
 except ImportError:
-    print("경고: config 모듈에서 CHROMA_UPSERT_BATCH_SIZE를 가져올 수 없습니다. 기본값 1000을 사용합니다.")
-    CHROMA_UPSERT_BATCH_SIZE = 1000
+    INGEST_PIPELINE = True
+    INGEST_QUEUE_SIZE = 2
+
+CONTENT_HASH_METADATA_KEY = 'content_hash' # 레코드 내용 지문을 저장하는 메타데이터 키
+AUTO_TUNE_SAMPLE_SIZE = 256 # 임베딩 배치 크기 자동 조정에 사용할 최대 문서 수
 
 
 def _process_metadata_for_db(item_data):
-    """ChromaDB 저장을 위해 메타데이터를 가공합니다 (리스트는 문자열로, 딕셔너리는 펼치기)."""
+    """
+    ChromaDB 저장을 위해 메타데이터를 가공합니다 (리스트는 문자열로, 딕셔너리는 펼치기).
+    기술/언어/자격증 목록은 표시용 문자열과 함께 값마다 'skill:python' 같은 불리언 필터 키로도 저장합니다.
+    """
     processed_metadata = {}
+    filter_keys = {}
     for key, value in item_data.items():
         if key == 'education' and isinstance(value, dict): # 직원의 education 필드
             for edu_key, edu_value in value.items():
                 processed_metadata[f"education_{edu_key}"] = str(edu_value) if edu_value is not None else None
         elif isinstance(value, list):
             processed_metadata[key] = ", ".join(map(str, value)) if value else ""
+            filter_keys.update(build_list_filter_keys(key, value))
         elif isinstance(value, (str, int, float, bool)) or value is None:
             processed_metadata[key] = value
         else:
             processed_metadata[key] = str(value)
+    for filter_key_name, flag in filter_keys.items():
+        processed_metadata.setdefault(filter_key_name, flag) # 원본 필드 이름과 겹치면 원본 우선
     return processed_metadata
 
-def setup_chromadb_collection(client, collection_name, employee_data, job_data, embedding_model):
+def _is_streaming_input(data):
+    """리스트처럼 길이를 알 수 있는 입력이 아닌 제너레이터/이터레이터 입력인지 확인합니다."""
+    return data is not None and not isinstance(data, Sequence)
+
+def _new_input_stats():
+    """입력 추적 정보: 입력에 있었던 ID, 레코드가 있었던 문서 타입, 끝까지 읽지 못한 문서 타입, 준비 실패 수."""
+    return {'seen_ids': set(), 'doc_types': set(), 'failed_doc_types': set(), 'invalid': 0}
+
+def _iter_items_for_embedding(employee_data, job_data, input_stats=None):
     """
-    ChromaDB 컬렉션을 설정하고 직원 및 채용 공고 데이터를 임베딩하여 저장합니다.
+    직원 및 채용 공고 데이터를 (아이템, 문서 타입) 쌍으로 순서대로 생성합니다. 입력이 제너레이터여도 지연 평가됩니다.
+    제너레이터 입력을 읽다가 DataLoadError가 발생하면 해당 문서 타입을 input_stats['failed_doc_types']에 기록하고
+    다음 섹션을 계속 처리합니다 (읽은 레코드까지는 동기화하되, 그 문서 타입의 삭제는 건너뜀).
+    """
+    for data, doc_type in ((employee_data, 'employee'), (job_data, 'job')):
+        if not data:
+            continue
+        try:
+            for item in data:
+                yield item, doc_type
+        except DataLoadError as e:
+            print(f"경고: {doc_type} 데이터를 끝까지 읽지 못했습니다 ({e}). 읽은 레코드까지만 동기화합니다.")
+            if input_stats is not None:
+                input_stats['failed_doc_types'].add(doc_type)
+
+def _prepare_item_for_db(item, doc_type):
+    """
+    아이템 하나를 ChromaDB 저장 형태로 변환합니다.
+    Returns:
+        tuple: (id, 임베딩용 텍스트, 메타데이터). 유효하지 않은 아이템이면 None.
+    """
+    if not isinstance(item, dict) or 'id' not in item:
+        print(f"경고: 유효하지 않은 데이터 형식 또는 ID 없음 ({doc_type}). 데이터: '{str(item)[:100]}...'. 건너뜁니다.")
+        return None
+
+    text_to_embed = ""
+    if doc_type == 'employee':
+        text_to_embed = prepare_text_for_employee_embedding(item)
+    elif doc_type == 'job':
+        text_to_embed = prepare_text_for_job_embedding(item)
+
+    if not text_to_embed:
+        print(f"경고: 임베딩 텍스트 생성 실패 ({doc_type}, ID: {item['id']}). 건너뜁니다.")
+        return None
+
+    processed_metadata = _process_metadata_for_db(item)
+    processed_metadata['doc_type'] = doc_type # 문서 타입 추가
+    return item['id'], text_to_embed, processed_metadata
+
+def _iter_prepared_batches(items_for_embedding, batch_size, input_stats=None):
+    """
+    (아이템, 문서 타입) 이터러블을 batch_size 단위의 (ids, documents, metadatas) 배치로 묶어 생성합니다.
+    input_stats가 주어지면 입력에 있었던 ID와 문서 타입, 준비 실패 수를 기록합니다. 준비(텍스트 생성)에 실패한 레코드도
+    ID가 있으면 입력에 있었던 것으로 기록하여, 일시적인 오류로 기존 임베딩이 삭제되지 않게 합니다.
+    """
+    def prepare(item, doc_type):
+        prepared = _prepare_item_for_db(item, doc_type)
+        if input_stats is not None:
+            input_stats['doc_types'].add(doc_type)
+            if isinstance(item, dict) and item.get('id') is not None:
+                input_stats['seen_ids'].add(item['id'])
+            if prepared is None:
+                input_stats['invalid'] += 1
+        return prepared
+
+    prepared_items = (prepare(item, doc_type) for item, doc_type in items_for_embedding)
+    valid_items = (prepared for prepared in prepared_items if prepared is not None)
+    while True:
+        batch = list(islice(valid_items, batch_size))
+        if not batch:
+            return
+        batch_ids, batch_documents, batch_metadatas = (list(column) for column in zip(*batch))
+        yield batch_ids, batch_documents, batch_metadatas
+
+def compute_content_fingerprint(document, metadata, model_key=None):
+    """
+    임베딩용 텍스트, 메타데이터, 임베딩 모델 키로부터 레코드 내용 지문(SHA-256)을 계산합니다. 키 순서와 무관하게 같은 내용이면 같은 값.
+    model_key(model_registry.get_model_cache_key: 모델 이름 + 양자화/백엔드)가 바뀌면 내용이 같아도 지문이 달라지므로,
+    모델 설정을 바꾼 뒤 적재하면 모든 레코드를 새 모델로 다시 임베딩합니다.
+    """
+    payload = json.dumps({'document': document, 'metadata': metadata, 'model': model_key},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _get_stored_fingerprints(collection, batch_ids):
+    """배치 ID들에 대해 컬렉션에 저장된 내용 지문을 조회합니다. {id: 지문 또는 None}"""
+    existing = collection.get(ids=batch_ids, include=['metadatas'])
+    return {
+        doc_id: (metadata or {}).get(CONTENT_HASH_METADATA_KEY)
+        for doc_id, metadata in zip(existing['ids'], existing['metadatas'])
+    }
+
+def _get_token_lengths(embedding_model, documents):
+    """모델 토크나이저 기준 문서별 토큰 수(특수 토큰 포함, 최대 길이에서 잘림)를 반환합니다. 토크나이저가 없으면 None."""
+    tokenizer = getattr(embedding_model, 'tokenizer', None)
+    if tokenizer is None:
+        return None
+    max_length = getattr(embedding_model, 'max_seq_length', None)
+    try:
+        encoded = tokenizer(documents, add_special_tokens=True, truncation=max_length is not None, max_length=max_length)
+        return [len(input_ids) for input_ids in encoded['input_ids']]
+    except Exception:
+        return None
+
+def _padded_token_count(token_lengths, batch_size):
+    """배치마다 가장 긴 문서 길이로 패딩했을 때 모델이 실제로 처리하는 토큰 수를 계산합니다."""
+    return sum(
+        max(token_lengths[start_idx:start_idx + batch_size]) * len(token_lengths[start_idx:start_idx + batch_size])
+        for start_idx in range(0, len(token_lengths), batch_size)
+    )
+
+def _new_encode_stats():
+    return {'documents': 0, 'tokens': 0, 'padded_tokens': 0, 'unsorted_padded_tokens': 0, 'seconds': 0.0}
+
+def _encode_length_bucketed(embedding_model, documents, embed_batch_size, encode_stats=None):
+    """
+    문서를 토큰 길이순으로 정렬해 비슷한 길이끼리 배치를 만든 뒤 임베딩하고, 결과를 원래 순서로 되돌립니다.
+    직원 프로필과 긴 채용 공고가 섞인 배치가 가장 긴 문서 길이로 패딩되는 낭비를 줄입니다.
+    토크나이저가 없는 모델(예: 멀티 프로세스 풀)은 문자 수를 길이 기준으로 사용합니다.
+    encode_stats가 주어지면 토큰 수, 패딩 포함 토큰 수(정렬 전/후), 소요 시간을 누적합니다.
+    """
+    token_lengths = _get_token_lengths(embedding_model, documents)
+    sort_lengths = token_lengths if token_lengths is not None else [len(document) for document in documents]
+    sorted_order = sorted(range(len(documents)), key=sort_lengths.__getitem__)
+    sorted_documents = [documents[index] for index in sorted_order]
+
+    encode_start = time.perf_counter()
+    if token_lengths is not None:
+        # 모델 내부 정렬(문자 수 기준)과 섞이지 않도록 정렬된 배치를 하나씩 넘김
+        sorted_embeddings = np.vstack([
+            np.asarray(embedding_model.encode(sorted_documents[start_idx:start_idx + embed_batch_size],
+                                              batch_size=embed_batch_size, convert_to_tensor=False))
+            for start_idx in range(0, len(sorted_documents), embed_batch_size)
+        ])
+    else:
+        sorted_embeddings = np.asarray(embedding_model.encode(sorted_documents, batch_size=embed_batch_size, convert_to_tensor=False))
+    elapsed = time.perf_counter() - encode_start
+
+    embeddings = np.empty_like(sorted_embeddings)
+    embeddings[sorted_order] = sorted_embeddings
+
+    if encode_stats is not None:
+        encode_stats['documents'] += len(documents)
+        encode_stats['seconds'] += elapsed
+        if token_lengths is not None:
+            encode_stats['tokens'] += sum(token_lengths)
+            encode_stats['padded_tokens'] += _padded_token_count([token_lengths[index] for index in sorted_order], embed_batch_size)
+            encode_stats['unsorted_padded_tokens'] += _padded_token_count(token_lengths, embed_batch_size)
+    return embeddings
+
+def _report_encode_stats(encode_stats):
+    """임베딩 토큰 처리량과 패딩 비율(길이 정렬 전/후)을 출력합니다."""
+    if not encode_stats['documents'] or encode_stats['seconds'] <= 0:
+        return
+    if not encode_stats['padded_tokens']:
+        print(f"임베딩 처리량: {encode_stats['documents'] / encode_stats['seconds']:.1f} docs/sec (토큰 통계 없음)")
+        return
+    padding_ratio = 1 - encode_stats['tokens'] / encode_stats['padded_tokens']
+    unsorted_padding_ratio = 1 - encode_stats['tokens'] / encode_stats['unsorted_padded_tokens']
+    print(f"임베딩 처리량: {encode_stats['documents'] / encode_stats['seconds']:.1f} docs/sec, "
+          f"{encode_stats['tokens'] / encode_stats['seconds']:.0f} tokens/sec. "
+          f"패딩 비율: {padding_ratio:.1%} (길이 정렬 없이 입력 순서대로 배치했을 때 {unsorted_padding_ratio:.1%})")
+
+def _encode_documents(embedding_model, documents, embedding_cache=None, embed_batch_size=EMBED_BATCH_SIZE, encode_stats=None,
+                      tune_batch_size=None):
+    """
+    문서 목록을 임베딩합니다. upsert 배치 전체를 넘기더라도 모델은 embed_batch_size 단위로 나누어 계산합니다.
+    LENGTH_BUCKETING이 켜져 있으면 토큰 길이가 비슷한 문서끼리 배치를 구성합니다.
+    임베딩 캐시가 주어지면 캐시에 없는 문서만 모델로 계산합니다.
+    tune_batch_size(texts)가 주어지면 모델이 실제로 계산할 문서로 호출하여 반환값을 embed_batch_size로 사용합니다.
+    """
+    def encode_fn(texts):
+        nonlocal embed_batch_size
+        if tune_batch_size is not None:
+            embed_batch_size = tune_batch_size(texts)
+        if LENGTH_BUCKETING:
+            return _encode_length_bucketed(embedding_model, texts, embed_batch_size, encode_stats)
+        return embedding_model.encode(texts, batch_size=embed_batch_size, convert_to_tensor=False)
+
+    if embedding_cache is not None:
+        return embedding_cache.encode(embedding_model, documents, encode_fn=encode_fn)
+    return encode_fn(documents)
+
+def get_max_upsert_batch_size(client):
+    """ChromaDB 클라이언트가 허용하는 최대 배치 크기를 조회합니다. 조회할 수 없으면 None."""
+    try:
+        if hasattr(client, 'get_max_batch_size'):
+            return client.get_max_batch_size()
+        return getattr(client, 'max_batch_size', None)
+    except Exception as e:
+        print(f"경고: ChromaDB 최대 배치 크기를 조회할 수 없습니다: {e}")
+        return None
+
+def tune_embed_batch_size(embedding_model, sample_documents, candidates=EMBED_BATCH_SIZE_CANDIDATES):
+    """
+    샘플 문서로 후보 배치 크기별 임베딩 처리량(docs/sec)을 측정하여 가장 빠른 배치 크기를 반환합니다.
     Args:
-        client (chromadb.Client): ChromaDB 클라이언트.
-        collection_name (str): 컬렉션 이름.
-        employee_data (list): HR 직원 데이터 리스트.
-        job_data (list): 채용 공고 데이터 리스트.
-        embedding_model (SentenceTransformer): 임베딩 모델.
+        embedding_model: .encode(list[str], batch_size=...)를 제공하는 임베딩 모델.
+        sample_documents (list): 측정에 사용할 문서 (실제 데이터 앞부분).
+        candidates (tuple): 후보 배치 크기.
     Returns:
-        chromadb.Collection: ChromaDB 컬렉션 객체.
+        int: 처리량이 가장 높은 배치 크기. 샘플이 없으면 EMBED_BATCH_SIZE.
     """
-    all_data_for_embedding = []
-    if employee_data:
-        all_data_for_embedding.extend([{'data': emp, 'type': 'employee'} for emp in employee_data])
-    if job_data:
-        all_data_for_embedding.extend([{'data': job, 'type': 'job'} for job in job_data])
+    if not sample_documents:
+        return EMBED_BATCH_SIZE
+    # 첫 호출의 지연 할당/커널 선택 비용이 측정에 섞이지 않도록 한 번 실행
+    embedding_model.encode(sample_documents[:min(8, len(sample_documents))], convert_to_tensor=False)
+    throughputs = {}
+    for batch_size in candidates:
+        probe_documents = sample_documents[:max(batch_size * 2, min(len(sample_documents), 64))]
+        probe_start = time.perf_counter()
+        embedding_model.encode(probe_documents, batch_size=batch_size, convert_to_tensor=False)
+        elapsed = time.perf_counter() - probe_start
+        throughputs[batch_size] = len(probe_documents) / elapsed if elapsed > 0 else float('inf')
+    best_batch_size = max(throughputs, key=throughputs.get)
+    throughput_display = ", ".join(f"{batch_size}: {rate:.1f}" for batch_size, rate in throughputs.items())
+    print(f"임베딩 배치 크기 자동 조정: 처리량(docs/sec) {throughput_display} → {best_batch_size} 선택")
+    return best_batch_size
 
-    if not all_data_for_embedding:
-        print("임베딩할 데이터가 없습니다 (직원 및 채용 공고 모두 비어 있음).")
-        # 컬렉션이 존재하지 않으면 생성은 하되 비어있는 상태로 반환
+class _IngestStageStats:
+    """파이프라인 단계별 처리 아이템 수와 실제 작업 시간(대기 시간 제외)을 누적합니다."""
+    def __init__(self, stage_names):
+        self.stage_names = stage_names
+        self.items = {stage_name: 0 for stage_name in stage_names}
+        self.busy_seconds = {stage_name: 0.0 for stage_name in stage_names}
+        self._lock = threading.Lock()
+
+    def record(self, stage_name, item_count, elapsed_seconds):
+        with self._lock:
+            self.items[stage_name] += item_count
+            self.busy_seconds[stage_name] += elapsed_seconds
+
+    def report(self, wall_seconds):
+        """단계별 items/sec을 출력하고, 작업 시간이 가장 긴 단계를 병목으로 표시합니다."""
+        stage_displays = []
+        for stage_name in self.stage_names:
+            busy = self.busy_seconds[stage_name]
+            rate = self.items[stage_name] / busy if busy > 0 else 0.0
+            stage_displays.append(f"{stage_name} {self.items[stage_name]}개/{busy:.2f}초 ({rate:.1f} items/sec)")
+        bottleneck = max(self.stage_names, key=lambda stage_name: self.busy_seconds[stage_name])
+        print(f"단계별 처리율: {', '.join(stage_displays)}. 전체 {wall_seconds:.2f}초, 병목 단계: {bottleneck}")
+
+
+_PIPELINE_DONE = object() # 파이프라인 종료 신호
+
+def _put_until_stopped(target_queue, item, stop_event):
+    """큐가 가득 차 있으면 기다리되, 다른 단계가 중단되면 더 기다리지 않습니다."""
+    while not stop_event.is_set():
         try:
-            collection = client.get_or_create_collection(name=collection_name)
-            print(f"'{collection_name}' 컬렉션이 비어있는 상태로 준비되었습니다.")
-        except Exception as e:
-            print(f"빈 컬렉션 '{collection_name}' 생성/가져오기 중 오류: {e}")
-            # 심각한 오류 시 None 반환 또는 예외 재발생 고려
-            return None
-        return collection
+            target_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
 
+def _run_pipeline_stage(stage_fn, input_queue, output_queue, stop_event, errors):
+    """입력 큐에서 작업을 꺼내 stage_fn으로 처리하고 다음 큐로 넘기는 스레드 본체."""
+    try:
+        while not stop_event.is_set():
+            try:
+                work_item = input_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if work_item is _PIPELINE_DONE:
+                break
+            if not _put_until_stopped(output_queue, stage_fn(work_item), stop_event):
+                return
+    except BaseException as e:
+        errors.append(e)
+        stop_event.set()
+        return
+    _put_until_stopped(output_queue, _PIPELINE_DONE, stop_event)
 
-    current_doc_ids_from_files = set()
-    if employee_data:
-        current_doc_ids_from_files.update(emp['id'] for emp in employee_data if isinstance(emp, dict) and 'id' in emp)
-    if job_data:
-        current_doc_ids_from_files.update(job['id'] for job in job_data if isinstance(job, dict) and 'id' in job)
-    
+def _run_pipeline_source(source_iter, output_queue, stop_event, errors):
+    """첫 단계(준비)를 실행하는 스레드 본체. 소스가 끝나면 종료 신호를 보냅니다."""
     try:
-        collection = client.get_collection(name=collection_name)
-        print(f"'{collection_name}' 컬렉션에서 기존 데이터를 로드했습니다.")
-        
-        db_item_count = collection.count()
-        
-        should_recreate = False
-        if db_item_count != len(current_doc_ids_from_files):
-            print(f"데이터 개수 변경 감지 (DB: {db_item_count}개, 파일 통합: {len(current_doc_ids_from_files)}개).")
-            should_recreate = True
-        else: # 개수가 같으면 ID 목록 비교 (샘플링 또는 전체 비교 - 여기서는 개수만으로 단순화)
-            # 더 정확하려면 DB의 모든 ID를 가져와 current_doc_ids_from_files와 비교해야 함.
-            # collection.get(include=[]) 등으로 ID만 가져오는 기능이 제한적일 수 있어, 개수 기반으로 우선 처리.
-            print("데이터 개수 일치. ID 상세 비교는 생략하고 기존 데이터 사용 가정 (정확한 변경 감지 로직 개선 가능).")
-
-
-        if should_recreate:
-            print(f"컬렉션 '{collection_name}'을(를) 재생성합니다.")
-            client.delete_collection(name=collection_name)
-            collection = client.create_collection(name=collection_name)
-        elif not should_recreate and db_item_count == len(current_doc_ids_from_files) and db_item_count > 0 :
-             print("데이터 변경 없음 (개수 기준). 기존 임베딩을 사용합니다.")
-             return collection
-            
-    except Exception: 
-        print(f"'{collection_name}' 컬렉션을 새로 생성합니다.")
-        collection = client.create_collection(name=collection_name)
-
-    print("통합 데이터(직원, 채용 공고) 임베딩 및 ChromaDB 저장 중...")
-    
-    all_documents = []
-    all_metadatas_to_db = []
-    all_ids = []
+        for work_item in source_iter:
+            if not _put_until_stopped(output_queue, work_item, stop_event):
+                return
+    except BaseException as e:
+        errors.append(e)
+        stop_event.set()
+        return
+    _put_until_stopped(output_queue, _PIPELINE_DONE, stop_event)
 
-    for item_info in all_data_for_embedding:
-        item = item_info['data']
-        doc_type = item_info['type']
+def _sync_batches(collection, embedding_model, prepared_batches, num_batches=None, embedding_cache=None,
+                  embed_batch_size=EMBED_BATCH_SIZE, model_key=None, auto_tune=False):
+    """
+    준비된 배치를 하나씩 읽어 내용 지문을 비교하고, 새로 추가되었거나 내용이 바뀐 레코드만 임베딩하여 upsert합니다.
+    INGEST_PIPELINE이 켜져 있으면 준비(텍스트/메타데이터/지문 비교) → 임베딩 → 저장의 세 단계를
+    크기가 제한된 큐로 연결된 스레드에서 동시에 실행하여, 배치 i의 ChromaDB 쓰기와 배치 i+1의 임베딩이 겹치도록 합니다.
+    큐 크기만큼의 배치만 메모리에 유지합니다.
+    auto_tune이 True면 처음으로 모델이 계산해야 하는 문서(지문이 바뀌었고 임베딩 캐시에도 없는 문서)가 나왔을 때
+    그 문서로 embed_batch_size를 한 번 측정합니다. 변경분이 없으면 측정하지 않습니다.
+    Returns:
+        dict: 동기화 통계 딕셔너리.
+    """
+    sync_stats = {'total': 0, 'added': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+    batch_count_display = num_batches if num_batches is not None else '?'
+    stage_stats = _IngestStageStats(['준비', '임베딩', '저장'])
+    encode_stats = _new_encode_stats()
+    batch_size_tuning = {'pending': auto_tune, 'embed_batch_size': embed_batch_size}
 
-        if not isinstance(item, dict) or 'id' not in item:
-            print(f"경고: 유효하지 않은 데이터 형식 또는 ID 없음 ({doc_type}). 데이터: '{str(item)[:100]}...'. 건너<0xEB><0x8B><0x88>다.")
-            continue
+    def tune_batch_size(texts):
+        """첫 호출에서만 이미 준비된 문서 앞부분으로 임베딩 배치 크기를 측정합니다 (임베딩 스레드에서만 호출)."""
+        if batch_size_tuning['pending'] and texts:
+            batch_size_tuning['pending'] = False
+            batch_size_tuning['embed_batch_size'] = tune_embed_batch_size(embedding_model, texts[:AUTO_TUNE_SAMPLE_SIZE])
+        return batch_size_tuning['embed_batch_size']
 
-        text_to_embed = ""
-        if doc_type == 'employee':
-            text_to_embed = prepare_text_for_employee_embedding(item)
-        elif doc_type == 'job':
-            text_to_embed = prepare_text_for_job_embedding(item)
-        
-        if not text_to_embed:
-            print(f"경고: 임베딩 텍스트 생성 실패 ({doc_type}, ID: {item['id']}). 건너<0xEB><0x8B><0x88>다.")
-            continue
+    def iter_prepare_stage():
+        """배치를 읽어 내용 지문을 계산하고 변경된 레코드 위치를 찾습니다."""
+        start_idx = 0
+        prepare_start = time.perf_counter()
+        for i, (batch_ids, batch_documents, batch_metadatas) in enumerate(prepared_batches):
+            end_idx = start_idx + len(batch_ids)
 
-        all_documents.append(text_to_embed)
-        
-        processed_metadata = _process_metadata_for_db(item)
-        processed_metadata['doc_type'] = doc_type # 문서 타입 추가
-        all_metadatas_to_db.append(processed_metadata)
-        all_ids.append(item['id'])
+            for document, metadata in zip(batch_documents, batch_metadatas):
+                metadata[CONTENT_HASH_METADATA_KEY] = compute_content_fingerprint(document, metadata, model_key)
 
-    if not all_documents:
-        print("임베딩할 유효한 문서(직원/채용공고)가 없습니다.")
-        return collection
+            try:
+                stored_fingerprints = _get_stored_fingerprints(collection, batch_ids)
+            except Exception as e:
+                print(f"배치 {i+1}/{batch_count_display} 기존 지문 조회 중 오류 발생: {e}. 배치 전체를 다시 임베딩합니다.")
+                stored_fingerprints = {}
 
-    # --- ChromaDB 배치 Upsert ---
-    total_items = len(all_documents)
-    num_batches = math.ceil(total_items / CHROMA_UPSERT_BATCH_SIZE)
-    print(f"총 {total_items}개의 아이템을 {num_batches}개의 배치로 나누어 ChromaDB에 저장합니다 (배치 크기: {CHROMA_UPSERT_BATCH_SIZE}).")
-
-    for i in range(num_batches):
-        start_idx = i * CHROMA_UPSERT_BATCH_SIZE
-        end_idx = min((i + 1) * CHROMA_UPSERT_BATCH_SIZE, total_items)
-        
-        batch_ids = all_ids[start_idx:end_idx]
-        batch_documents = all_documents[start_idx:end_idx]
-        batch_metadatas = all_metadatas_to_db[start_idx:end_idx]
-        
-        print(f"배치 {i+1}/{num_batches} (아이템 {start_idx+1}-{end_idx}) 임베딩 및 저장 중...")
-        
+            changed_positions = [
+                position for position, (doc_id, metadata) in enumerate(zip(batch_ids, batch_metadatas))
+                if stored_fingerprints.get(doc_id) != metadata[CONTENT_HASH_METADATA_KEY]
+            ]
+            added_count = sum(1 for position in changed_positions if batch_ids[position] not in stored_fingerprints)
+            work_item = {
+                'index': i, 'start_idx': start_idx, 'end_idx': end_idx, 'total': len(batch_ids),
+                'added': added_count,
+                'updated': len(changed_positions) - added_count,
+                'unchanged': len(batch_ids) - len(changed_positions),
+                'ids': [batch_ids[position] for position in changed_positions],
+                'documents': [batch_documents[position] for position in changed_positions],
+                'metadatas': [batch_metadatas[position] for position in changed_positions],
+                'embeddings': None, 'error': None,
+            }
+            stage_stats.record('준비', len(batch_ids), time.perf_counter() - prepare_start)
+            start_idx = end_idx
+            yield work_item
+            prepare_start = time.perf_counter()
+
+    def encode_stage(work_item):
+        """변경된 문서만 임베딩합니다 (캐시가 있으면 캐시 우선)."""
+        if not work_item['ids']:
+            return work_item
+        encode_start = time.perf_counter()
         try:
-            batch_embeddings = embedding_model.encode(batch_documents, convert_to_tensor=False).tolist()
-            
-            if batch_ids and batch_embeddings and batch_documents and batch_metadatas:
+            work_item['embeddings'] = _encode_documents(
+                embedding_model, work_item['documents'], embedding_cache, embed_batch_size, encode_stats,
+                tune_batch_size if auto_tune else None
+            ).tolist()
+        except Exception as e:
+            work_item['error'] = e
+        stage_stats.record('임베딩', len(work_item['ids']), time.perf_counter() - encode_start)
+        return work_item
+
+    def upsert_stage(work_item):
+        """임베딩 결과를 ChromaDB에 저장하고 동기화 통계를 갱신합니다."""
+        i = work_item['index']
+        changed_ids = work_item['ids']
+        sync_stats['total'] += work_item['total']
+        sync_stats['unchanged'] += work_item['unchanged']
+        if not changed_ids:
+            print(f"배치 {i+1}/{batch_count_display} (아이템 {work_item['start_idx']+1}-{work_item['end_idx']}) 변경 없음. 건너뜁니다.")
+            return
+
+        print(f"배치 {i+1}/{batch_count_display} (아이템 {work_item['start_idx']+1}-{work_item['end_idx']}) 신규 {work_item['added']}개, "
+              f"변경 {work_item['updated']}개, 변경 없음 {work_item['unchanged']}개. 저장 중...")
+        upsert_start = time.perf_counter()
+        try:
+            if work_item['error'] is not None:
+                raise work_item['error']
+            changed_embeddings = work_item['embeddings']
+
+            if changed_ids and changed_embeddings and work_item['documents'] and work_item['metadatas']:
                 collection.upsert(
-                    ids=batch_ids,
-                    embeddings=batch_embeddings,
-                    documents=batch_documents,
-                    metadatas=batch_metadatas
+                    ids=changed_ids,
+                    embeddings=changed_embeddings,
+                    documents=work_item['documents'],
+                    metadatas=work_item['metadatas']
                 )
-                print(f"배치 {i+1}/{num_batches} ({len(batch_ids)}개 아이템) 저장 완료.")
+                sync_stats['added'] += work_item['added']
+                sync_stats['updated'] += work_item['updated']
+                print(f"배치 {i+1}/{batch_count_display} ({len(changed_ids)}개 아이템) 저장 완료.")
             else:
-                print(f"배치 {i+1}/{num_batches}에 저장할 유효 데이터가 없습니다 (임베딩 실패 또는 데이터 누락).")
+                print(f"배치 {i+1}/{batch_count_display}에 저장할 유효 데이터가 없습니다 (임베딩 실패 또는 데이터 누락).")
 
         except Exception as e:
-            print(f"배치 {i+1}/{num_batches} 처리 중 오류 발생: {e}")
-            print(f"  오류 발생 데이터 샘플 (첫번째 ID): {batch_ids[0] if batch_ids else 'N/A'}")
+            sync_stats['failed'] += len(changed_ids)
+            print(f"배치 {i+1}/{batch_count_display} 처리 중 오류 발생: {e}")
+            print(f"  오류 발생 데이터 샘플 (첫번째 ID): {changed_ids[0] if changed_ids else 'N/A'}")
             # 선택: 오류 발생 시 해당 배치 건너뛰고 계속 진행할지, 중단할지 결정
             # 여기서는 다음 배치로 계속 진행
+        stage_stats.record('저장', len(changed_ids), time.perf_counter() - upsert_start)
+
+    wall_start = time.perf_counter()
+    if not INGEST_PIPELINE:
+        for work_item in iter_prepare_stage():
+            upsert_stage(encode_stage(work_item))
+        stage_stats.report(time.perf_counter() - wall_start)
+        _report_encode_stats(encode_stats)
+        return sync_stats
+
+    # 준비 스레드 → [큐] → 임베딩 스레드 → [큐] → 저장(현재 스레드)
+    prepared_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    encoded_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    stop_event = threading.Event()
+    errors = []
+    workers = [
+        threading.Thread(target=_run_pipeline_source, args=(iter_prepare_stage(), prepared_queue, stop_event, errors),
+                         name='ingest-prepare', daemon=True),
+        threading.Thread(target=_run_pipeline_stage, args=(encode_stage, prepared_queue, encoded_queue, stop_event, errors),
+                         name='ingest-encode', daemon=True),
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        while not stop_event.is_set():
+            try:
+                work_item = encoded_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if work_item is _PIPELINE_DONE:
+                break
+            upsert_stage(work_item)
+    finally:
+        stop_event.set()
+        for worker in workers:
+            worker.join()
+    if errors:
+        # 입력 읽기 오류 등으로 중단된 경우, 일부만 처리된 결과로 삭제 단계가 진행되지 않도록 예외를 전달
+        raise errors[0]
+
+    stage_stats.report(time.perf_counter() - wall_start)
+    _report_encode_stats(encode_stats)
+    return sync_stats
+
+def _get_all_collection_ids(collection, page_size=UPSERT_BATCH_SIZE, where=None):
+    """컬렉션에 저장된 (where 조건에 맞는) 모든 ID를 페이지 단위로 조회합니다 (임베딩/문서는 가져오지 않음)."""
+    all_ids = []
+    offset = 0
+    while True:
+        page = collection.get(where=where, include=[], limit=page_size, offset=offset)
+        page_ids = page['ids']
+        all_ids.extend(page_ids)
+        if len(page_ids) < page_size:
+            return all_ids
+        offset += page_size
+
+def _delete_stale_ids(collection, seen_ids, doc_types, batch_size=UPSERT_BATCH_SIZE):
+    """doc_types 문서 중 입력에 더 이상 없는 ID를 컬렉션에서 배치 단위로 삭제하고 삭제한 개수를 반환합니다."""
+    stale_ids = [
+        doc_id for doc_type in sorted(doc_types)
+        for doc_id in _get_all_collection_ids(collection, batch_size, where={'doc_type': doc_type}) if doc_id not in seen_ids
+    ]
+    for start_idx in range(0, len(stale_ids), batch_size):
+        collection.delete(ids=stale_ids[start_idx:start_idx + batch_size])
+    return len(stale_ids)
+
+def setup_chromadb_collection(client, collection_name, employee_data, job_data, embedding_model, embedding_cache=None,
+                              embed_batch_size=None, upsert_batch_size=None, auto_tune=None, failed_sections=None,
+                              model_key=None):
+    """
+    ChromaDB 컬렉션을 설정하고 직원 및 채용 공고 데이터를 임베딩하여 저장합니다.
+    각 레코드의 임베딩용 텍스트, 메타데이터와 모델 키로 내용 지문을 계산해 메타데이터('content_hash')에 함께 저장하고,
+    다음 실행 시 지문이 달라진 레코드(모델/양자화/백엔드 변경 포함)와 새 레코드만 다시 임베딩/upsert하며 입력에서 사라진 ID는 삭제합니다.
+    삭제는 입력을 끝까지 읽었고 레코드가 하나 이상 있었던 문서 타입에만 적용합니다. 섹션 읽기에 실패했거나
+    (failed_sections, 스트리밍 입력의 DataLoadError) 섹션이 비어 있으면 해당 문서 타입의 기존 데이터는 그대로 둡니다.
+    upsert나 삭제가 있었으면 컬렉션 epoch를 증가시켜 추천 결과 캐시를 무효화합니다.
+    employee_data/job_data로 리스트 대신 제너레이터(예: data_loader.iter_employees_from_integrated_file)를 넘기면
+    전체 데이터를 메모리에 올리지 않고 배치 단위로 스트리밍 처리합니다.
+    Args:
+        client (chromadb.Client): ChromaDB 클라이언트.
+        collection_name (str): 컬렉션 이름.
+        employee_data (list 또는 iterable): HR 직원 데이터 리스트 또는 제너레이터.
+        job_data (list 또는 iterable): 채용 공고 데이터 리스트 또는 제너레이터.
+        embedding_model (SentenceTransformer): 임베딩 모델.
+        embedding_cache (EmbeddingCache, optional): 임베딩 영구 캐시. 주어지면 이미 계산한 텍스트는 모델을 호출하지 않습니다.
+        embed_batch_size (int, optional): 모델 encode 호출의 배치 크기. 기본값은 config.EMBED_BATCH_SIZE.
+        upsert_batch_size (int, optional): ChromaDB upsert 배치 크기. 기본값은 config.UPSERT_BATCH_SIZE이며,
+                                           클라이언트의 최대 배치 크기를 넘지 않도록 제한됩니다.
+        auto_tune (bool, optional): True면 처음으로 임베딩할 변경 문서가 나왔을 때 처리량을 측정하여 embed_batch_size를 정합니다.
+                                    기본값은 config.AUTO_TUNE_BATCH_SIZES.
+        failed_sections (list, optional): 읽기에 실패한 섹션 키 (data_loader.load_integrated_data 통계의 'failed_sections').
+        model_key (str, optional): 내용 지문에 포함할 모델 키 (embedding_utils.get_embedding_model이 설정한 model.model_name).
+                                   None이면 embedding_model.model_name을 사용합니다. 임베딩 풀을 넘길 때는 명시해야 합니다.
+    Returns:
+        chromadb.Collection: ChromaDB 컬렉션 객체.
+    """
+    streaming_input = _is_streaming_input(employee_data) or _is_streaming_input(job_data)
+    if not streaming_input and not employee_data and not job_data:
+        print("임베딩할 데이터가 없습니다 (직원 및 채용 공고 모두 비어 있음).")
+
+    # 컬렉션이 존재하지 않으면 생성 (데이터가 없으면 비어있는 상태로 반환)
+    try:
+        collection = client.get_or_create_collection(name=collection_name)
+    except Exception as e:
+        print(f"컬렉션 '{collection_name}' 생성/가져오기 중 오류: {e}")
+        # 심각한 오류 시 None 반환 또는 예외 재발생 고려
+        return None
+
+    if not streaming_input and not employee_data and not job_data:
+        print(f"'{collection_name}' 컬렉션이 비어있는 상태로 준비되었습니다.")
+        return collection
+
+    embed_batch_size = embed_batch_size or EMBED_BATCH_SIZE
+    upsert_batch_size = upsert_batch_size or UPSERT_BATCH_SIZE
+    max_upsert_batch_size = get_max_upsert_batch_size(client)
+    if max_upsert_batch_size and upsert_batch_size > max_upsert_batch_size:
+        print(f"upsert 배치 크기를 ChromaDB 최대 배치 크기({max_upsert_batch_size})로 제한합니다.")
+        upsert_batch_size = max_upsert_batch_size
+
+    if model_key is None:
+        model_key = getattr(embedding_model, 'model_name', None)
+    input_stats = _new_input_stats()
+    items_for_embedding = _iter_items_for_embedding(employee_data, job_data, input_stats)
+    # 자동 조정은 _sync_batches에서 지문 비교 후 실제로 임베딩할 문서가 생겼을 때 그 문서로 한 번만 수행
+    auto_tune = AUTO_TUNE_BATCH_SIZES if auto_tune is None else auto_tune
+    embed_batch_size_display = "자동 조정" if auto_tune else embed_batch_size
+
+    num_batches = None
+    if streaming_input:
+        print(f"스트리밍 입력을 배치 크기 {upsert_batch_size} 단위로 읽으며 변경 사항을 동기화합니다 "
+              f"(임베딩 배치 크기: {embed_batch_size_display})...")
+    else:
+        total_items = len(employee_data or []) + len(job_data or [])
+        num_batches = math.ceil(total_items / upsert_batch_size)
+        print(f"총 {total_items}개의 아이템을 {num_batches}개의 배치로 나누어 내용 지문을 비교하고 "
+              f"변경분만 ChromaDB에 저장합니다 (upsert 배치 크기: {upsert_batch_size}, 임베딩 배치 크기: {embed_batch_size_display}).")
+
+    prepared_batches = _iter_prepared_batches(items_for_embedding, upsert_batch_size, input_stats)
+    sync_stats = _sync_batches(collection, embedding_model, prepared_batches, num_batches, embedding_cache,
+                               embed_batch_size, model_key, auto_tune)
+    sync_stats['failed'] += input_stats['invalid']
+
+    if sync_stats['total'] == 0:
+        print("임베딩할 유효한 문서(직원/채용공고)가 없습니다.")
+        return collection
 
-    print(f"총 {total_items}개 중 성공적으로 처리된 아이템에 대한 ChromaDB 저장/업데이트 시도 완료.")
+    failed_doc_types = input_stats['failed_doc_types'] | {
+        doc_type for doc_type, data_key in DOC_TYPE_TO_DATA_KEY.items() if data_key in (failed_sections or ())
+    }
+    prune_doc_types = input_stats['doc_types'] - failed_doc_types
+    skipped_doc_types = set(DOC_TYPE_TO_DATA_KEY) - prune_doc_types
+    if skipped_doc_types:
+        print(f"입력을 읽지 못했거나 비어 있는 문서 타입({', '.join(sorted(skipped_doc_types))})은 삭제 동기화를 건너뜁니다.")
+    sync_stats['deleted'] = _delete_stale_ids(collection, input_stats['seen_ids'], prune_doc_types, upsert_batch_size)
+    print(f"동기화 완료: 전체 {sync_stats['total']}개 중 신규 {sync_stats['added']}개, 변경 {sync_stats['updated']}개, "
+          f"변경 없음 {sync_stats['unchanged']}개, 삭제 {sync_stats['deleted']}개, 실패 {sync_stats['failed']}개.")
+    if sync_stats['added'] or sync_stats['updated'] or sync_stats['deleted']:
+        # 데이터가 바뀌었으므로 이전 추천 결과 캐시가 사용되지 않도록 epoch 증가
+        new_epoch = bump_collection_epoch(collection)
+        print(f"컬렉션 데이터 버전(epoch)을 {new_epoch}(으)로 갱신했습니다.")
+    if embedding_cache is not None:
+        cache_stats = embedding_cache.stats()
+        print(f"임베딩 캐시: 적중 {cache_stats['hits']}개, 미적중 {cache_stats['misses']}개 (적중률 {cache_stats['hit_rate']:.1%}).")
     return collection
 
 if __name__ == '__main__':
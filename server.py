@@ -0,0 +1,221 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : HR 인재 및 채용 공고 추천 HTTP 서비스
+내용 : 임베딩 모델과 ChromaDB 컬렉션을 한 번만 준비해 둔 채로 요청을 처리하는 asyncio 기반 HTTP 서버입니다 (표준 라이브러리만 사용).
+요청마다 프로세스를 띄워 모델 로드와 PersistentClient 열기를 반복하는 비용을 없앱니다.
+모델 임베딩과 ChromaDB 검색은 CPU/블로킹 작업이므로 스레드 풀에서 실행하고, 동시에 처리하는 추천 요청 수는
+SERVER_MAX_CONCURRENCY로 제한합니다 (초과 요청은 순서대로 대기).
+동시에 들어온 요청의 프로젝트 설명은 QUERY_BATCH_WAIT_MS / QUERY_BATCH_MAX_ITEMS 범위에서 묶어 한 번에 임베딩합니다.
+ - GET  /health    : 서버 및 컬렉션 상태
+ - POST /recommend : 쿼리 명세(JSON, main.py 일괄 실행 입력과 같은 형식)를 받아 추천 결과를 반환
+"""
+# hr_recommender/server.py
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import config
+from main import prepare_recommender, parse_query_spec, _format_result_item
+from recommender.query_batcher import AsyncEmbeddingBatcher
+from recommender.talent_recommender import (get_cached_recommendations, get_query_embedding_cache, get_result_cache,
+                                             recommend_talent_from_db)
+
+MAX_REQUEST_BODY_BYTES = 1024 * 1024 # 요청 본문 최대 크기
+REQUEST_READ_TIMEOUT_SECONDS = 30 # 요청 헤더/본문을 기다리는 최대 시간
+
+
+class RecommendationService:
+    """
+    준비된 컬렉션과 모델로 추천 요청을 처리합니다.
+    Args:
+        collection (chromadb.Collection): 검색할 컬렉션.
+        embedding_model: 프로젝트 설명 임베딩용 모델.
+        max_concurrency (int): 동시에 처리할 최대 추천 요청 수 (스레드 풀 크기와 같음).
+        batch_wait_ms (float): 쿼리 임베딩을 묶기 위해 기다리는 최대 시간(밀리초).
+        batch_max_items (int): 한 번에 임베딩할 최대 쿼리 수. 1 이하이면 묶지 않고 요청마다 임베딩.
+            묶지 않는 경우에도 모델 호출은 전용 스레드 하나에서 순서대로 실행하여, 검색 스레드 수만큼
+            모델 계산이 동시에 실행되며 CPU 스레드를 두고 경쟁하지 않도록 합니다.
+    """
+    def __init__(self, collection, embedding_model, max_concurrency=4, batch_wait_ms=5, batch_max_items=32):
+        self.collection = collection
+        self.embedding_model = embedding_model
+        self.max_concurrency = max_concurrency
+        self.batcher = AsyncEmbeddingBatcher(embedding_model, batch_wait_ms, batch_max_items, get_query_embedding_cache())
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='recommend')
+        self._semaphore = None # 이벤트 루프 안에서 생성
+        self.requests_served = 0
+        self.started_at = time.time()
+
+    def _recommend_sync(self, query, query_embedding):
+        """스레드 풀에서 실행되는 추천 (미리 계산한 임베딩으로 검색 + 필터링)."""
+        search_stats = {}
+        recommendations = recommend_talent_from_db(
+            self.collection, self.embedding_model, stats=search_stats, verbose=False,
+            query_embedding=[query_embedding], **query
+        )
+        return recommendations, search_stats
+
+    async def recommend(self, query):
+        """쿼리 임베딩을 (다른 요청과 묶어) 계산한 뒤, 동시 처리 수 제한 안에서 검색과 필터링을 실행합니다."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        cached_recommendations = get_cached_recommendations(self.collection, self.embedding_model, **query)
+        if cached_recommendations is not None: # 데이터 변경 없이 같은 조건이 반복되면 임베딩/검색 없이 응답
+            return cached_recommendations, {'result_cache_hit': True, 'survivors': len(cached_recommendations)}
+        query_embedding = await self.batcher.embed(query['project_description'])
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._recommend_sync, query, query_embedding)
+
+    async def health(self):
+        """서버 상태를 반환합니다. 컬렉션 count()는 블로킹 DB 호출이므로 검색과 같은 스레드 풀에서 실행합니다."""
+        loop = asyncio.get_running_loop()
+        count = await loop.run_in_executor(self._executor, self.collection.count)
+        return {
+            'status': 'ok',
+            'collection': self.collection.name,
+            'count': count,
+            'model': config.MODEL_NAME,
+            'requests_served': self.requests_served,
+            'query_batching': self.batcher.stats(),
+            'query_embedding_cache': get_query_embedding_cache().stats() if get_query_embedding_cache() else None,
+            'result_cache': get_result_cache().stats() if get_result_cache() else None,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+        }
+
+    async def aclose(self):
+        """이벤트 루프 안에서 진행 중인 쿼리 임베딩 배치를 정리합니다."""
+        await self.batcher.aclose()
+
+    def close(self):
+        self.batcher.close()
+        self._executor.shutdown(wait=True)
+
+
+async def _read_request(reader):
+    """
+    HTTP/1.1 요청 하나를 읽습니다.
+    Returns:
+        tuple: (method, path, headers, body) 또는 연결이 닫혔으면 None.
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode('latin-1').strip().split()
+    if len(parts) != 3:
+        raise ValueError("잘못된 요청 줄")
+    method, path, _ = parts
+    headers = {}
+    while True:
+        header_line = await reader.readline()
+        if header_line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = header_line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    content_length = int(headers.get('content-length') or 0)
+    if content_length > MAX_REQUEST_BODY_BYTES:
+        raise ValueError("요청 본문이 너무 큽니다")
+    body = await reader.readexactly(content_length) if content_length else b''
+    return method.upper(), path.split('?', 1)[0], headers, body
+
+def _encode_response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+async def _dispatch(service, method, path, body):
+    """요청 경로에 맞는 처리를 수행하고 (상태 코드, 응답 딕셔너리)를 반환합니다."""
+    if path == '/health':
+        if method != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'GET만 지원합니다.'}
+        return HTTPStatus.OK, await service.health()
+    if path == '/recommend':
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'POST만 지원합니다.'}
+        try:
+            spec = json.loads(body.decode('utf-8') or '{}')
+            query = parse_query_spec(spec if isinstance(spec, dict) else {'description': str(spec)})
+        except (UnicodeDecodeError, json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+            return HTTPStatus.BAD_REQUEST, {'error': f"쿼리 명세를 해석할 수 없습니다: {e}"}
+        # 큰 결과 수 요청이 컬렉션 전체 조회로 동시 처리 슬롯을 오래 점유하지 않도록 상한 적용
+        query['num_results'] = min(query['num_results'], config.SERVER_MAX_NUM_RESULTS)
+        request_start = time.perf_counter()
+        recommendations, search_stats = await service.recommend(query)
+        service.requests_served += 1
+        return HTTPStatus.OK, {
+            'query': query,
+            'results': [_format_result_item(item) for item in recommendations],
+            'stats': search_stats,
+            'latency_ms': round((time.perf_counter() - request_start) * 1000, 2),
+        }
+    return HTTPStatus.NOT_FOUND, {'error': f"알 수 없는 경로: {path}"}
+
+async def _handle_connection(service, reader, writer):
+    """연결 하나에서 keep-alive 요청들을 순서대로 처리합니다."""
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(_read_request(reader), REQUEST_READ_TIMEOUT_SECONDS)
+            except (ValueError, asyncio.IncompleteReadError) as e:
+                writer.write(_encode_response(HTTPStatus.BAD_REQUEST, {'error': str(e)}, keep_alive=False))
+                break
+            except asyncio.TimeoutError:
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            try:
+                status, payload = await _dispatch(service, method, path, body)
+            except Exception as e:
+                print(f"요청 처리 중 오류 발생 ({method} {path}): {e}")
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+            writer.write(_encode_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(service, host, port):
+    """HTTP 서버를 시작하고 종료될 때까지 요청을 처리합니다."""
+    server = await asyncio.start_server(lambda reader, writer: _handle_connection(service, reader, writer), host, port)
+    print(f"추천 서버 시작: http://{host}:{port} (동시 처리 {service.max_concurrency}개, "
+          f"컬렉션 '{service.collection.name}' {service.collection.count()}개)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.aclose()
+
+def run_server(host=None, port=None, max_concurrency=None):
+    """모델과 컬렉션을 한 번 준비한 뒤 HTTP 서버를 실행합니다."""
+    host = host or config.SERVER_HOST
+    port = port or config.SERVER_PORT
+    max_concurrency = max_concurrency or config.SERVER_MAX_CONCURRENCY
+    print("HR 인재 및 채용 공고 추천 서버 준비 중")
+    hr_job_collection, embedding_model = prepare_recommender()
+    if hr_job_collection is None:
+        print("추천 서버를 시작할 수 없습니다.")
+        return
+    service = RecommendationService(hr_job_collection, embedding_model, max_concurrency,
+                                    config.QUERY_BATCH_WAIT_MS, config.QUERY_BATCH_MAX_ITEMS)
+    try:
+        asyncio.run(serve(service, host, port))
+    except KeyboardInterrupt:
+        print("추천 서버 종료")
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    run_server()
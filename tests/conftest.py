@@ -0,0 +1,34 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 테스트 공통 설정
+내용 : 프로젝트 루트를 import 경로에 추가하고, 모델이 필요한 테스트가 사용할 로컬 모델 이름 fixture를 제공합니다.
+모델은 환경 변수 HR_TEST_MODEL(로컬 경로 또는 hub 이름)이나 config.MODEL_NAME을 사용하며,
+로컬 경로나 로컬 hub 캐시에 없으면 해당 테스트를 건너뜁니다 (테스트는 네트워크를 사용하지 않음).
+"""
+# hr_recommender/tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+@pytest.fixture
+def local_model_name():
+    """로컬에서 로드할 수 있는 테스트 모델 이름. 없으면 테스트를 건너뜁니다."""
+    try:
+        from config import MODEL_NAME
+    except ImportError:
+        MODEL_NAME = 'all-MiniLM-L6-v2'
+    model_name = os.environ.get('HR_TEST_MODEL') or MODEL_NAME
+    if os.path.isdir(model_name):
+        return model_name
+    huggingface_hub = pytest.importorskip('huggingface_hub')
+    repo_id = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+    if not isinstance(huggingface_hub.try_to_load_from_cache(repo_id, 'config.json'), str):
+        pytest.skip(f"로컬에 테스트할 모델({model_name})이 없습니다 (HR_TEST_MODEL로 지정)")
+    return model_name
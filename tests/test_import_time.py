@@ -0,0 +1,31 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : CLI 시작 경로의 import 회귀 자동 점검 (pytest)
+내용 : check_import_time.py와 같은 방식으로 새 프로세스에서 `python -X importtime`을 실행하고,
+모델/DB를 쓰지 않는 경로(main.py --help, recommender.data_loader)가 torch, chromadb, sentence_transformers 같은
+무거운 의존성을 가져오지 않는지 확인합니다. import 시간은 장비마다 달라 기준 시간은 검사하지 않습니다.
+사용법: python -m pytest tests/test_import_time.py
+"""
+# hr_recommender/tests/test_import_time.py
+
+import pytest
+
+from check_import_time import find_heavy_imports, measure_command, measure_import
+
+
+def _assert_no_heavy_imports(result, label):
+    assert 'error' not in result, f"{label} 실행 실패: {result.get('error')}"
+    assert result['modules'], f"{label}: -X importtime 기록을 읽지 못했습니다"
+    heavy_imports = find_heavy_imports(result)
+    assert not heavy_imports, f"{label}이(가) 무거운 의존성을 가져옵니다: {', '.join(heavy_imports[:10])}"
+
+
+@pytest.mark.parametrize('command', [('main.py', '--help')])
+def test_command_does_not_import_heavy_modules(command):
+    _assert_no_heavy_imports(measure_command(command), ' '.join(command))
+
+
+@pytest.mark.parametrize('module_name', ['recommender.data_loader'])
+def test_module_does_not_import_heavy_modules(module_name):
+    _assert_no_heavy_imports(measure_import(module_name), module_name)
@@ -0,0 +1,26 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : ONNX Runtime 백엔드와 원본 모델의 임베딩 일치도 자동 점검 (pytest)
+내용 : recommender.onnx_backend.check_onnx_parity로 같은 텍스트를 원본(sentence-transformers, fp32) 모델과
+ONNX 모델로 임베딩하여 모든 텍스트의 코사인 유사도가 0.9999 이상인지 확인합니다.
+모델은 환경 변수 HR_TEST_MODEL(로컬 경로 또는 hub 이름)이나 config.MODEL_NAME을 사용하며, 네트워크 없이
+로컬 경로/로컬 hub 캐시에서만 로드합니다. 모델이나 onnxruntime/onnx/torch가 없으면 건너뜁니다.
+사용법: HR_TEST_MODEL=/path/to/model python -m pytest tests/test_onnx_parity.py
+"""
+# hr_recommender/tests/test_onnx_parity.py
+
+import pytest
+
+MIN_COSINE = 0.9999
+
+
+def test_onnx_embeddings_match_reference_model(local_model_name, tmp_path, monkeypatch):
+    for module_name in ('onnxruntime', 'onnx', 'torch', 'sentence_transformers'):
+        pytest.importorskip(module_name)
+    from recommender import model_registry
+    from recommender.onnx_backend import check_onnx_parity
+    monkeypatch.setattr(model_registry, 'MODEL_OFFLINE', True) # 테스트 중 hub 네트워크 접근 금지
+    parity = check_onnx_parity(local_model_name, cache_dir=str(tmp_path), min_cosine=MIN_COSINE)
+    assert parity['passed'], (f"ONNX 임베딩 코사인 유사도가 기준({MIN_COSINE}) 미만입니다: "
+                              f"최소 {parity['min_cosine']:.6f}, 평균 {parity['mean_cosine']:.6f}")
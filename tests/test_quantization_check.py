@@ -0,0 +1,57 @@
+"""
+작성자 : kp
+작성일 : 2025-05-14
+목적 : 양자화 정확도 점검 CLI의 자동 실행 (pytest)
+내용 : data/hr_data.json의 앞부분(직원 200명, 채용 공고 20개)을 임시 파일로 잘라
+python -m recommender.quantization_check를 --min-overlap 기준과 함께 실행합니다.
+fp32 대비 int8 전체 양자화의 평균 top-k 겹침이 기준 이상이면 종료 코드 0, 불가능한 기준(100% 초과)이면 1인지 확인합니다.
+모델은 conftest.local_model_name을 사용하며, 모델이나 torch/sentence-transformers가 없으면 건너뜁니다.
+사용법: HR_TEST_MODEL=/path/to/model python -m pytest tests/test_quantization_check.py
+"""
+# hr_recommender/tests/test_quantization_check.py
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import PROJECT_ROOT
+
+MIN_TOP_K_OVERLAP = 0.8
+SLICE_EMPLOYEES = 200
+SLICE_JOBS = 20
+
+
+@pytest.fixture
+def hr_data_slice(tmp_path):
+    source_path = os.path.join(PROJECT_ROOT, 'data', 'hr_data.json')
+    if not os.path.exists(source_path):
+        pytest.skip(f"{source_path}가 없습니다")
+    with open(source_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    slice_path = tmp_path / 'hr_data.json'
+    slice_path.write_text(json.dumps({'employees': data['employees'][:SLICE_EMPLOYEES],
+                                      'job_descriptions': data['job_descriptions'][:SLICE_JOBS]}, ensure_ascii=False),
+                          encoding='utf-8')
+    return str(slice_path)
+
+
+def _run_quantization_check(model_name, data_path, min_overlap, work_dir):
+    # 모델 저장소(./model_cache)가 임시 디렉토리에 생기도록 작업 디렉토리를 바꾸고, hub 네트워크 접근은 막음
+    env = {**os.environ, 'PYTHONPATH': PROJECT_ROOT, 'HF_HUB_OFFLINE': '1', 'TRANSFORMERS_OFFLINE': '1'}
+    return subprocess.run([sys.executable, '-m', 'recommender.quantization_check', '--data', data_path,
+                           '--model', model_name, '--k', '5', '--min-overlap', str(min_overlap)],
+                          cwd=work_dir, env=env, capture_output=True, text=True)
+
+
+def test_quantized_top_k_overlap_meets_threshold(local_model_name, hr_data_slice, tmp_path):
+    for module_name in ('torch', 'sentence_transformers'):
+        pytest.importorskip(module_name)
+    completed = _run_quantization_check(local_model_name, hr_data_slice, MIN_TOP_K_OVERLAP, tmp_path)
+    assert completed.returncode == 0, completed.stdout[-2000:] + completed.stderr[-2000:]
+    assert "통과" in completed.stdout
+
+    completed = _run_quantization_check(local_model_name, hr_data_slice, 1.01, tmp_path)
+    assert completed.returncode == 1, completed.stdout[-2000:] + completed.stderr[-2000:]